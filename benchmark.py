@@ -0,0 +1,184 @@
+"""
+Scaling benchmarks on synthetic worlds
+
+Generates worlds of increasing size and times the hot paths of the game:
+
+    python benchmark.py --scales small,medium --output bench_results.json
+    python benchmark.py --compare bench_results.json   # fail on regressions
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.game import GameState
+from src.data_loader import load_game_data
+from src.scenario import generate_scenario, populate_units, start_border_wars
+
+SCALES = {
+    "small": {"provinces": 1000, "countries": 10, "units": 2000},
+    "medium": {"provinces": 10000, "countries": 100, "units": 20000},
+    "large": {"provinces": 50000, "countries": 500, "units": 100000},
+}
+
+
+def measure(function, repeats: int) -> dict:
+    """Time a function several times, returns median/min seconds"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(times), "min_s": min(times), "repeats": repeats}
+
+
+def build_world(scenario: dict, unit_count: int, seed: int) -> GameState:
+    """Load a generated scenario into a fresh game with units and wars"""
+    game_state = GameState(seed)
+    load_game_data(game_state, scenario["data_dir"], scenario["id_map"],
+                   cache_dir=scenario["data_dir"] / "cache")
+    game_state.initialize_systems()
+    populate_units(game_state, unit_count, seed)
+    start_border_wars(game_state, seed=seed)
+    return game_state
+
+
+def benchmark_scale(name: str, params: dict, workdir: Path, repeats: int, seed: int,
+                    ai_workers: int = 0) -> dict:
+    """Run every benchmark at one world size"""
+    print(f"[{name}] generating {params['provinces']} provinces, "
+          f"{params['countries']} countries, {params['units']} units")
+    scenario = generate_scenario(workdir / name, params["provinces"], params["countries"], seed)
+    results = {}
+
+    def load():
+        load_game_data(GameState(), scenario["data_dir"])
+    results["load_game_data"] = measure(load, repeats)
+
+    def load_cached():
+        load_game_data(GameState(), scenario["data_dir"], scenario["id_map"],
+                       cache_dir=scenario["data_dir"] / "cache")
+    load_cached()  # Compiles the world cache
+    results["load_world_cached"] = measure(load_cached, repeats)
+
+    game_state = build_world(scenario, params["units"], seed)
+
+    results["economy_day"] = measure(game_state.economy_system.collect_daily_resources, repeats)
+
+    # The first combat hour detects the battles opened by the border wars
+    results["combat_first_hour"] = measure(lambda: game_state.combat_system.update(1.0), 1)
+    results["combat_hour"] = measure(lambda: game_state.combat_system.update(1.0), repeats)
+    results["ai_week"] = measure(game_state.ai_controller.make_all_decisions, repeats)
+    if ai_workers:
+        ai = game_state.ai_controller
+        ai.workers = ai_workers
+        ai.make_all_decisions()  # Starts the worker processes
+        results["ai_week_workers"] = measure(ai.make_all_decisions, repeats)
+        ai.close()
+
+    picking = benchmark_picking(game_state, scenario, seed)
+    if picking:
+        results["get_province_at_point"] = picking
+
+    for operation, timing in results.items():
+        print(f"  {operation:<24}{timing['median_s'] * 1000:>12.3f} ms")
+    return {"params": params, "results": results}
+
+
+def benchmark_picking(game_state: GameState, scenario: dict, seed: int, samples: int = 10000):
+    """Time MapRenderer.get_province_at_point per call (skipped without arcade)"""
+    try:
+        from src.map_renderer import MapRenderer
+    except ImportError:
+        print("  (arcade not available, skipping get_province_at_point)")
+        return None
+
+    renderer = MapRenderer(game_state.province_manager, scenario["id_map"])
+    rng = random.Random(seed)
+    points = [(rng.uniform(0, scenario["width"]), rng.uniform(0, scenario["height"]))
+              for _ in range(samples)]
+
+    def pick_all():
+        for x, y in points:
+            renderer.get_province_at_point(x, y)
+
+    timing = measure(pick_all, 3)
+    return {key: value / samples if key != "repeats" else value for key, value in timing.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print per-operation ratios against a baseline, returns False on regression"""
+    ok = True
+    print(f"\n{'scale':<8}{'operation':<24}{'baseline ms':>13}{'current ms':>13}{'ratio':>8}")
+    for scale, current in results["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if not previous:
+            continue
+        for operation, timing in current["results"].items():
+            before = previous["results"].get(operation)
+            if not before:
+                continue
+            ratio = timing["median_s"] / before["median_s"] if before["median_s"] else 1.0
+            flag = ""
+            if ratio > tolerance:
+                flag = "  REGRESSION"
+                ok = False
+            print(f"{scale:<8}{operation:<24}{before['median_s'] * 1000:>13.3f}"
+                  f"{timing['median_s'] * 1000:>13.3f}{ratio:>8.2f}{flag}")
+    return ok
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the game on synthetic worlds")
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"comma-separated list from {', '.join(SCALES)}")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json", help="where to write results")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="max allowed current/baseline median ratio")
+    parser.add_argument("--ai-workers", type=int, default=0,
+                        help="also time the AI week planned by this many worker processes")
+    parser.add_argument("--workdir", help="where to write generated worlds (default: temp dir)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "scales": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        for name in args.scales.split(","):
+            results["scales"][name] = benchmark_scale(
+                name, SCALES[name], workdir, args.repeats, args.seed, args.ai_workers
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote results to {args.output}")
+
+    if baseline and not compare(results, baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,12 @@ Grand Strategy Game - Main Entry Point
 import arcade
 from src.constants import *
 from src.game import GameState
-from src.data_loader import load_game_data
+from src.data_loader import load_game_data, create_starting_units
 from src.map_renderer import MapRenderer
+from src.unit_renderer import UnitRenderer
+from src.savegame import SAVE_DIR, AutosaveWriter, save_game, load_game
 from src.ui.panels import (draw_top_bar, draw_economy_panel, draw_military_panel,
-                           draw_province_info)
+                           draw_province_info, draw_profiler_overlay)
 
 
 class GrandStrategyGame(arcade.Window):
@@ -31,6 +33,7 @@ class GrandStrategyGame(arcade.Window):
 
         # Map renderer
         self.map_renderer = None
+        self.unit_renderer = None
 
         # Mouse state
         self.mouse_x = 0
@@ -39,14 +42,26 @@ class GrandStrategyGame(arcade.Window):
         self.drag_start_x = 0
         self.drag_start_y = 0
 
+        # Debug overlays
+        self.show_profiler = False
+        self.show_frontlines = False
+
+        # Autosaves are written incrementally on a background thread
+        self.autosave_writer = AutosaveWriter()
+        self.next_autosave_time = AUTOSAVE_INTERVAL_HOURS
+
     def setup(self):
         """Set up the game"""
         # Load game data (provinces, countries, etc.)
-        load_game_data(self.game_state)
+        load_game_data(self.game_state, id_map_path=PROVINCE_ID_MAP_PATH)
 
         # Initialize game systems
         self.game_state.initialize_systems()
 
+        # Spread AI work over frames instead of one weekly spike
+        self.game_state.ai_controller.frame_budget_ms = AI_FRAME_BUDGET_MS
+        self.game_state.ai_controller.workers = AI_WORKER_PROCESSES
+
         # Initialize map renderer
         self.map_renderer = MapRenderer(self.game_state.province_manager)
 
@@ -56,12 +71,11 @@ class GrandStrategyGame(arcade.Window):
             self.game_state.set_player_country(countries[0].code)
 
         # Give each country some starting units
-        for country in countries:
-            capital = self.game_state.province_manager.get_province(country.capital_province_id)
-            if capital:
-                # Create 2 infantry units at capital
-                self.game_state.military_system.create_unit("infantry", country.code, capital.province_id)
-                self.game_state.military_system.create_unit("infantry", country.code, capital.province_id)
+        create_starting_units(self.game_state)
+
+        # Unit stacks are drawn as batched sprites at province centroids
+        self.unit_renderer = UnitRenderer(self.game_state,
+                                          self.game_state.province_manager.get_centroid)
 
         print("Game setup complete!")
         print(f"Loaded {len(self.game_state.province_manager.provinces)} provinces")
@@ -72,6 +86,10 @@ class GrandStrategyGame(arcade.Window):
         """Update game state"""
         self.game_state.update(delta_time)
 
+        if self.game_state.game_time >= self.next_autosave_time:
+            self.autosave_writer.autosave(self.game_state)
+            self.next_autosave_time = self.game_state.game_time + AUTOSAVE_INTERVAL_HOURS
+
     def on_draw(self):
         """Render the game"""
         self.clear()
@@ -89,6 +107,13 @@ class GrandStrategyGame(arcade.Window):
                 self.game_state.country_manager
             )
 
+        # Frontlines of the player's wars
+        if self.show_frontlines and self.map_renderer and self.game_state.player_country:
+            self.map_renderer.draw_frontline_overlay(
+                self.game_state.frontline_service.get_war_frontline(self.game_state.player_country),
+                self.zoom_level
+            )
+
         # Draw units on map
         self.draw_units()
 
@@ -110,57 +135,15 @@ class GrandStrategyGame(arcade.Window):
         if selected_province:
             draw_province_info(self.game_state, selected_province, SCREEN_WIDTH, SCREEN_HEIGHT)
 
+        # Tick timing overlay
+        if self.show_profiler:
+            draw_profiler_overlay(self.game_state, SCREEN_WIDTH, SCREEN_HEIGHT)
+
     def draw_units(self):
         """Draw military units on the map"""
-        if not self.game_state.military_system:
-            return
-
-        # Get province positions from map
-        provinces_list = list(self.game_state.province_manager.provinces.values())
-        grid_cols = 3
-        grid_rows = 3
-        cell_width = 800 // grid_cols
-        cell_height = 600 // grid_rows
-
-        for unit in self.game_state.military_system.units:
-            # Find province position
-            try:
-                province_index = [p.province_id for p in provinces_list].index(unit.location)
-            except ValueError:
-                continue
-
-            col = province_index % grid_cols
-            row = province_index // grid_cols
-
-            x = (col * cell_width + cell_width // 2) * self.zoom_level
-            y = (row * cell_height + cell_height // 2) * self.zoom_level
-
-            # Get unit owner color
-            country = self.game_state.country_manager.get_country(unit.owner)
-            if country:
-                color = tuple(country.color)
-            else:
-                color = (255, 255, 255)
-
-            # Draw unit as a small square
-            size = 10 * self.zoom_level
-            arcade.draw_rectangle_filled(x, y, size, size, color)
-
-            # Draw health bar
-            if self.zoom_level > 0.8:
-                bar_width = size
-                bar_height = 2 * self.zoom_level
-                health_pct = unit.strength
-                arcade.draw_rectangle_filled(
-                    x, y - size // 2 - 3,
-                    bar_width * health_pct, bar_height,
-                    (0, 255, 0)
-                )
-                arcade.draw_rectangle_outline(
-                    x, y - size // 2 - 3,
-                    bar_width, bar_height,
-                    (255, 255, 255), 1
-                )
+        if self.unit_renderer:
+            self.unit_renderer.draw(self.camera_x, self.camera_y, self.zoom_level,
+                                    SCREEN_WIDTH, SCREEN_HEIGHT)
 
     def on_mouse_press(self, x, y, button, modifiers):
         """Handle mouse press"""
@@ -251,6 +234,21 @@ class GrandStrategyGame(arcade.Window):
         elif key == arcade.key.P:
             self.make_peace_with_enemies()
 
+        # Toggle tick timing overlay
+        elif key == arcade.key.F3:
+            self.show_profiler = not self.show_profiler
+
+        # Toggle frontline overlay
+        elif key == arcade.key.F4:
+            self.show_frontlines = not self.show_frontlines
+
+        # Quicksave / quickload
+        elif key == arcade.key.F5:
+            save_game(self.game_state, SAVE_DIR / QUICKSAVE_NAME)
+            print("Game saved")
+        elif key == arcade.key.F9:
+            self.quickload()
+
         # Camera movement with arrow keys
         elif key == arcade.key.LEFT:
             self.camera_x -= CAMERA_SPEED / self.zoom_level
@@ -261,6 +259,26 @@ class GrandStrategyGame(arcade.Window):
         elif key == arcade.key.DOWN:
             self.camera_y -= CAMERA_SPEED / self.zoom_level
 
+    def quickload(self):
+        """Load the quicksave into the running game"""
+        path = SAVE_DIR / QUICKSAVE_NAME
+        if not path.exists():
+            print("No quicksave to load")
+            return
+        load_game(self.game_state, path)
+        self.next_autosave_time = self.game_state.game_time + AUTOSAVE_INTERVAL_HOURS
+        print("Game loaded")
+
+    def on_close(self):
+        """Finish any pending autosave and stop the AI workers before exiting"""
+        try:
+            self.autosave_writer.close()
+        except Exception as error:  # A failed background write shouldn't keep the window open
+            print(f"Autosave failed: {error}")
+        finally:
+            self.game_state.ai_controller.close()
+            super().on_close()
+
     def recruit_unit_in_selected_province(self, unit_type):
         """Recruit a unit in the selected province"""
         if not self.game_state.selected_province_id:
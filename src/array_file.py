@@ -0,0 +1,81 @@
+"""
+Binary container for named NumPy arrays
+
+    magic (8 bytes) | header length (uint64) | JSON header | aligned raw arrays
+
+The JSON header holds caller data plus the dtype/shape/offset of every array.
+Arrays are opened with np.memmap, so large ones are only paged in when used.
+Used by the world cache and by full save games.
+"""
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+ARRAY_ALIGNMENT = 64
+
+
+def write_array_file(path, magic: bytes, header: dict, arrays: Dict[str, np.ndarray]):
+    """Write a header and arrays to a container file
+
+    The file is written under a temporary name and renamed into place, so a
+    reader never sees a partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = aligned(offset + array.nbytes)
+
+    encoded = json.dumps(dict(header, arrays=layout)).encode()
+    data_start = aligned(len(magic) + 8 + len(encoded))
+
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(magic)
+        f.write(np.uint64(len(encoded)).tobytes())
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+    temporary.replace(path)
+
+
+def read_array_header(path, magic: bytes) -> Optional[Tuple[dict, int]]:
+    """Read a container's JSON header, returns (header, data offset) or None if unreadable"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(magic)) != magic:
+                return None
+            header_length = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            header = json.loads(f.read(header_length))
+    except (OSError, ValueError, IndexError):
+        return None
+    return header, aligned(len(magic) + 8 + header_length)
+
+
+def map_arrays(path, header: dict, data_start: int) -> Dict[str, np.ndarray]:
+    """Open every array listed in a container header as a read-only memmap"""
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        dtype = np.dtype(spec["dtype"])
+        if 0 in shape:
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        arrays[name] = np.memmap(path, dtype=dtype, mode="r",
+                                 offset=data_start + spec["offset"], shape=shape)
+    return arrays
+
+
+def aligned(offset: int) -> int:
+    """Round an offset up to the array alignment"""
+    return -(-offset // ARRAY_ALIGNMENT) * ARRAY_ALIGNMENT
@@ -22,12 +22,33 @@ ZOOM_SPEED = 0.1
 # Map settings
 MAP_WIDTH = 3200
 MAP_HEIGHT = 1800
+PROVINCE_ID_MAP_PATH = "assets/maps/provinces_id.png"
+
+# Movement settings
+PROVINCE_MOVE_DISTANCE = 40.0  # Distance to cross a province at movement cost 1.0
+PATH_CACHE_SIZE = 4096  # Number of recent paths kept by the pathfinder
+
+# AI settings
+AI_TIME_SLICES = 7  # Countries are spread over this many slices of each week
+AI_FRAME_BUDGET_MS = 4.0  # Wall-clock AI time per frame in the windowed game
+AI_WORKER_PROCESSES = 4  # Processes planning AI turns in the windowed game (0 = main thread)
+# Spawn rather than fork: the game process holds a GL context and runs the autosave
+# thread, and forked children of a multithreaded process can deadlock on inherited locks
+AI_WORKER_START_METHOD = "spawn"
+
+# Save settings
+AUTOSAVE_INTERVAL_HOURS = 24.0 * 7  # Game hours between autosaves
+QUICKSAVE_NAME = "quicksave.sav"
 
 # Colors
 COLOR_OCEAN = (41, 98, 155)
 COLOR_LAND = (139, 137, 112)
-COLOR_BORDER = (50, 50, 50)
+COLOR_BORDER = (50, 50, 50, 90)
+COLOR_COUNTRY_BORDER = (20, 20, 20, 255)
 COLOR_SELECTED_PROVINCE = (255, 255, 0, 100)
+COLOR_FRONTLINE = (220, 40, 40)  # Frontline overlay outlines (F4)
+COLOR_UNOWNED_PROVINCE = (150, 150, 150, 180)
+PROVINCE_FILL_ALPHA = 180  # Alpha of country colours on the political map
 
 # UI Colors
 COLOR_UI_BACKGROUND = (30, 30, 30, 200)
@@ -1,8 +1,13 @@
 """
 Country data structures and management
 """
-from typing import Tuple, List
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass, field
+import numpy as np
+
+# Country fields stored in CountryRelations matrices
+RELATION_FIELDS = ("at_war_with", "allied_with")
 
 
 @dataclass
@@ -20,7 +25,7 @@ class Country:
     military_factories: int = 10
     civilian_factories: int = 10
 
-    # Diplomatic
+    # Diplomatic (views of CountryRelations rows, see __setattr__)
     at_war_with: List[str] = field(default_factory=list)
     allied_with: List[str] = field(default_factory=list)
 
@@ -49,33 +54,202 @@ class Country:
             return True
         return False
 
+    def __setattr__(self, name, value):
+        # Relation lists are written into the relations matrices and replaced by
+        # live views. A country outside a CountryManager gets a private store,
+        # which CountryManager.add_country moves into the shared one.
+        if name in RELATION_FIELDS:
+            relations = self.__dict__.get("relations")
+            if relations is None:
+                relations = CountryRelations()
+                object.__setattr__(self, "relations", relations)
+            relations.set_related(name, self.code, value)
+            value = RelationView(relations, name, self.code)
+        object.__setattr__(self, name, value)
+
     def is_at_war_with(self, country_code: str) -> bool:
         """Check if at war with another country"""
-        return country_code in self.at_war_with
+        return self.relations.has("at_war_with", self.code, country_code)
 
     def declare_war(self, country_code: str):
         """Declare war on another country"""
-        if country_code not in self.at_war_with:
-            self.at_war_with.append(country_code)
+        if not self.is_at_war_with(country_code):
+            self.relations.set_relation("at_war_with", self.code, country_code, True)
             self.war_scores[country_code] = 0
 
     def make_peace(self, country_code: str):
         """Make peace with another country"""
-        if country_code in self.at_war_with:
-            self.at_war_with.remove(country_code)
+        if self.is_at_war_with(country_code):
+            self.relations.set_relation("at_war_with", self.code, country_code, False)
             if country_code in self.war_scores:
                 del self.war_scores[country_code]
 
 
+class RelationView(Sequence):
+    """Read-only list-like view of one country's row in a relations matrix
+
+    Iterates in country index order; membership tests are O(1). Take a
+    list() copy to iterate while making war or peace.
+    """
+
+    __slots__ = ("relations", "name", "code")
+
+    def __init__(self, relations: "CountryRelations", name: str, code: str):
+        self.relations = relations
+        self.name = name
+        self.code = code
+
+    def __getitem__(self, index):
+        return self.relations.get_related(self.name, self.code)[index]
+
+    def __len__(self):
+        return self.relations.count_related(self.name, self.code)
+
+    def __contains__(self, country_code):
+        return self.relations.has(self.name, self.code, country_code)
+
+    def __iter__(self):
+        return iter(self.relations.get_related(self.name, self.code))
+
+    def __eq__(self, other):
+        if isinstance(other, (RelationView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class CountryRelations:
+    """Directed war and alliance matrices over country indexes
+
+    matrices[name][i, j] is True when country i lists country j in its
+    at_war_with / allied_with. Codes get an index on first use, so relations
+    can name countries that haven't been added yet.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.codes: List[str] = []  # index -> country code
+        self.index_of: Dict[str, int] = {}  # country code -> index
+        self.matrices = {name: np.zeros((capacity, capacity), dtype=bool) for name in RELATION_FIELDS}
+
+    def get_index(self, country_code: str) -> int:
+        """Get (assigning if needed) the index of a country code"""
+        index = self.index_of.get(country_code)
+        if index is None:
+            index = len(self.codes)
+            if index == len(self.matrices["at_war_with"]):
+                self._grow()
+            self.codes.append(country_code)
+            self.index_of[country_code] = index
+        return index
+
+    def has(self, name: str, code: str, other: str) -> bool:
+        """Check one relation, e.g. has("at_war_with", "GER", "FRA")"""
+        index = self.index_of.get(code)
+        other_index = self.index_of.get(other)
+        if index is None or other_index is None:
+            return False
+        return bool(self.matrices[name][index, other_index])
+
+    def set_relation(self, name: str, code: str, other: str, value: bool):
+        """Set or clear one relation"""
+        index, other_index = self.get_index(code), self.get_index(other)
+        self.matrices[name][index, other_index] = value
+
+    def set_related(self, name: str, code: str, others: Iterable[str]):
+        """Replace a country's whole row, e.g. its list of enemies"""
+        # Index everything first (this may grow the matrices); others may be a view of this row
+        other_indexes = [self.get_index(other) for other in others]
+        index = self.get_index(code)
+        row = self.matrices[name][index]
+        row[:] = False
+        row[other_indexes] = True
+
+    def related_mask(self, name: str, code: str) -> np.ndarray:
+        """Bool array over country indexes, e.g. all enemies of a country at once"""
+        index = self.index_of.get(code)
+        if index is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.matrices[name][index, :len(self.codes)]
+
+    def get_related(self, name: str, code: str) -> List[str]:
+        """Codes a country is related to, in index order"""
+        return [self.codes[i] for i in np.flatnonzero(self.related_mask(name, code)).tolist()]
+
+    def count_related(self, name: str, code: str) -> int:
+        """Number of countries a country is related to"""
+        return int(np.count_nonzero(self.related_mask(name, code)))
+
+    def find_pair(self, name: str, codes: List[str]) -> Optional[Tuple[str, str]]:
+        """First (a, b) with a before b in codes where either relates to the other, or None
+
+        Unknown codes are skipped.
+        """
+        known = [code for code in codes if code in self.index_of]
+        if len(known) < 2:
+            return None
+        indexes = [self.index_of[code] for code in known]
+        matrix = self.matrices[name]
+        if len(known) == 2:  # The common case, cheaper without building a block
+            if matrix[indexes[0], indexes[1]] or matrix[indexes[1], indexes[0]]:
+                return known[0], known[1]
+            return None
+        block = matrix[np.ix_(indexes, indexes)]
+        pairs = np.argwhere(np.triu(block | block.T, 1))
+        if not len(pairs):
+            return None
+        first, second = pairs[0].tolist()
+        return known[first], known[second]
+
+    def adopt(self, country: "Country"):
+        """Move a country's relations from its own store into this one"""
+        source = country.__dict__.get("relations")
+        object.__setattr__(country, "relations", self)
+        for name in RELATION_FIELDS:
+            related = source.get_related(name, country.code) if source is not None else []
+            setattr(country, name, related)
+
+    def _grow(self):
+        """Double the matrices' size"""
+        capacity = len(self.matrices["at_war_with"]) * 2
+        for name, matrix in self.matrices.items():
+            grown = np.zeros((capacity, capacity), dtype=bool)
+            grown[:len(matrix), :len(matrix)] = matrix
+            self.matrices[name] = grown
+
+
 class CountryManager:
     """Manages all countries in the game"""
 
     def __init__(self):
         self.countries = {}  # country_code -> Country
+        self.relations = CountryRelations()  # War and alliance matrices of every country
 
     def add_country(self, country: Country):
         """Add a country to the manager"""
         self.countries[country.code] = country
+        self.relations.adopt(country)
+
+    def is_at_war(self, code: str, other: str) -> bool:
+        """Check whether a country is at war with another (O(1))"""
+        return self.relations.has("at_war_with", code, other)
+
+    def is_allied(self, code: str, other: str) -> bool:
+        """Check whether a country is allied with another (O(1))"""
+        return self.relations.has("allied_with", code, other)
+
+    def get_enemies(self, code: str) -> List[str]:
+        """Codes of every country a country is at war with"""
+        return self.relations.get_related("at_war_with", code)
+
+    def get_allies(self, code: str) -> List[str]:
+        """Codes of every country a country is allied with"""
+        return self.relations.get_related("allied_with", code)
+
+    def find_hostile_pair(self, codes: List[str]) -> Optional[Tuple[str, str]]:
+        """First pair (a, b) in list order where one is at war with the other, or None"""
+        return self.relations.find_pair("at_war_with", codes)
 
     def get_country(self, code: str) -> Country:
         """Get country by code"""
@@ -4,34 +4,53 @@ Data loading utilities for provinces, countries, and game data
 import json
 import csv
 from pathlib import Path
+import numpy as np
 from src.province import Province
 from src.country import Country
+from src.map_data import (load_adjacency, load_province_geometry, build_label_map,
+                          compute_adjacency, compute_province_geometry, ADJACENCY_CACHE_DIR)
+from src.world_cache import WORLD_CACHE_NAME, source_hashes, read_world_cache, write_world_cache
+from src.constants import PROVINCE_ID_MAP_PATH
 
 
-def load_game_data(game_state):
-    """Load all game data"""
+def load_game_data(game_state, data_dir="data", id_map_path=None,
+                   cache_dir=ADJACENCY_CACHE_DIR):
+    """Load all game data
+
+    When the province ID map is given, the map data (label map, adjacency and
+    geometry) is loaded too, and everything comes from a compiled world cache
+    in cache_dir that is rebuilt whenever a source file changes.
+    """
+    if id_map_path is not None:
+        world_files = [Path(data_dir) / "provinces.csv", Path(data_dir) / "countries.json",
+                       Path(id_map_path)]
+        if all(path.exists() for path in world_files):
+            load_world(game_state, data_dir, id_map_path, cache_dir)
+            return
+
     # Load provinces
-    load_provinces(game_state.province_manager)
+    load_provinces(game_state.province_manager, data_dir)
 
     # Load countries
-    load_countries(game_state.country_manager)
+    load_countries(game_state.country_manager, data_dir)
 
     # Assign province ownership based on country definitions
     assign_province_ownership(game_state)
 
 
-def load_provinces(province_manager):
+def load_provinces(province_manager, data_dir="data"):
     """Load provinces from CSV file"""
-    csv_path = Path("data/provinces.csv")
+    csv_path = Path(data_dir) / "provinces.csv"
 
     if not csv_path.exists():
         print(f"Warning: {csv_path} not found, creating sample data...")
         create_sample_provinces()
 
+    provinces = []
     with open(csv_path, 'r') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            province = Province(
+            provinces.append(Province.from_fields(
                 province_id=int(row['id']),
                 name=row['name'],
                 color_rgb=(int(row['r']), int(row['g']), int(row['b'])),
@@ -39,13 +58,13 @@ def load_provinces(province_manager):
                 development=int(row.get('development', 1)),
                 population=int(row.get('population', 1000)),
                 is_coastal=row.get('coastal', '').lower() == 'true'
-            )
-            province_manager.add_province(province)
+            ))
+    province_manager.add_provinces(provinces)
 
 
-def load_countries(country_manager):
+def load_countries(country_manager, data_dir="data"):
     """Load countries from JSON file"""
-    json_path = Path("data/countries.json")
+    json_path = Path(data_dir) / "countries.json"
 
     if not json_path.exists():
         print(f"Warning: {json_path} not found, creating sample data...")
@@ -53,19 +72,25 @@ def load_countries(country_manager):
 
     with open(json_path, 'r') as f:
         data = json.load(f)
-        for code, country_data in data.items():
-            country = Country(
-                code=code,
-                name=country_data['name'],
-                color=tuple(country_data['color']),
-                capital_province_id=country_data['capital'],
-                money=country_data.get('money', 1000.0),
-                manpower=country_data.get('manpower', 10000),
-                military_factories=country_data.get('military_factories', 10),
-                civilian_factories=country_data.get('civilian_factories', 10)
-            )
-            country.provinces = country_data.get('provinces', [])
-            country_manager.add_country(country)
+    add_countries(country_manager, data)
+    return data
+
+
+def add_countries(country_manager, data: dict):
+    """Create countries from countries.json data"""
+    for code, country_data in data.items():
+        country = Country(
+            code=code,
+            name=country_data['name'],
+            color=tuple(country_data['color']),
+            capital_province_id=country_data['capital'],
+            money=country_data.get('money', 1000.0),
+            manpower=country_data.get('manpower', 10000),
+            military_factories=country_data.get('military_factories', 10),
+            civilian_factories=country_data.get('civilian_factories', 10)
+        )
+        country.provinces = country_data.get('provinces', [])
+        country_manager.add_country(country)
 
 
 def assign_province_ownership(game_state):
@@ -81,6 +106,120 @@ def assign_province_ownership(game_state):
                         province.is_capital = True
 
 
+def load_map_data(province_manager, id_map_path=PROVINCE_ID_MAP_PATH,
+                  cache_dir=ADJACENCY_CACHE_DIR) -> bool:
+    """Load province adjacency and geometry from the ID map, returns False if there is no map"""
+    if not Path(id_map_path).exists():
+        return False
+
+    offsets, neighbors = load_adjacency(id_map_path, province_manager, cache_dir=cache_dir)
+    province_manager.set_adjacency(offsets, neighbors)
+    centroids, areas, boxes = load_province_geometry(id_map_path, province_manager,
+                                                     cache_dir=cache_dir)
+    province_manager.set_geometry(centroids, areas, boxes)
+    return True
+
+
+def load_world(game_state, data_dir, id_map_path, cache_dir=ADJACENCY_CACHE_DIR):
+    """Load provinces, countries and map data through the compiled world cache"""
+    data_dir = Path(data_dir)
+    sources = {"provinces": data_dir / "provinces.csv",
+               "countries": data_dir / "countries.json",
+               "id_map": Path(id_map_path)}
+    hashes = source_hashes(sources)
+    cache_path = Path(cache_dir) / WORLD_CACHE_NAME
+    cached = read_world_cache(cache_path, hashes)
+    province_manager = game_state.province_manager
+
+    if cached is not None:
+        arrays = cached["arrays"]
+        tables = cached["tables"]
+        restore_provinces(province_manager, arrays, tables["terrains"], tables["owners"])
+        add_countries(game_state.country_manager, tables["countries"])
+        labels = arrays["labels"]
+        # Plain ndarray views of the memmaps: per-element indexing of a np.memmap
+        # (as the pathfinder does) goes through a slow Python-level __getitem__
+        offsets, neighbors, centroids, areas, boxes = (
+            np.asarray(arrays[name]) for name in ("adjacency_offsets", "adjacency_neighbors",
+                                                  "centroids", "areas", "bounding_boxes"))
+    else:
+        from PIL import Image  # Only needed when the cache misses
+        load_provinces(province_manager, data_dir)
+        countries = load_countries(game_state.country_manager, data_dir)
+        assign_province_ownership(game_state)
+        with Image.open(id_map_path) as image:
+            labels = build_label_map(image, province_manager)
+        offsets, neighbors = compute_adjacency(labels, province_manager.columns.size)
+        centroids, areas, boxes = compute_province_geometry(labels, province_manager.columns.size)
+
+        arrays, tables = province_arrays(province_manager)
+        arrays.update(labels=labels, adjacency_offsets=offsets, adjacency_neighbors=neighbors,
+                      centroids=centroids, areas=areas, bounding_boxes=boxes)
+        tables["countries"] = countries
+        write_world_cache(cache_path, hashes, arrays, tables)
+
+    province_manager.label_map = labels
+    province_manager.set_adjacency(offsets, neighbors)
+    province_manager.set_geometry(centroids, areas, boxes)
+
+
+def province_arrays(province_manager):
+    """Province table as arrays in row order for the world cache, plus lookup tables
+
+    Owners are included (as indexes into the "owners" table) so a cached load
+    can skip assign_province_ownership.
+    """
+    provinces = province_manager.province_rows
+    columns = province_manager.columns
+    terrains = sorted({province.terrain_type for province in provinces})
+    terrain_code = {terrain: code for code, terrain in enumerate(terrains)}
+    names = "\x00".join(province.name for province in provinces).encode()
+    arrays = {
+        "province_ids": province_manager.columns.province_ids,
+        "colors": np.array([province.color_rgb for province in provinces],
+                           dtype=np.uint8).reshape(-1, 3),
+        "terrain": np.array([terrain_code[province.terrain_type] for province in provinces],
+                            dtype=np.uint8),
+        "development": province_manager.columns.column("development"),
+        "population": province_manager.columns.column("population"),
+        "coastal": np.array([province.is_coastal for province in provinces], dtype=bool),
+        "names": np.frombuffer(names, dtype=np.uint8),
+        "owner": columns.owner_index,
+        "capital": np.array([province.is_capital for province in provinces], dtype=bool),
+    }
+    return arrays, {"terrains": terrains, "owners": list(columns.owner_codes)}
+
+
+def restore_provinces(province_manager, arrays: dict, terrains: list, owners: list):
+    """Recreate provinces (with their owners) from world cache arrays"""
+    names = arrays["names"].tobytes().decode().split("\x00")
+    terrain_names = [terrains[code] for code in arrays["terrain"].tolist()]
+    owner_codes = owners + [None]  # NO_OWNER (-1) selects None
+    owner_names = [owner_codes[index] for index in arrays["owner"].tolist()]
+    colors = [tuple(color) for color in arrays["colors"].tolist()]
+    provinces = [
+        Province.from_fields(province_id=province_id, name=name, color_rgb=color,
+                             terrain_type=terrain, development=development,
+                             population=population, is_coastal=coastal, owner=owner,
+                             is_capital=capital)
+        for province_id, name, color, terrain, development, population, coastal, owner, capital
+        in zip(arrays["province_ids"].tolist(), names, colors, terrain_names,
+               arrays["development"].tolist(), arrays["population"].tolist(),
+               arrays["coastal"].tolist(), owner_names, arrays["capital"].tolist())
+    ]
+    province_manager.add_provinces(provinces)
+
+
+def create_starting_units(game_state):
+    """Give each country its starting units"""
+    for country in game_state.country_manager.get_all_countries():
+        capital = game_state.province_manager.get_province(country.capital_province_id)
+        if capital:
+            # Create 2 infantry units at capital
+            game_state.military_system.create_unit("infantry", country.code, capital.province_id)
+            game_state.military_system.create_unit("infantry", country.code, capital.province_id)
+
+
 def create_sample_provinces():
     """Create sample province data for testing"""
     Path("data").mkdir(exist_ok=True)
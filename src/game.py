@@ -1,7 +1,6 @@
 """
 Main game state and logic
 """
-import arcade
 from typing import Optional
 from src.province import ProvinceManager
 from src.country import CountryManager
@@ -11,13 +10,16 @@ from src.systems.military import MilitarySystem
 from src.systems.combat import CombatSystem
 from src.systems.diplomacy import DiplomacySystem
 from src.systems.ai import AIController
+from src.systems.frontline import FrontlineService
+from src.profiling import TickProfiler
+from src.rng import RandomStreams
 from src.constants import *
 
 
 class GameState:
     """Manages the overall game state"""
 
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.province_manager = ProvinceManager()
         self.country_manager = CountryManager()
         self.unit_template_manager = UnitTemplateManager()
@@ -28,6 +30,14 @@ class GameState:
         self.combat_system = None
         self.diplomacy_system = None
         self.ai_controller = None
+        self.frontline_service = None
+
+        # Seeded random streams (same seed -> same game)
+        self.rng = RandomStreams(seed)
+        self.seed = self.rng.seed
+
+        # Per-system tick timing
+        self.profiler = TickProfiler()
 
         # Game time
         self.game_time = 0.0  # Time in game hours
@@ -54,6 +64,7 @@ class GameState:
         self.military_system = MilitarySystem(self)
         self.combat_system = CombatSystem(self)
         self.diplomacy_system = DiplomacySystem(self)
+        self.frontline_service = FrontlineService(self)
         self.ai_controller = AIController(self)
 
     def update(self, delta_time: float):
@@ -65,21 +76,27 @@ class GameState:
             # Update game systems
             scaled_delta = delta_time * self.game_speed
 
+            profiler = self.profiler
+
             if self.economy_system:
-                self.economy_system.update(scaled_delta)
+                profiler.time_call("economy", self.economy_system.update, scaled_delta)
 
             if self.military_system:
-                self.military_system.update(scaled_delta)
+                profiler.time_call("military", self.military_system.update, scaled_delta)
 
             if self.combat_system:
-                self.combat_system.update(scaled_delta)
+                profiler.time_call("combat", self.combat_system.update, scaled_delta)
 
             if self.ai_controller:
-                self.ai_controller.update(scaled_delta)
+                profiler.time_call("ai", self.ai_controller.update, scaled_delta)
 
             # Check for auto-peace at 100% war score
             if self.diplomacy_system:
-                self.diplomacy_system.auto_peace_at_100()
+                profiler.time_call("diplomacy", self.diplomacy_system.auto_peace_at_100)
+
+    def get_system_timings(self) -> dict:
+        """Get timing summaries (mean/p50/p99/max ms and call count) per game system"""
+        return self.profiler.get_summary()
 
     def toggle_pause(self):
         """Toggle pause state"""
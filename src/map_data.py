@@ -0,0 +1,333 @@
+"""
+Province ID map analysis (label maps, adjacency) using NumPy
+
+Nothing in here depends on arcade, so it can run in headless tools.
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+ADJACENCY_CACHE_DIR = Path("assets/maps/cache")
+PALETTE_WIDTH = 4096  # Texels per palette row (within every GPU's max texture size)
+
+
+def pack_rgb(rgb: np.ndarray) -> np.ndarray:
+    """Pack an (..., 3) uint8 RGB array into uint32 values 0xRRGGBB"""
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def label_dtype(province_count: int):
+    """Smallest unsigned dtype that can hold every row index plus the sentinel"""
+    return np.uint16 if province_count < np.iinfo(np.uint16).max else np.uint32
+
+
+def no_province_label(dtype) -> int:
+    """Sentinel label for pixels that don't belong to any province (e.g. ocean)"""
+    return int(np.iinfo(dtype).max)
+
+
+def packed_province_colors(province_manager) -> np.ndarray:
+    """Packed ID map colour of each province, in province row order"""
+    provinces = province_manager.provinces
+    colors = [provinces[int(province_id)].color_rgb
+              for province_id in province_manager.columns.province_ids]
+    return pack_rgb(np.array(colors, dtype=np.uint8).reshape(-1, 3))
+
+
+def build_label_map(image, province_manager) -> np.ndarray:
+    """Decode a PIL ID map image into a 2D array of province row indexes
+
+    Pixels whose colour matches no province get no_province_label(dtype).
+    """
+    packed = pack_rgb(np.asarray(image.convert("RGB")))
+    colors = packed_province_colors(province_manager)
+    dtype = label_dtype(len(colors))
+    labels = np.full(packed.shape, no_province_label(dtype), dtype=dtype)
+    if len(colors) == 0:
+        return labels
+
+    order = np.argsort(colors, kind="stable")
+    sorted_colors = colors[order]
+    positions = np.searchsorted(sorted_colors, packed)
+    positions = np.minimum(positions, len(sorted_colors) - 1)
+    matched = sorted_colors[positions] == packed
+    labels[matched] = order[positions[matched]]
+    return labels
+
+
+def palette_texel(row: int) -> Tuple[int, int]:
+    """(x, y) of a province row's texel in a palette texture"""
+    return row % PALETTE_WIDTH, row // PALETTE_WIDTH
+
+
+def build_owner_palette(province_manager, owner_colors: dict, unowned_color) -> np.ndarray:
+    """Build the RGBA palette (one texel per province row) for the political map
+
+    owner_colors maps country codes to RGBA tuples; provinces whose owner is
+    missing from it get unowned_color. Returns a (rows, PALETTE_WIDTH, 4)
+    uint8 array laid out as described by palette_texel().
+    """
+    columns = province_manager.columns
+    # One entry per owner index, plus unowned last so NO_OWNER (-1) selects it
+    table = np.array([owner_colors.get(code, unowned_color) for code in columns.owner_codes]
+                     + [unowned_color], dtype=np.uint8).reshape(-1, 4)
+
+    height = max(1, -(-columns.size // PALETTE_WIDTH))
+    palette = np.zeros((height * PALETTE_WIDTH, 4), dtype=np.uint8)
+    palette[:columns.size] = table[columns.owner_index]
+    return palette.reshape(height, PALETTE_WIDTH, 4)
+
+
+def compute_adjacency(labels: np.ndarray, province_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Build a CSR adjacency graph from a label map
+
+    Two provinces are adjacent when they share a horizontal or vertical pixel
+    edge. Returns (offsets, neighbors): the neighbours of row r are
+    neighbors[offsets[r]:offsets[r + 1]], sorted ascending.
+    """
+    sentinel = no_province_label(labels.dtype)
+    sources = []
+    targets = []
+    for a, b in ((labels[:, :-1], labels[:, 1:]), (labels[:-1, :], labels[1:, :])):
+        mask = (a != b) & (a != sentinel) & (b != sentinel)
+        sources.extend((a[mask], b[mask]))
+        targets.extend((b[mask], a[mask]))
+
+    source = np.concatenate(sources).astype(np.int64)
+    target = np.concatenate(targets).astype(np.int64)
+    keys = np.unique(source * province_count + target)
+    source = keys // province_count
+    target = keys % province_count
+
+    offsets = np.zeros(province_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source, minlength=province_count), out=offsets[1:])
+    return offsets, target.astype(np.int32)
+
+
+def file_hash(path) -> str:
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_adjacency(id_map_path, province_manager, labels: np.ndarray = None,
+                   cache_dir=ADJACENCY_CACHE_DIR) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the CSR adjacency for an ID map, using a cache keyed by the map's hash
+
+    The cache also stores the province colours in row order, so edits to the
+    province table that change row assignments invalidate it. Pass an already
+    decoded label map to avoid decoding the image again on a cache miss.
+    """
+    colors = packed_province_colors(province_manager)
+    cache_path = Path(cache_dir) / f"adjacency_{file_hash(id_map_path)}.npz"
+
+    cached = _read_cache(cache_path, colors, ("offsets", "neighbors"))
+    if cached is not None:
+        return cached["offsets"], cached["neighbors"]
+
+    if labels is None:
+        from PIL import Image  # Only needed when the cache misses
+        labels = build_label_map(Image.open(id_map_path), province_manager)
+    offsets, neighbors = compute_adjacency(labels, len(colors))
+    _write_cache(cache_path, colors, offsets=offsets, neighbors=neighbors)
+
+    return offsets, neighbors
+
+
+def compute_province_geometry(labels: np.ndarray, province_count: int
+                              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-row centroid, pixel area and bounding box from a label map
+
+    Returns (centroids, areas, bounding_boxes) in world coordinates (one unit
+    per pixel, Y up): centroids is (n, 2) x, y; bounding_boxes is (n, 4)
+    left, bottom, right, top. Provinces with no pixels have area 0 and NaN
+    centroid/box.
+    """
+    height, width = labels.shape
+    flat = labels.ravel()
+    pixels = np.flatnonzero(flat != no_province_label(labels.dtype))
+    rows = flat[pixels].astype(np.int64)
+    ys, xs = np.divmod(pixels, width)
+
+    areas = np.bincount(rows, minlength=province_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.bincount(rows, weights=xs, minlength=province_count) / areas
+        mean_y = np.bincount(rows, weights=ys, minlength=province_count) / areas
+    centroids = np.stack([mean_x + 0.5, height - (mean_y + 0.5)], axis=1)
+
+    boxes = np.full((province_count, 4), np.nan)
+    left = np.full(province_count, width, dtype=np.int64)
+    right = np.full(province_count, -1, dtype=np.int64)
+    top = np.full(province_count, height, dtype=np.int64)
+    bottom = np.full(province_count, -1, dtype=np.int64)
+    np.minimum.at(left, rows, xs)
+    np.maximum.at(right, rows, xs)
+    np.minimum.at(top, rows, ys)
+    np.maximum.at(bottom, rows, ys)
+    present = areas > 0
+    boxes[present] = np.stack([left, height - (bottom + 1), right + 1, height - top], axis=1)[present]
+
+    return centroids, areas, boxes
+
+
+def load_province_geometry(id_map_path, province_manager, labels: np.ndarray = None,
+                           cache_dir=ADJACENCY_CACHE_DIR
+                           ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get province centroids, areas and bounding boxes, cached like load_adjacency"""
+    colors = packed_province_colors(province_manager)
+    cache_path = Path(cache_dir) / f"geometry_{file_hash(id_map_path)}.npz"
+
+    cached = _read_cache(cache_path, colors, ("centroids", "areas", "bounding_boxes"))
+    if cached is not None:
+        return cached["centroids"], cached["areas"], cached["bounding_boxes"]
+
+    if labels is None:
+        from PIL import Image  # Only needed when the cache misses
+        labels = build_label_map(Image.open(id_map_path), province_manager)
+    centroids, areas, boxes = compute_province_geometry(labels, len(colors))
+    _write_cache(cache_path, colors, centroids=centroids, areas=areas, bounding_boxes=boxes)
+
+    return centroids, areas, boxes
+
+
+def extract_borders(labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Extract province borders from a label map as merged straight segments
+
+    Returns (pairs, lines). pairs[i] is (row_a, row_b) with row_a < row_b;
+    coastlines have the no-province sentinel as row_b. lines[i] is
+    (x0, y0, x1, y1) in world coordinates (one unit per pixel, Y up). Runs of
+    pixel edges on the same line between the same two provinces are merged
+    into one segment.
+    """
+    height = labels.shape[0]
+    pairs = []
+    lines = []
+
+    # Vertical edges lie between columns x - 1 and x, running along image rows
+    a, b = labels[:, :-1], labels[:, 1:]
+    image_rows, columns = np.nonzero(a != b)
+    low, high, line, start, end = _merge_edges(a[image_rows, columns], b[image_rows, columns],
+                                               columns + 1, image_rows)
+    pairs.append(np.stack([low, high], axis=1))
+    lines.append(np.stack([line, height - start, line, height - end], axis=1))
+
+    # Horizontal edges lie between image rows y - 1 and y, running along columns
+    a, b = labels[:-1, :], labels[1:, :]
+    image_rows, columns = np.nonzero(a != b)
+    low, high, line, start, end = _merge_edges(a[image_rows, columns], b[image_rows, columns],
+                                               image_rows + 1, columns)
+    pairs.append(np.stack([low, high], axis=1))
+    lines.append(np.stack([start, height - line, end, height - line], axis=1))
+
+    return np.concatenate(pairs), np.concatenate(lines).astype(np.float32)
+
+
+def _merge_edges(a, b, line, along):
+    """Merge unit pixel edges into runs of consecutive edges per province pair"""
+    a = a.astype(np.int64)
+    b = b.astype(np.int64)
+    low, high = np.minimum(a, b), np.maximum(a, b)
+    order = np.lexsort((along, line, high, low))
+    low, high, line, along = low[order], high[order], line[order], along[order]
+
+    starts = np.ones(len(low), dtype=bool)
+    starts[1:] = ((low[1:] != low[:-1]) | (high[1:] != high[:-1])
+                  | (line[1:] != line[:-1]) | (along[1:] != along[:-1] + 1))
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], len(low)) - 1
+    return low[first], high[first], line[first], along[first], along[last] + 1
+
+
+def load_borders(id_map_path, province_manager, labels: np.ndarray = None,
+                 cache_dir=ADJACENCY_CACHE_DIR) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the border segments for an ID map, cached like load_adjacency"""
+    colors = packed_province_colors(province_manager)
+    cache_path = Path(cache_dir) / f"borders_{file_hash(id_map_path)}.npz"
+
+    cached = _read_cache(cache_path, colors, ("pairs", "lines"))
+    if cached is not None:
+        return cached["pairs"], cached["lines"]
+
+    if labels is None:
+        from PIL import Image  # Only needed when the cache misses
+        labels = build_label_map(Image.open(id_map_path), province_manager)
+    pairs, lines = extract_borders(labels)
+    _write_cache(cache_path, colors, pairs=pairs, lines=lines)
+
+    return pairs, lines
+
+
+def _read_cache(cache_path: Path, colors: np.ndarray, keys) -> Optional[dict]:
+    """Read arrays from an npz cache, or None if it's missing, stale or unreadable"""
+    if not cache_path.exists():
+        return None
+    try:
+        with np.load(cache_path) as cached:
+            if np.array_equal(cached["colors"], colors):
+                return {key: cached[key] for key in keys}
+    except (OSError, KeyError, ValueError):
+        pass  # Unreadable cache, the caller rebuilds it
+    return None
+
+
+def _write_cache(cache_path: Path, colors: np.ndarray, **arrays):
+    """Write arrays to an npz cache stamped with the province colours"""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "wb") as f:
+        np.savez(f, colors=colors, **arrays)
+
+
+class ProvinceBorders:
+    """Border segments with a per-segment country-border flag kept up to date
+
+    A segment is a country border when the provinces on either side have
+    different owners; coastlines always count as country borders. Ownership
+    changes only reclassify the segments touching the changed provinces.
+    """
+
+    def __init__(self, pairs: np.ndarray, lines: np.ndarray, province_count: int):
+        self.pairs = pairs
+        self.lines = lines
+        self.coastal = pairs[:, 1] >= province_count
+
+        # CSR index: segments touching province row r are
+        # segment_index[segment_offsets[r]:segment_offsets[r + 1]]
+        segment_ids = np.arange(len(pairs))
+        owners = np.concatenate([pairs[:, 0], pairs[:, 1][~self.coastal]])
+        touching = np.concatenate([segment_ids, segment_ids[~self.coastal]])
+        order = np.argsort(owners, kind="stable")
+        self.segment_index = touching[order]
+        self.segment_offsets = np.zeros(province_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=province_count), out=self.segment_offsets[1:])
+
+        self.is_country_border = np.zeros(len(pairs), dtype=bool)
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def classify_all(self, owner_index: np.ndarray):
+        """Recompute every segment's flag from the owner index column"""
+        self.is_country_border = self._classify(np.arange(len(self.pairs)), owner_index)
+
+    def update_rows(self, rows, owner_index: np.ndarray) -> np.ndarray:
+        """Reclassify the segments touching some province rows, returns those that changed"""
+        segments = np.unique(np.concatenate(
+            [self.segment_index[self.segment_offsets[row]:self.segment_offsets[row + 1]]
+             for row in rows]
+        )) if len(rows) else np.empty(0, dtype=np.int64)
+        flags = self._classify(segments, owner_index)
+        changed = segments[flags != self.is_country_border[segments]]
+        self.is_country_border[segments] = flags
+        return changed
+
+    def _classify(self, segments: np.ndarray, owner_index: np.ndarray) -> np.ndarray:
+        """Country-border flags for some segments"""
+        low = self.pairs[segments, 0]
+        high = np.where(self.coastal[segments], low, self.pairs[segments, 1])
+        return self.coastal[segments] | (owner_index[low] != owner_index[high])
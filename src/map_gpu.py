@@ -0,0 +1,283 @@
+"""
+GPU-side map layers
+
+The political map is drawn as one textured quad: a fragment shader looks up
+each pixel's province row in a label texture and recolours it through a
+palette texture holding one RGBA texel per province. Borders are a single
+line buffer whose per-vertex country flag is patched when ownership changes.
+"""
+import arcade
+import numpy as np
+from typing import Optional, Set
+from arcade.gl import BufferDescription, geometry
+from src.constants import (COLOR_UNOWNED_PROVINCE, PROVINCE_FILL_ALPHA,
+                           COLOR_BORDER, COLOR_COUNTRY_BORDER)
+from src.map_data import (PALETTE_WIDTH, ProvinceBorders, build_owner_palette,
+                          palette_texel)
+
+POLITICAL_VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+uniform vec2 map_size;
+
+in vec2 in_vert;
+in vec2 in_uv;
+
+out vec2 v_uv;
+
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_vert * map_size, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
+
+POLITICAL_FRAGMENT_SHADER = """
+#version 330
+
+uniform usampler2D labels;
+uniform sampler2D palette;
+uniform uint no_province;
+uniform int palette_width;
+
+in vec2 v_uv;
+
+out vec4 f_color;
+
+void main() {
+    ivec2 size = textureSize(labels, 0);
+    ivec2 texel = min(ivec2(v_uv * vec2(size)), size - 1);
+    uint label = texelFetch(labels, texel, 0).r;
+    if (label == no_province) {
+        discard;
+    }
+    int row = int(label);
+    f_color = texelFetch(palette, ivec2(row % palette_width, row / palette_width), 0);
+}
+"""
+
+BORDER_VERTEX_SHADER = """
+#version 330
+
+uniform WindowBlock {
+    mat4 projection;
+    mat4 view;
+} window;
+
+uniform float zoom;
+
+in vec2 in_vert;
+in float in_country;
+
+out float v_country;
+
+void main() {
+    gl_Position = window.projection * window.view * vec4(in_vert * zoom, 0.0, 1.0);
+    v_country = in_country;
+}
+"""
+
+BORDER_FRAGMENT_SHADER = """
+#version 330
+
+uniform vec4 province_color;
+uniform vec4 country_color;
+
+in float v_country;
+
+out vec4 f_color;
+
+void main() {
+    f_color = mix(province_color, country_color, v_country);
+}
+"""
+
+
+def normalized_color(color):
+    """Convert an RGB(A) 0-255 colour to an RGBA 0-1 tuple for shader uniforms"""
+    rgba = tuple(color) + (255,) * (4 - len(color))
+    return tuple(component / 255.0 for component in rgba)
+
+
+class PoliticalMapLayer:
+    """Province fill coloured by owner, drawn in a single draw call
+
+    Ownership changes only mark the province's palette texel dirty; the next
+    draw writes just those texels. GL resources are created on the first draw,
+    so the layer can be built before a window exists.
+    """
+
+    def __init__(self, province_manager, label_map: np.ndarray, no_province: int):
+        self.province_manager = province_manager
+        self.label_map = label_map
+        self.no_province = no_province
+
+        # CPU copy of the palette, rebuilt when the layer is (re)initialised
+        self.palette: Optional[np.ndarray] = None
+        self.dirty_rows: Set[int] = set()
+        self.rebuild_palette = True
+
+        self.program = None
+        self.quad = None
+        self.label_texture = None
+        self.palette_texture = None
+
+        province_manager.add_owner_listener(self.on_owner_changed)
+
+    def on_owner_changed(self, province, old_owner, new_owner):
+        """Owner listener: queue the province's palette texel for upload"""
+        row = self.province_manager.columns.row_of.get(province.province_id)
+        if row is not None:
+            self.dirty_rows.add(row)
+
+    def owner_color(self, country_manager, country_code):
+        """Palette colour for an owner"""
+        country = country_manager.get_country(country_code) if country_code else None
+        if country is None:
+            return COLOR_UNOWNED_PROVINCE
+        return tuple(country.color) + (PROVINCE_FILL_ALPHA,)
+
+    def draw(self, zoom: float, country_manager):
+        """Draw the political map with its bottom-left corner at the world origin"""
+        if self.program is None:
+            self._create_gl_resources()
+        self._update_palette(country_manager)
+
+        height, width = self.label_map.shape
+        self.program["map_size"] = (width * zoom, height * zoom)
+        self.label_texture.use(0)
+        self.palette_texture.use(1)
+        self.quad.render(self.program)
+
+    def _create_gl_resources(self):
+        """Create the shader program, quad and textures"""
+        ctx = arcade.get_window().ctx
+        self.program = ctx.program(vertex_shader=POLITICAL_VERTEX_SHADER,
+                                   fragment_shader=POLITICAL_FRAGMENT_SHADER)
+        self.program["labels"] = 0
+        self.program["palette"] = 1
+        self.program["no_province"] = self.no_province
+        self.program["palette_width"] = PALETTE_WIDTH
+        self.quad = geometry.quad_2d(size=(1.0, 1.0), pos=(0.5, 0.5))
+
+        # GL rows start at the bottom, the label map's rows start at the top
+        height, width = self.label_map.shape
+        dtype = "u2" if self.label_map.dtype == np.uint16 else "u4"
+        self.label_texture = ctx.texture(
+            (width, height), components=1, dtype=dtype,
+            data=np.ascontiguousarray(self.label_map[::-1]).tobytes(),
+            filter=(ctx.NEAREST, ctx.NEAREST),
+        )
+        self.rebuild_palette = True
+
+    def _update_palette(self, country_manager):
+        """Upload the whole palette or only the texels of changed provinces"""
+        if self.rebuild_palette:
+            owner_colors = {country.code: self.owner_color(country_manager, country.code)
+                            for country in country_manager.get_all_countries()}
+            self.palette = build_owner_palette(self.province_manager, owner_colors,
+                                               COLOR_UNOWNED_PROVINCE)
+            height = self.palette.shape[0]
+            if self.palette_texture is None or self.palette_texture.height != height:
+                ctx = arcade.get_window().ctx
+                self.palette_texture = ctx.texture(
+                    (PALETTE_WIDTH, height), components=4,
+                    filter=(ctx.NEAREST, ctx.NEAREST),
+                )
+            self.palette_texture.write(self.palette.tobytes())
+            self.rebuild_palette = False
+            self.dirty_rows.clear()
+            return
+
+        for row in self.dirty_rows:
+            if row >= self.palette.shape[0] * PALETTE_WIDTH:
+                self.rebuild_palette = True  # Province added past the palette's end
+                continue
+            x, y = palette_texel(row)
+            province = self.province_manager.get_province_by_row(row)
+            self.palette[y, x] = self.owner_color(country_manager, province.owner)
+            self.palette_texture.write(self.palette[y, x].tobytes(), viewport=(x, y, 1, 1))
+        self.dirty_rows.clear()
+
+
+class BorderLayer:
+    """Province and country borders drawn as one line buffer
+
+    Segment geometry never changes. Each vertex also carries a country-border
+    flag; ownership changes reclassify only the segments around the changed
+    province and the next draw patches just those flags in the GPU buffer.
+    """
+
+    # Above this fraction of dirty segments one full upload beats many small ones
+    FULL_UPLOAD_FRACTION = 0.125
+
+    def __init__(self, province_manager, borders: ProvinceBorders):
+        self.province_manager = province_manager
+        self.borders = borders
+        borders.classify_all(province_manager.columns.owner_index)
+
+        self.dirty_segments: Set[int] = set()
+        self.upload_all = True
+
+        self.program = None
+        self.geometry = None
+        self.flag_buffer = None
+
+        province_manager.add_owner_listener(self.on_owner_changed)
+
+    def on_owner_changed(self, province, old_owner, new_owner):
+        """Owner listener: reclassify the borders of the changed province"""
+        row = self.province_manager.columns.row_of.get(province.province_id)
+        if row is None or row >= len(self.borders.segment_offsets) - 1:
+            return
+        changed = self.borders.update_rows([row], self.province_manager.columns.owner_index)
+        self.dirty_segments.update(changed.tolist())
+
+    def draw(self, zoom: float):
+        """Draw every border segment scaled by the map zoom"""
+        if len(self.borders) == 0:
+            return
+        if self.program is None:
+            self._create_gl_resources()
+        self._upload_flags()
+
+        self.program["zoom"] = zoom
+        self.geometry.render(self.program)
+
+    def _create_gl_resources(self):
+        """Create the shader program and the vertex/flag buffers"""
+        ctx = arcade.get_window().ctx
+        self.program = ctx.program(vertex_shader=BORDER_VERTEX_SHADER,
+                                   fragment_shader=BORDER_FRAGMENT_SHADER)
+        self.program["province_color"] = normalized_color(COLOR_BORDER)
+        self.program["country_color"] = normalized_color(COLOR_COUNTRY_BORDER)
+
+        # Two vertices per segment; lines is already (x0, y0, x1, y1) per row
+        vertex_buffer = ctx.buffer(data=self.borders.lines.astype(np.float32).tobytes())
+        self.flag_buffer = ctx.buffer(reserve=len(self.borders) * 2 * 4)
+        self.geometry = ctx.geometry(
+            [BufferDescription(vertex_buffer, "2f", ["in_vert"]),
+             BufferDescription(self.flag_buffer, "1f", ["in_country"])],
+            mode=ctx.LINES,
+        )
+        self.upload_all = True
+
+    def _upload_flags(self):
+        """Write changed country-border flags to the GPU"""
+        if len(self.dirty_segments) > len(self.borders) * self.FULL_UPLOAD_FRACTION:
+            self.upload_all = True
+
+        if self.upload_all:
+            flags = np.repeat(self.borders.is_country_border.astype(np.float32), 2)
+            self.flag_buffer.write(flags.tobytes())
+            self.upload_all = False
+        else:
+            for segment in self.dirty_segments:
+                value = float(self.borders.is_country_border[segment])
+                self.flag_buffer.write(np.array([value, value], dtype=np.float32).tobytes(),
+                                       offset=segment * 8)
+        self.dirty_segments.clear()
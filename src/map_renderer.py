@@ -2,26 +2,41 @@
 Map rendering system
 """
 import arcade
-from PIL import Image
-from typing import Optional
+import numpy as np
+from PIL import Image, ImageDraw
+from typing import Optional, List, Sequence, Tuple
 from src.constants import *
 from src.province import Province
+from src.map_data import (load_adjacency, load_borders, load_province_geometry, build_label_map,
+                          no_province_label, ProvinceBorders)
+from src.map_gpu import PoliticalMapLayer, BorderLayer
 
 
 class MapRenderer:
     """Handles rendering of the game map"""
 
-    def __init__(self, province_manager):
+    def __init__(self, province_manager, id_map_path=PROVINCE_ID_MAP_PATH):
         self.province_manager = province_manager
+        self.id_map_path = id_map_path
 
         # ID map for province detection
         self.id_map_image = None
         self.id_map_width = 0
         self.id_map_height = 0
 
+        # Decoded ID map: province row per pixel (image orientation, row 0 at the top)
+        self.label_map: Optional[np.ndarray] = None
+        self.no_province = 0  # Sentinel label for pixels outside any province
+
         # Visual map texture
         self.visual_map_texture = None
 
+        # Province fill coloured on the GPU through an owner palette
+        self.political_layer: Optional[PoliticalMapLayer] = None
+
+        # Border segments extracted from the ID map (cached on disk)
+        self.border_layer: Optional[BorderLayer] = None
+
         # Province shapes for rendering
         self.province_shapes = {}
 
@@ -30,15 +45,49 @@ class MapRenderer:
 
     def load_map(self):
         """Load or create the province ID map"""
-        try:
-            # Try to load existing ID map
-            self.id_map_image = Image.open("assets/maps/provinces_id.png")
-            self.id_map_width, self.id_map_height = self.id_map_image.size
-            print(f"Loaded province ID map: {self.id_map_width}x{self.id_map_height}")
-        except FileNotFoundError:
-            # Create a simple test map
-            print("Province ID map not found, creating test map...")
-            self.create_test_map()
+        if self.province_manager.label_map is not None:
+            # Already decoded (e.g. memory-mapped from the world cache)
+            self.label_map = self.province_manager.label_map
+            self.id_map_height, self.id_map_width = self.label_map.shape
+            print(f"Loaded province ID map from cache: {self.id_map_width}x{self.id_map_height}")
+        else:
+            try:
+                # Try to load existing ID map
+                self.id_map_image = Image.open(self.id_map_path)
+                self.id_map_width, self.id_map_height = self.id_map_image.size
+                print(f"Loaded province ID map: {self.id_map_width}x{self.id_map_height}")
+            except FileNotFoundError:
+                # Create a simple test map
+                print("Province ID map not found, creating test map...")
+                self.create_test_map()
+
+            # Decode the ID map once; picking and bulk queries index this array
+            self.label_map = build_label_map(self.id_map_image, self.province_manager)
+            self.id_map_image.close()
+            self.id_map_image = None
+            self.province_manager.label_map = self.label_map
+
+        self.no_province = no_province_label(self.label_map.dtype)
+        self.political_layer = PoliticalMapLayer(self.province_manager, self.label_map,
+                                                 self.no_province)
+
+        # Province adjacency (cached on disk per ID map)
+        if not self.province_manager.has_adjacency():
+            offsets, neighbors = load_adjacency(self.id_map_path, self.province_manager,
+                                                self.label_map)
+            self.province_manager.set_adjacency(offsets, neighbors)
+
+        # Centroids, areas and bounding boxes (cached alongside adjacency)
+        if not self.province_manager.has_geometry():
+            centroids, areas, boxes = load_province_geometry(
+                self.id_map_path, self.province_manager, self.label_map
+            )
+            self.province_manager.set_geometry(centroids, areas, boxes)
+
+        # Border segments (cached on disk per ID map)
+        pairs, lines = load_borders(self.id_map_path, self.province_manager, self.label_map)
+        borders = ProvinceBorders(pairs, lines, self.province_manager.columns.size)
+        self.border_layer = BorderLayer(self.province_manager, borders)
 
         # Try to load visual map
         try:
@@ -49,7 +98,7 @@ class MapRenderer:
     def create_test_map(self):
         """Create a simple test ID map"""
         from pathlib import Path
-        Path("assets/maps").mkdir(parents=True, exist_ok=True)
+        Path(self.id_map_path).parent.mkdir(parents=True, exist_ok=True)
 
         # Create a 800x600 test map with colored rectangles for provinces
         width, height = 800, 600
@@ -82,12 +131,12 @@ class MapRenderer:
                         pixels[x, y] = province.color_rgb
 
         # Save the test map
-        self.id_map_image.save("assets/maps/provinces_id.png")
-        print(f"Created test ID map at assets/maps/provinces_id.png ({width}x{height})")
+        self.id_map_image.save(self.id_map_path)
+        print(f"Created test ID map at {self.id_map_path} ({width}x{height})")
 
     def get_province_at_point(self, x: float, y: float) -> Optional[Province]:
         """Get the province at a given world coordinate"""
-        if not self.id_map_image:
+        if self.label_map is None:
             return None
 
         # Convert to pixel coordinates
@@ -99,19 +148,59 @@ class MapRenderer:
             return None
 
         # Flip Y coordinate (image coordinates vs screen coordinates)
-        py = self.id_map_height - py - 1
-
-        try:
-            # Get pixel color
-            color = self.id_map_image.getpixel((px, py))
-            # Look up province
-            return self.province_manager.get_province_by_color(color)
-        except:
+        label = self.label_map.item(self.id_map_height - py - 1, px)
+        if label == self.no_province:
             return None
+        return self.province_manager.get_province_by_row(label)
+
+    def get_provinces_in_rect(self, x1: float, y1: float, x2: float, y2: float) -> List[Province]:
+        """Get all provinces with at least one pixel inside a world-space rectangle"""
+        if self.label_map is None:
+            return []
+
+        left, right = sorted((int(x1), int(x2)))
+        bottom, top = sorted((int(y1), int(y2)))
+        left, right = max(0, left), min(self.id_map_width - 1, right)
+        bottom, top = max(0, bottom), min(self.id_map_height - 1, top)
+        if left > right or bottom > top:
+            return []
+
+        # Flip Y: world bottom/top become image rows
+        region = self.label_map[self.id_map_height - 1 - top:self.id_map_height - bottom,
+                                left:right + 1]
+        return self._provinces_for_labels(region)
+
+    def get_provinces_in_polygon(self, points: Sequence[Tuple[float, float]]) -> List[Province]:
+        """Get all provinces with at least one pixel inside a world-space polygon (lasso)"""
+        if self.label_map is None or len(points) < 3:
+            return []
+
+        # Rasterize the polygon over its bounding box only
+        image_points = [(x, self.id_map_height - 1 - y) for x, y in points]
+        xs = [p[0] for p in image_points]
+        ys = [p[1] for p in image_points]
+        left, right = max(0, int(min(xs))), min(self.id_map_width - 1, int(max(xs)))
+        top, bottom = max(0, int(min(ys))), min(self.id_map_height - 1, int(max(ys)))
+        if left > right or top > bottom:
+            return []
+
+        mask_image = Image.new("1", (right - left + 1, bottom - top + 1), 0)
+        ImageDraw.Draw(mask_image).polygon(
+            [(x - left, y - top) for x, y in image_points], fill=1
+        )
+        mask = np.asarray(mask_image, dtype=bool)
+        region = self.label_map[top:bottom + 1, left:right + 1]
+        return self._provinces_for_labels(region[mask])
+
+    def _provinces_for_labels(self, labels: np.ndarray) -> List[Province]:
+        """Map an array of labels to the distinct provinces it contains"""
+        rows = np.unique(labels)
+        rows = rows[rows != self.no_province]
+        return [self.province_manager.get_province_by_row(row) for row in rows.tolist()]
 
     def draw(self, camera_x, camera_y, zoom, selected_province_id, country_manager):
         """Draw the map"""
-        if not self.id_map_image:
+        if self.label_map is None:
             return
 
         # Draw provinces
@@ -125,95 +214,37 @@ class MapRenderer:
         self.draw_borders(camera_x, camera_y, zoom)
 
     def draw_provinces(self, camera_x, camera_y, zoom, country_manager):
-        """Draw all provinces with country colors"""
-        # For now, draw simple rectangles based on the test map grid
-        provinces_list = list(self.province_manager.provinces.values())
-        grid_cols = 3
-        grid_rows = 3
-        cell_width = self.id_map_width // grid_cols
-        cell_height = self.id_map_height // grid_rows
-
-        for i, province in enumerate(provinces_list[:9]):
-            col = i % grid_cols
-            row = i // grid_cols
-
-            x = col * cell_width + cell_width // 2
-            y = row * cell_height + cell_height // 2
-
-            # Get country color if province is owned
-            if province.owner:
-                country = country_manager.get_country(province.owner)
-                if country:
-                    color = tuple(country.color) + (180,)  # Add alpha
-                else:
-                    color = (150, 150, 150, 180)  # Gray for unowned
-            else:
-                color = (150, 150, 150, 180)  # Gray for unowned
-
-            # Draw province rectangle
-            arcade.draw_rectangle_filled(
-                x * zoom,
-                y * zoom,
-                cell_width * zoom,
-                cell_height * zoom,
-                color
-            )
+        """Draw all provinces with country colors (one draw call via the palette shader)"""
+        self.political_layer.draw(zoom, country_manager)
 
     def draw_province_highlight(self, province_id, camera_x, camera_y, zoom):
         """Draw highlight for selected province"""
-        province = self.province_manager.get_province(province_id)
-        if not province:
+        box = self.province_manager.get_bounding_box(province_id)
+        if box is None:
             return
 
-        # Find province position in grid
-        provinces_list = list(self.province_manager.provinces.values())
-        try:
-            i = provinces_list.index(province)
-        except ValueError:
-            return
-
-        grid_cols = 3
-        cell_width = self.id_map_width // grid_cols
-        cell_height = self.id_map_height // grid_cols
-
-        col = i % grid_cols
-        row = i // grid_cols
-
-        x = col * cell_width + cell_width // 2
-        y = row * cell_height + cell_height // 2
-
-        # Draw highlight outline
-        arcade.draw_rectangle_outline(
-            x * zoom,
-            y * zoom,
-            cell_width * zoom,
-            cell_height * zoom,
+        # Draw highlight outline around the province's bounding box
+        left, bottom, right, top = box
+        arcade.draw_lrbt_rectangle_outline(
+            left * zoom,
+            right * zoom,
+            bottom * zoom,
+            top * zoom,
             (255, 255, 0),
             4
         )
 
-    def draw_borders(self, camera_x, camera_y, zoom):
-        """Draw province and country borders"""
-        # Draw simple grid borders for test map
-        grid_cols = 3
-        grid_rows = 3
-        cell_width = self.id_map_width // grid_cols
-        cell_height = self.id_map_height // grid_rows
-
-        # Vertical lines
-        for i in range(1, grid_cols):
-            x = i * cell_width * zoom
-            arcade.draw_line(
-                x, 0,
-                x, self.id_map_height * zoom,
-                COLOR_BORDER, 2
+    def draw_frontline_overlay(self, province_ids, zoom):
+        """Outline frontline provinces (e.g. FrontlineService.get_war_frontline)"""
+        for province_id in province_ids:
+            box = self.province_manager.get_bounding_box(province_id)
+            if box is None:
+                continue
+            left, bottom, right, top = box
+            arcade.draw_lrbt_rectangle_outline(
+                left * zoom, right * zoom, bottom * zoom, top * zoom, COLOR_FRONTLINE, 2
             )
 
-        # Horizontal lines
-        for i in range(1, grid_rows):
-            y = i * cell_height * zoom
-            arcade.draw_line(
-                0, y,
-                self.id_map_width * zoom, y,
-                COLOR_BORDER, 2
-            )
+    def draw_borders(self, camera_x, camera_y, zoom):
+        """Draw province and country borders"""
+        self.border_layer.draw(zoom)
@@ -0,0 +1,85 @@
+"""
+Lightweight per-system tick timing
+"""
+import time
+from typing import Dict, List
+
+
+class TimingStats:
+    """Rolling timing statistics for one system
+
+    Mean and percentiles cover the last `window` samples; max and count cover
+    the whole run. Recording is O(1); percentiles are computed on request.
+    """
+
+    __slots__ = ("samples", "window", "next_index", "count", "max", "window_total")
+
+    def __init__(self, window: int = 240):
+        self.samples: List[float] = []
+        self.window = window
+        self.next_index = 0
+        self.count = 0
+        self.max = 0.0
+        self.window_total = 0.0
+
+    def record(self, seconds: float):
+        """Add one timing sample"""
+        if len(self.samples) < self.window:
+            self.samples.append(seconds)
+        else:
+            self.window_total -= self.samples[self.next_index]
+            self.samples[self.next_index] = seconds
+            self.next_index = (self.next_index + 1) % self.window
+
+        self.window_total += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def summary(self) -> Dict[str, float]:
+        """Get mean/p50/p99/max in milliseconds plus the call count"""
+        if not self.samples:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "count": 0}
+
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "mean_ms": self.window_total / len(ordered) * 1000.0,
+            "p50_ms": ordered[int(last * 0.50)] * 1000.0,
+            "p99_ms": ordered[int(last * 0.99)] * 1000.0,
+            "max_ms": self.max * 1000.0,
+            "count": self.count,
+        }
+
+
+class TickProfiler:
+    """Collects TimingStats per named system (e.g. "economy", "combat.detect_battles")"""
+
+    def __init__(self, window: int = 240):
+        self.window = window
+        self.enabled = True
+        self.stats: Dict[str, TimingStats] = {}
+
+    def record(self, name: str, seconds: float):
+        """Record one sample for a system"""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = TimingStats(self.window)
+        stats.record(seconds)
+
+    def time_call(self, name: str, function, *args):
+        """Call function(*args), recording how long it took"""
+        if not self.enabled:
+            return function(*args)
+        start = time.perf_counter()
+        result = function(*args)
+        self.record(name, time.perf_counter() - start)
+        return result
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """Get summaries for every system, keyed by name"""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+    def reset(self):
+        """Drop all collected samples"""
+        self.stats.clear()
@@ -1,8 +1,10 @@
 """
 Province data structures and management
 """
-from typing import Tuple, List, Optional
-from dataclasses import dataclass, field
+from typing import Tuple, List, Optional, Callable
+from dataclasses import MISSING, dataclass, field, fields
+import numpy as np
+from src.map_data import compute_adjacency
 
 
 @dataclass
@@ -27,6 +29,9 @@ class Province:
     is_capital: bool = False
     is_coastal: bool = False
 
+    _defaults = None  # Field defaults for from_fields (filled on first use)
+    _default_factories = None
+
     def get_income(self) -> float:
         """Calculate province income based on development"""
         return self.base_income * self.development
@@ -35,6 +40,32 @@ class Province:
         """Calculate available manpower for recruitment"""
         return int(self.population * 0.1)  # 10% of population can be recruited
 
+    @classmethod
+    def from_fields(cls, **values) -> "Province":
+        """Create a province without the per-field change hook (for bulk loading)
+
+        Unspecified fields get their dataclass defaults.
+        """
+        if cls._defaults is None:
+            cls._defaults = {f.name: f.default for f in fields(cls) if f.default is not MISSING}
+            cls._default_factories = {f.name: f.default_factory for f in fields(cls)
+                                      if f.default_factory is not MISSING}
+        province = cls.__new__(cls)
+        state = province.__dict__
+        state.update(cls._defaults)
+        for name, factory in cls._default_factories.items():
+            state[name] = factory()
+        state.update(values)
+        return province
+
+    def __setattr__(self, name, value):
+        # Owner changes are reported to the manager so its indexes stay current
+        old_value = self.__dict__.get(name)
+        object.__setattr__(self, name, value)
+        manager = self.__dict__.get("_manager")
+        if manager is not None and old_value != value:
+            manager._on_province_changed(self, name, old_value, value)
+
     def __hash__(self):
         return hash(self.province_id)
 
@@ -44,22 +75,211 @@ class Province:
         return False
 
 
+class ProvinceColumns:
+    """Columnar NumPy copy of the province fields used by bulk computations
+
+    Rows are assigned in the order provinces are added. Owners are stored as
+    integer indexes into owner_codes, with NO_OWNER for unowned provinces.
+    """
+
+    NO_OWNER = -1
+    FIELDS = {
+        "base_income": np.float64,
+        "development": np.int64,
+        "population": np.int64,
+        "manpower_pool": np.int64,
+        "fortification_level": np.int64,
+        "is_capital": np.bool_,
+    }
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.province_ids_buffer = np.zeros(capacity, dtype=np.int64)
+        self.owner_index_buffer = np.full(capacity, self.NO_OWNER, dtype=np.int32)
+        self.buffers = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+
+        self.row_of = {}  # province_id -> row
+        self.owner_codes: List[str] = []  # owner index -> country code
+        self.owner_to_index = {}  # country code -> owner index
+
+    @property
+    def province_ids(self) -> np.ndarray:
+        return self.province_ids_buffer[:self.size]
+
+    @property
+    def owner_index(self) -> np.ndarray:
+        return self.owner_index_buffer[:self.size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Get the live array for a field (one entry per row)"""
+        return self.buffers[name][:self.size]
+
+    def get_owner_index(self, country_code: Optional[str]) -> int:
+        """Get (assigning if needed) the integer index for an owner"""
+        if country_code is None:
+            return self.NO_OWNER
+        index = self.owner_to_index.get(country_code)
+        if index is None:
+            index = len(self.owner_codes)
+            self.owner_codes.append(country_code)
+            self.owner_to_index[country_code] = index
+        return index
+
+    def set_province(self, province: Province):
+        """Write all tracked fields of a province, adding a row if needed"""
+        row = self.row_of.get(province.province_id)
+        if row is None:
+            if self.size == len(self.province_ids_buffer):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.row_of[province.province_id] = row
+            self.province_ids_buffer[row] = province.province_id
+
+        for name, buffer in self.buffers.items():
+            buffer[row] = getattr(province, name)
+        self.owner_index_buffer[row] = self.get_owner_index(province.owner)
+
+    def append_provinces(self, provinces: List[Province]):
+        """Add rows for many provinces that are not in the store yet"""
+        count = len(provinces)
+        while self.size + count > len(self.province_ids_buffer):
+            self._grow()
+        rows = slice(self.size, self.size + count)
+
+        province_ids = [province.province_id for province in provinces]
+        self.province_ids_buffer[rows] = province_ids
+        for name, buffer in self.buffers.items():
+            buffer[rows] = [getattr(province, name) for province in provinces]
+        self.owner_index_buffer[rows] = [self.get_owner_index(province.owner)
+                                         for province in provinces]
+        self.row_of.update(zip(province_ids, range(self.size, self.size + count)))
+        self.size += count
+
+    def set_field(self, province_id: int, name: str, value):
+        """Update one field of an existing row"""
+        row = self.row_of[province_id]
+        if name == "owner":
+            self.owner_index_buffer[row] = self.get_owner_index(value)
+        else:
+            self.buffers[name][row] = value
+
+    def sum_by_owner(self, values: np.ndarray) -> np.ndarray:
+        """Sum a per-row array into one total per owner index"""
+        owner_index = self.owner_index
+        owned = owner_index != self.NO_OWNER
+        return np.bincount(owner_index[owned], weights=values[owned],
+                           minlength=len(self.owner_codes))
+
+    def _grow(self):
+        """Double the capacity of every buffer"""
+        capacity = max(1, len(self.province_ids_buffer)) * 2
+        self.province_ids_buffer = self._resized(self.province_ids_buffer, capacity, 0)
+        self.owner_index_buffer = self._resized(self.owner_index_buffer, capacity, self.NO_OWNER)
+        self.buffers = {name: self._resized(buffer, capacity, 0)
+                        for name, buffer in self.buffers.items()}
+
+    @staticmethod
+    def _resized(buffer: np.ndarray, capacity: int, fill) -> np.ndarray:
+        resized = np.full(capacity, fill, dtype=buffer.dtype)
+        resized[:len(buffer)] = buffer
+        return resized
+
+
 class ProvinceManager:
     """Manages all provinces in the game"""
 
     def __init__(self):
         self.provinces = {}  # province_id -> Province
         self.color_to_province = {}  # (r, g, b) -> province_id
+        self.provinces_by_owner = {}  # country code (or None) -> set of province_ids
+        self.columns = ProvinceColumns()  # NumPy mirror of numeric province fields
+        self.province_rows: List[Province] = []  # column row -> Province
+
+        # CSR adjacency over province rows (None until calculated from the ID map)
+        self.adjacency_offsets: Optional[np.ndarray] = None
+        self.adjacency_neighbors: Optional[np.ndarray] = None
+
+        # Province row per ID map pixel, image orientation (None until loaded)
+        self.label_map: Optional[np.ndarray] = None
+
+        # Per-row geometry in world units from the ID map (None until loaded)
+        self.centroids: Optional[np.ndarray] = None  # (n, 2) x, y
+        self.areas: Optional[np.ndarray] = None  # pixel count
+        self.bounding_boxes: Optional[np.ndarray] = None  # (n, 4) left, bottom, right, top
+        self.max_neighbor_distance: Optional[float] = None
+
+        # Callbacks run as (province, old_owner, new_owner) after an owner change
+        self.owner_listeners: List[Callable] = []
 
     def add_province(self, province: Province):
         """Add a province to the manager"""
+        existing = self.provinces.get(province.province_id)
+        if existing is not None:
+            self._unindex_owner(existing.province_id, existing.owner)
+            object.__setattr__(existing, "_manager", None)
+
         self.provinces[province.province_id] = province
         self.color_to_province[province.color_rgb] = province.province_id
+        self._index_owner(province.province_id, province.owner)
+        self.columns.set_province(province)
+        row = self.columns.row_of[province.province_id]
+        if row == len(self.province_rows):
+            self.province_rows.append(province)
+        else:
+            self.province_rows[row] = province
+        object.__setattr__(province, "_manager", self)
+
+    def add_provinces(self, provinces: List[Province]):
+        """Add many provinces at once (faster than add_province for new IDs)"""
+        if any(province.province_id in self.provinces for province in provinces):
+            for province in provinces:
+                self.add_province(province)
+            return
+
+        for province in provinces:
+            self.provinces[province.province_id] = province
+            self.color_to_province[province.color_rgb] = province.province_id
+            self._index_owner(province.province_id, province.owner)
+            object.__setattr__(province, "_manager", self)
+        self.columns.append_provinces(provinces)
+        self.province_rows.extend(provinces)
+
+    def add_owner_listener(self, callback: Callable):
+        """Register a callback run as (province, old_owner, new_owner) on ownership change"""
+        self.owner_listeners.append(callback)
+
+    def _on_province_changed(self, province: Province, name: str, old_value, new_value):
+        """Keep indexes in sync when a managed province is modified"""
+        if name in ProvinceColumns.FIELDS:
+            self.columns.set_field(province.province_id, name, new_value)
+        elif name == "owner":
+            self.columns.set_field(province.province_id, name, new_value)
+            self._unindex_owner(province.province_id, old_value)
+            self._index_owner(province.province_id, new_value)
+            for callback in self.owner_listeners:
+                callback(province, old_value, new_value)
+
+    def _index_owner(self, province_id: int, owner: Optional[str]):
+        """Add a province to the owner index"""
+        self.provinces_by_owner.setdefault(owner, set()).add(province_id)
+
+    def _unindex_owner(self, province_id: int, owner: Optional[str]):
+        """Remove a province from the owner index"""
+        owned = self.provinces_by_owner.get(owner)
+        if owned is not None:
+            owned.discard(province_id)
+            if not owned:
+                del self.provinces_by_owner[owner]
 
     def get_province(self, province_id: int) -> Optional[Province]:
         """Get province by ID"""
         return self.provinces.get(province_id)
 
+    def get_province_by_row(self, row: int) -> Province:
+        """Get province by its row in the columnar store / label map"""
+        return self.province_rows[row]
+
     def get_province_by_color(self, color: Tuple[int, int, int]) -> Optional[Province]:
         """Get province by RGB color from ID map"""
         province_id = self.color_to_province.get(color)
@@ -68,10 +288,86 @@ class ProvinceManager:
         return None
 
     def get_provinces_by_owner(self, country_code: str) -> List[Province]:
-        """Get all provinces owned by a country"""
-        return [p for p in self.provinces.values() if p.owner == country_code]
+        """Get all provinces owned by a country (sorted by province ID)"""
+        owned = self.provinces_by_owner.get(country_code)
+        if not owned:
+            return []
+        return [self.provinces[province_id] for province_id in sorted(owned)]
+
+    def count_provinces_by_owner(self, country_code: str) -> int:
+        """Count provinces owned by a country"""
+        return len(self.provinces_by_owner.get(country_code, ()))
+
+    def calculate_adjacency(self, id_map_data: np.ndarray):
+        """Calculate adjacent provinces from a label map of province rows"""
+        offsets, neighbors = compute_adjacency(id_map_data, self.columns.size)
+        self.set_adjacency(offsets, neighbors)
+
+    def set_adjacency(self, offsets: np.ndarray, neighbors: np.ndarray):
+        """Install a CSR adjacency graph and fill each Province.adjacent_provinces"""
+        self.adjacency_offsets = offsets
+        self.adjacency_neighbors = neighbors
+        self.max_neighbor_distance = None
+
+        province_ids = self.columns.province_ids
+        neighbor_ids = province_ids[neighbors].tolist()
+        bounds = offsets.tolist()
+        for row, province in enumerate(self.province_rows):
+            # Not an indexed field, so the change hook can be skipped
+            object.__setattr__(province, "adjacent_provinces",
+                               neighbor_ids[bounds[row]:bounds[row + 1]])
+
+    def set_geometry(self, centroids: np.ndarray, areas: np.ndarray, bounding_boxes: np.ndarray):
+        """Install per-row province geometry computed from the ID map"""
+        self.centroids = centroids
+        self.areas = areas
+        self.bounding_boxes = bounding_boxes
+        self.max_neighbor_distance = None
+
+    def has_geometry(self) -> bool:
+        """Check whether province geometry has been loaded"""
+        return self.centroids is not None
+
+    def get_centroid(self, province_id: int) -> Optional[Tuple[float, float]]:
+        """Get the world-space centre of a province (None if it has no pixels)"""
+        row = self.columns.row_of.get(province_id)
+        if row is None or self.centroids is None or not self.areas[row]:
+            return None
+        x, y = self.centroids[row].tolist()
+        return x, y
+
+    def get_bounding_box(self, province_id: int) -> Optional[Tuple[float, float, float, float]]:
+        """Get a province's world-space (left, bottom, right, top) box"""
+        row = self.columns.row_of.get(province_id)
+        if row is None or self.bounding_boxes is None or not self.areas[row]:
+            return None
+        left, bottom, right, top = self.bounding_boxes[row].tolist()
+        return left, bottom, right, top
+
+    def get_area(self, province_id: int) -> int:
+        """Get a province's size in ID map pixels (0 if unknown)"""
+        row = self.columns.row_of.get(province_id)
+        if row is None or self.areas is None:
+            return 0
+        return int(self.areas[row])
+
+    def get_max_neighbor_distance(self) -> float:
+        """Longest centroid distance between two adjacent provinces (0.0 if unknown)"""
+        if self.max_neighbor_distance is None:
+            if self.centroids is None or self.adjacency_offsets is None:
+                return 0.0
+            sources = np.repeat(np.arange(len(self.adjacency_offsets) - 1),
+                                np.diff(self.adjacency_offsets))
+            deltas = self.centroids[sources] - self.centroids[self.adjacency_neighbors]
+            distances = np.hypot(deltas[:, 0], deltas[:, 1])
+            distances = distances[~np.isnan(distances)]
+            self.max_neighbor_distance = float(distances.max()) if len(distances) else 0.0
+        return self.max_neighbor_distance
+
+    def has_adjacency(self) -> bool:
+        """Check whether the adjacency graph has been built"""
+        return self.adjacency_offsets is not None
 
-    def calculate_adjacency(self, id_map_data):
-        """Calculate adjacent provinces from ID map pixel data"""
-        # This will be implemented when we load the map
-        pass
+    def get_neighbor_rows(self, row: int) -> np.ndarray:
+        """Get the rows adjacent to a province row"""
+        return self.adjacency_neighbors[self.adjacency_offsets[row]:self.adjacency_offsets[row + 1]]
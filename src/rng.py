@@ -0,0 +1,45 @@
+"""
+Seeded random number streams
+
+Every consumer of randomness (a battle, an AI country, ...) draws from its own
+stream derived from the game seed and a key, so results don't depend on the
+order in which battles or countries are processed.
+"""
+import hashlib
+import random
+from typing import Optional
+import numpy as np
+
+
+class RandomStreams:
+    """Derives independent, reproducible random.Random streams from one seed"""
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 63)
+        self.seed = seed
+
+    def derive_seed(self, *key) -> int:
+        """Stable 64-bit seed for a key (independent of PYTHONHASHSEED)"""
+        text = ":".join(str(part) for part in (self.seed,) + key)
+        return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+
+    def derive(self, *key) -> random.Random:
+        """Create a new stream for a key, e.g. derive("battle", province_id, tick)"""
+        return random.Random(self.derive_seed(*key))
+
+    def uniform_array(self, ids: np.ndarray, *key) -> np.ndarray:
+        """Uniform floats in [0, 1), one per ID, e.g. uniform_array(province_ids, "battle", tick)
+
+        Vectorised counterpart of derive(): each value is a hash of (seed, key,
+        ID), so it doesn't depend on which other IDs are drawn or their order.
+        """
+        state = np.asarray(ids).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        state += np.uint64(self.derive_seed(*key))
+        # SplitMix64 finaliser
+        state ^= state >> np.uint64(30)
+        state *= np.uint64(0xBF58476D1CE4E5B9)
+        state ^= state >> np.uint64(27)
+        state *= np.uint64(0x94D049BB133111EB)
+        state ^= state >> np.uint64(31)
+        return (state >> np.uint64(11)) * (1.0 / (1 << 53))
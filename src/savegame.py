@@ -0,0 +1,390 @@
+"""
+Save games
+
+The mutable game state is captured as a snapshot: small JSON-serialisable
+tables (game clock, countries, diplomacy, system timers) plus columnar NumPy
+arrays for provinces, units and battles. Static world data (names, colours,
+terrain, the map) is not saved; a save is loaded on top of the same world.
+
+Full saves write a snapshot into one container file (src/array_file.py).
+Autosaves are incremental: every array is split into fixed-size chunks that
+are appended to a pack file only if their content changed since the last
+snapshot, and a small JSON manifest lists the chunks that make up the
+latest snapshot. Capturing a snapshot copies the state on the caller's
+thread; hashing and writing can then run on a background thread.
+"""
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.array_file import write_array_file, read_array_header, map_arrays
+from src.country import RelationView
+from src.systems.combat import Battle
+from src.systems.diplomacy import PeaceDemand, PeaceTreaty
+from src.unit import UnitColumns
+
+SAVE_MAGIC = b"WGSAVE\x00\x00"
+SAVE_VERSION = 3
+SAVE_DIR = Path("saves")
+
+AUTOSAVE_MANIFEST = "autosave.json"
+AUTOSAVE_CHUNK_BYTES = 64 * 1024
+AUTOSAVE_COMPACT_RATIO = 3.0  # Rewrite the pack once it is this much larger than one snapshot
+
+NO_ID = -1  # Stored for missing optional IDs (e.g. a unit's move target)
+
+# Province fields that can change during a game (the rest comes from the world data),
+# all kept in ProvinceColumns so a snapshot copies whole arrays
+PROVINCE_FIELDS = ("development", "population", "base_income", "manpower_pool",
+                   "fortification_level", "is_capital")
+
+COUNTRY_FIELDS = ("money", "manpower", "military_factories", "civilian_factories",
+                  "at_war_with", "allied_with", "war_scores")
+
+Snapshot = Tuple[dict, Dict[str, np.ndarray]]
+
+
+def capture_snapshot(game_state) -> Snapshot:
+    """Copy the mutable game state into (tables, arrays)
+
+    Everything returned is a copy, so the snapshot stays consistent while the
+    game keeps running and can be written from another thread.
+    """
+    columns = game_state.province_manager.columns
+    military_system = game_state.military_system
+    combat_system = game_state.combat_system
+
+    owners = [country.code for country in game_state.country_manager.get_all_countries()]
+    owner_index = {code: index for index, code in enumerate(owners)}
+
+    # Province owner indexes are remapped from the columns' owner order to the saved one;
+    # the extra last entry maps NO_OWNER (-1) to NO_ID
+    owner_lookup = np.array([owner_index.get(code, NO_ID) for code in columns.owner_codes] + [NO_ID],
+                            dtype=np.int32)
+    arrays = {
+        "province_ids": columns.province_ids.copy(),
+        "province_owner": owner_lookup[columns.owner_index],
+    }
+    for name in PROVINCE_FIELDS:
+        arrays[f"province_{name}"] = columns.column(name).copy()
+
+    unit_columns = military_system.columns
+    for name in UnitColumns.FIELDS:
+        arrays[f"unit_{name}"] = unit_columns.column(name).copy()
+    # Paths as CSR (offsets + flat province IDs); only moving units have one
+    paths = unit_columns.paths
+    path_rows = np.flatnonzero(np.fromiter(map(bool, paths), dtype=bool, count=len(paths)))
+    moving_paths = [paths[row] for row in path_rows.tolist()]
+    lengths = np.zeros(len(paths), dtype=np.int64)
+    lengths[path_rows] = [len(path) for path in moving_paths]
+    arrays["unit_path_offsets"] = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=arrays["unit_path_offsets"][1:])
+    arrays["unit_path"] = np.fromiter(itertools.chain.from_iterable(moving_paths), dtype=np.int64,
+                                      count=int(arrays["unit_path_offsets"][-1]))
+
+    battles = combat_system.active_battles
+    arrays["battle_province"] = np.array([battle.province_id for battle in battles],
+                                         dtype=np.int64)
+    arrays["battle_duration"] = np.array([battle.duration for battle in battles],
+                                         dtype=np.float64)
+
+    tables = {
+        "version": SAVE_VERSION,
+        "game": {
+            "seed": game_state.seed,
+            "game_time": game_state.game_time,
+            "game_speed": game_state.game_speed,
+            "is_paused": game_state.is_paused,
+            "player_country": game_state.player_country,
+            "selected_province_id": game_state.selected_province_id,
+            "selected_unit_id": game_state.selected_unit_id,
+        },
+        "owners": owners,
+        "unit_templates": list(unit_columns.template_ids),
+        "unit_owners": list(unit_columns.owner_codes),
+        "countries": {country.code: {name: _copied(getattr(country, name))
+                                     for name in COUNTRY_FIELDS}
+                      for country in game_state.country_manager.get_all_countries()},
+        "battles": [{"attackers": list(battle.attackers), "defenders": list(battle.defenders)}
+                    for battle in battles],
+        "peace_treaties": [dataclasses.asdict(treaty)
+                           for treaty in game_state.diplomacy_system.pending_peace_treaties],
+        "systems": {
+            "economy_time": game_state.economy_system.time_accumulator,
+            "combat_time": combat_system.time_accumulator,
+            "combat_ticks": combat_system.tick_count,
+            "combat_dirty": sorted(combat_system.dirty_provinces),
+            "ai_time": game_state.ai_controller.time_accumulator,
+            "ai_week": game_state.ai_controller.week,
+            "ai_next_slice": game_state.ai_controller.next_slice,
+            # A country paused mid-turn (frame budget) isn't saved; its turn ends early
+            "ai_queue": [list(entry) for entry in game_state.ai_controller.queue],
+            "next_unit_id": military_system.next_unit_id,
+        },
+    }
+    return tables, arrays
+
+
+def restore_snapshot(game_state, tables: dict, arrays: Dict[str, np.ndarray]):
+    """Apply a snapshot to a game whose world data is loaded and systems initialised"""
+    if tables.get("version") != SAVE_VERSION:
+        raise ValueError(f"Unsupported save version {tables.get('version')}")
+
+    province_manager = game_state.province_manager
+    if not np.array_equal(arrays["province_ids"], province_manager.columns.province_ids):
+        raise ValueError("Save does not match the loaded world (province IDs differ)")
+
+    game = tables["game"]
+    game_state.rng.seed = game_state.seed = game["seed"]
+    for name in ("game_time", "game_speed", "is_paused", "player_country",
+                 "selected_province_id", "selected_unit_id"):
+        setattr(game_state, name, game[name])
+
+    owners = tables["owners"] + [None]  # NO_ID (-1) selects None
+    for code, values in tables["countries"].items():
+        country = game_state.country_manager.get_country(code)
+        for name, value in values.items():
+            setattr(country, name, value)
+
+    # Provinces: only touch changed values so owner listeners see real changes
+    province_values = {name: arrays[f"province_{name}"].tolist() for name in PROVINCE_FIELDS}
+    province_owners = arrays["province_owner"].tolist()
+    for row, province in enumerate(province_manager.province_rows):
+        owner = owners[province_owners[row]]
+        if province.owner != owner:
+            province.owner = owner
+        for name, values in province_values.items():
+            if getattr(province, name) != values[row]:
+                setattr(province, name, values[row])
+
+    # Units
+    path_offsets = arrays["unit_path_offsets"].tolist()
+    paths = arrays["unit_path"].tolist()
+    unit_columns = UnitColumns.from_arrays(
+        {name: arrays[f"unit_{name}"] for name in UnitColumns.FIELDS},
+        [paths[start:end] or None for start, end in zip(path_offsets, path_offsets[1:])],
+        tables["unit_templates"], tables["unit_owners"],
+    )
+    systems = tables["systems"]
+    game_state.military_system.reset_units(unit_columns, systems["next_unit_id"])
+
+    # Battles
+    battles = []
+    for index, info in enumerate(tables["battles"]):
+        battles.append(Battle(province_id=int(arrays["battle_province"][index]),
+                              attackers=info["attackers"], defenders=info["defenders"],
+                              duration=float(arrays["battle_duration"][index])))
+    combat_system = game_state.combat_system
+    combat_system.reset_battles(battles)
+    combat_system.time_accumulator = systems["combat_time"]
+    combat_system.tick_count = systems["combat_ticks"]
+    combat_system.dirty_provinces = set(systems["combat_dirty"])
+
+    game_state.diplomacy_system.pending_peace_treaties = [
+        PeaceTreaty(from_country=treaty["from_country"], to_country=treaty["to_country"],
+                    demands=[PeaceDemand(**demand) for demand in treaty["demands"]],
+                    total_war_score_cost=treaty["total_war_score_cost"])
+        for treaty in tables["peace_treaties"]
+    ]
+    game_state.economy_system.time_accumulator = systems["economy_time"]
+    game_state.ai_controller.time_accumulator = systems["ai_time"]
+    game_state.ai_controller.week = systems["ai_week"]
+    game_state.ai_controller.next_slice = systems["ai_next_slice"]
+    game_state.ai_controller.queue = deque(tuple(entry) for entry in systems["ai_queue"])
+    game_state.ai_controller.queued_countries = {code for code, _ in systems["ai_queue"]}
+    game_state.ai_controller.plans = {}  # Replanned from the loaded world
+    game_state.ai_controller.current_steps = None
+    game_state.military_system.pathfinder.invalidate()
+
+
+def save_game(game_state, path):
+    """Write a full save to a single file"""
+    tables, arrays = capture_snapshot(game_state)
+    write_array_file(path, SAVE_MAGIC, {"tables": tables}, arrays)
+
+
+def load_game(game_state, path):
+    """Load a full save file or an autosave directory into a game"""
+    path = Path(path)
+    if path.is_dir():
+        tables, arrays = read_autosave(path)
+    else:
+        result = read_array_header(path, SAVE_MAGIC)
+        if result is None:
+            raise ValueError(f"{path} is not a save file")
+        header, data_start = result
+        tables, arrays = header["tables"], map_arrays(path, header, data_start)
+    restore_snapshot(game_state, tables, arrays)
+
+
+def read_autosave(directory) -> Snapshot:
+    """Read the latest autosave snapshot from a directory"""
+    directory = Path(directory)
+    with open(directory / AUTOSAVE_MANIFEST) as f:
+        manifest = json.load(f)
+
+    arrays = {}
+    with open(directory / manifest["pack"], "rb") as pack:
+        for name, spec in manifest["arrays"].items():
+            data = bytearray()
+            for _, offset, size in spec["chunks"]:
+                pack.seek(offset)
+                data += pack.read(size)
+            arrays[name] = np.frombuffer(bytes(data), dtype=np.dtype(spec["dtype"])).reshape(
+                spec["shape"])
+    return manifest["tables"], arrays
+
+
+class AutosaveWriter:
+    """Writes incremental autosaves into a directory, optionally on a background thread
+
+    Chunks are content-addressed: a chunk whose bytes are already in the pack
+    file is referenced again instead of rewritten. The pack is rewritten from
+    scratch (keeping only the latest snapshot's chunks) when it grows past
+    AUTOSAVE_COMPACT_RATIO times the snapshot size.
+    """
+
+    def __init__(self, directory=SAVE_DIR / "autosave", background: bool = True):
+        self.directory = Path(directory)
+        self.background = background
+
+        self.generation = 0
+        self.pack_size = 0
+        self.chunk_refs: Dict[str, Tuple[int, int]] = {}  # chunk hash -> (offset, size)
+        self.bytes_written = 0  # Chunk bytes written by the last snapshot
+        self._load_existing()
+
+        self.pending: "queue.Queue[Optional[Snapshot]]" = queue.Queue(maxsize=1)
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    def autosave(self, game_state):
+        """Capture the game now and write it (in the background when enabled)"""
+        snapshot = capture_snapshot(game_state)
+        if not self.background:
+            self.write_snapshot(*snapshot)
+            return
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+            self.thread.start()
+        # Keep only the newest snapshot if the writer is still busy with an older one
+        try:
+            self.pending.get_nowait()
+            self.pending.task_done()  # The dropped snapshot counts as done for flush()
+        except queue.Empty:
+            pass
+        self.pending.put(snapshot)
+
+    def flush(self):
+        """Wait until every queued snapshot has been written"""
+        if self.thread is not None:
+            self.pending.join()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def close(self):
+        """Write anything pending and stop the background thread"""
+        if self.thread is not None:
+            self.pending.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def write_snapshot(self, tables: dict, arrays: Dict[str, np.ndarray]):
+        """Append changed chunks to the pack and publish a new manifest"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        total_size = sum(array.nbytes for array in arrays.values())
+        old_pack = None
+        if self.pack_size > max(total_size, AUTOSAVE_CHUNK_BYTES) * AUTOSAVE_COMPACT_RATIO:
+            old_pack = self._pack_name()
+            self.generation += 1
+            self.pack_size = 0
+            self.chunk_refs = {}
+
+        layout = {}
+        self.bytes_written = 0
+        with open(self.directory / self._pack_name(), "ab") as pack:
+            for name, array in arrays.items():
+                data = memoryview(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+                chunks = []
+                for start in range(0, len(data), AUTOSAVE_CHUNK_BYTES):
+                    chunk = data[start:start + AUTOSAVE_CHUNK_BYTES]
+                    digest = hashlib.blake2b(chunk, digest_size=16).hexdigest()
+                    ref = self.chunk_refs.get(digest)
+                    if ref is None:
+                        pack.write(chunk)
+                        ref = self.chunk_refs[digest] = (self.pack_size, len(chunk))
+                        self.pack_size += len(chunk)
+                        self.bytes_written += len(chunk)
+                    chunks.append([digest, ref[0], ref[1]])
+                layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape),
+                                "chunks": chunks}
+            pack.flush()
+            os.fsync(pack.fileno())
+
+        manifest = {"pack": self._pack_name(), "generation": self.generation,
+                    "tables": tables, "arrays": layout}
+        temporary = self.directory / (AUTOSAVE_MANIFEST + ".tmp")
+        with open(temporary, "w") as f:
+            json.dump(manifest, f)
+        temporary.replace(self.directory / AUTOSAVE_MANIFEST)
+
+        if old_pack is not None:
+            (self.directory / old_pack).unlink(missing_ok=True)
+
+    def _run(self):
+        """Background thread: write snapshots as they are queued"""
+        while True:
+            snapshot = self.pending.get()
+            try:
+                if snapshot is None:
+                    return
+                self.write_snapshot(*snapshot)
+            except BaseException as error:  # Reported on the next flush/close
+                self.error = error
+            finally:
+                self.pending.task_done()
+
+    def _load_existing(self):
+        """Continue an existing autosave directory (reusing its pack's chunks)"""
+        manifest_path = self.directory / AUTOSAVE_MANIFEST
+        if not manifest_path.exists():
+            return
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            self.generation = manifest["generation"]
+            pack_path = self.directory / manifest["pack"]
+            self.pack_size = pack_path.stat().st_size
+        except (OSError, ValueError, KeyError):
+            return
+        for spec in manifest["arrays"].values():
+            for digest, offset, size in spec["chunks"]:
+                self.chunk_refs[digest] = (offset, size)
+
+    def _pack_name(self) -> str:
+        return f"autosave_{self.generation}.pack"
+
+
+def _copied(value):
+    """Copy mutable containers so the snapshot doesn't share them with the game"""
+    if isinstance(value, RelationView):
+        return value.relations.get_related(value.name, value.code)  # Already a new list
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
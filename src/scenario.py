@@ -0,0 +1,233 @@
+"""
+Synthetic scenario generator for large-world testing and benchmarks
+
+Writes provinces.csv, countries.json and a matching provinces_id.png into an
+output directory. Provinces are laid out as a brick pattern of rectangles
+(so each has up to six neighbours), and every country owns a contiguous
+region grown from its capital.
+"""
+import csv
+import json
+import math
+import random
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.constants import COLOR_OCEAN
+
+TERRAIN_WEIGHTS = {
+    "plains": 50,
+    "hills": 15,
+    "forest": 15,
+    "mountains": 8,
+    "marsh": 5,
+    "urban": 7
+}
+
+LAND_TEMPLATES = ["infantry", "infantry", "infantry", "armor", "artillery"]
+
+
+def province_color(province_id: int):
+    """Unique ID map colour for a province ID"""
+    return ((province_id >> 16) & 0xFF, (province_id >> 8) & 0xFF, province_id & 0xFF)
+
+
+def country_code(index: int) -> str:
+    """Three-letter country code for an index (AAA, AAB, ...)"""
+    letters = []
+    for _ in range(3):
+        index, remainder = divmod(index, 26)
+        letters.append(chr(ord("A") + remainder))
+    return "".join(reversed(letters))
+
+
+def generate_scenario(output_dir, province_count: int, country_count: int,
+                      seed: int = 0, cell_size: int = 8) -> dict:
+    """Generate a world and write its data files, returns the file paths"""
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    cols = max(1, math.ceil(math.sqrt(province_count * 2)))
+    rows = math.ceil(province_count / cols)
+
+    # Province row-major grid positions: province_id = index + 1
+    grid = np.full((rows, cols), -1, dtype=np.int64)
+    grid.ravel()[:province_count] = np.arange(province_count)
+
+    _write_id_map(output_dir / "provinces_id.png", grid, cell_size)
+
+    neighbors = _grid_neighbors(grid, province_count)
+    owner = _grow_countries(neighbors, province_count, country_count, rng)
+
+    terrains = list(TERRAIN_WEIGHTS)
+    weights = list(TERRAIN_WEIGHTS.values())
+    with open(output_dir / "provinces.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'name', 'r', 'g', 'b', 'terrain',
+                                               'development', 'population', 'coastal'])
+        writer.writeheader()
+        for index in range(province_count):
+            province_id = index + 1
+            r, g, b = province_color(province_id)
+            development = rng.randint(1, 5)
+            writer.writerow({
+                'id': province_id, 'name': f"Province {province_id}",
+                'r': r, 'g': g, 'b': b,
+                'terrain': rng.choices(terrains, weights)[0],
+                'development': development,
+                'population': development * 1000 + rng.randint(0, 999),
+                'coastal': str(len(neighbors[index]) < 6).lower()
+            })
+
+    countries = {}
+    for index, capital in enumerate(owner["capitals"]):
+        code = country_code(index)
+        provinces = [p + 1 for p in owner["provinces"][index]]
+        countries[code] = {
+            "name": f"Country {code}",
+            "color": [rng.randint(40, 230), rng.randint(40, 230), rng.randint(40, 230)],
+            "capital": capital + 1,
+            "provinces": provinces,
+            "money": 1000.0 + 50.0 * len(provinces),
+            "manpower": 10000 + 500 * len(provinces),
+            "military_factories": 10,
+            "civilian_factories": 10
+        }
+    with open(output_dir / "countries.json", "w") as f:
+        json.dump(countries, f)
+
+    return {
+        "data_dir": output_dir,
+        "id_map": output_dir / "provinces_id.png",
+        "width": cols * cell_size + cell_size // 2,
+        "height": rows * cell_size,
+    }
+
+
+def populate_units(game_state, unit_count: int, seed: int = 0):
+    """Spread land units over every country's provinces (proportional to size)"""
+    rng = random.Random(seed)
+    military_system = game_state.military_system
+    owned = [province for province in game_state.province_manager.provinces.values()
+             if province.owner]
+    if not owned:
+        return
+
+    for _ in range(unit_count):
+        province = rng.choice(owned)
+        military_system.create_unit(rng.choice(LAND_TEMPLATES), province.owner,
+                                    province.province_id)
+
+
+def start_border_wars(game_state, battles_per_war: int = 4, seed: int = 0):
+    """Pair each country with a neighbour at war and open battles on their border
+
+    For each war, a few of the defender's border provinces get one attacking
+    and one defending unit so the next combat tick has battles to resolve.
+    """
+    rng = random.Random(seed)
+    province_manager = game_state.province_manager
+    military_system = game_state.military_system
+    at_war = set()
+    wars = []
+
+    for country in game_state.country_manager.get_all_countries():
+        if country.code in at_war:
+            continue
+        border = {}  # neighbouring owner -> their provinces adjacent to us
+        for province in province_manager.get_provinces_by_owner(country.code):
+            for neighbor_id in province.adjacent_provinces:
+                neighbor = province_manager.get_province(neighbor_id)
+                if neighbor.owner and neighbor.owner != country.code and neighbor.owner not in at_war:
+                    border.setdefault(neighbor.owner, {})[neighbor_id] = neighbor
+        if not border:
+            continue
+
+        enemy = min(border)
+        game_state.diplomacy_system.declare_war(country.code, enemy)
+        at_war.update((country.code, enemy))
+        wars.append((country.code, enemy, list(border[enemy].values())))
+
+    for attacker, defender, border_provinces in wars:
+        for province in rng.sample(border_provinces, min(battles_per_war, len(border_provinces))):
+            military_system.create_unit("infantry", defender, province.province_id)
+            military_system.create_unit(rng.choice(LAND_TEMPLATES), attacker, province.province_id)
+
+    return wars
+
+
+def _write_id_map(path: Path, grid: np.ndarray, cell_size: int):
+    """Render the brick-layout ID map (odd rows shifted by half a cell)"""
+    rows, cols = grid.shape
+    half = cell_size // 2
+    width = cols * cell_size + half
+    height = rows * cell_size
+
+    ocean = np.array(COLOR_OCEAN, dtype=np.uint8)
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[:] = ocean
+
+    ys, xs = np.mgrid[0:height, 0:width]
+    grid_row = ys // cell_size
+    shifted_x = xs - (grid_row % 2) * half
+    grid_col = shifted_x // cell_size
+    inside = (shifted_x >= 0) & (grid_col < cols)
+    index = np.full((height, width), -1, dtype=np.int64)
+    index[inside] = grid[grid_row[inside], grid_col[inside]]
+
+    land = index >= 0
+    province_ids = index[land] + 1
+    pixels[land, 0] = (province_ids >> 16) & 0xFF
+    pixels[land, 1] = (province_ids >> 8) & 0xFF
+    pixels[land, 2] = province_ids & 0xFF
+
+    Image.fromarray(pixels).save(path)
+
+
+def _grid_neighbors(grid: np.ndarray, province_count: int):
+    """Neighbour lists for the brick layout (matches the rendered ID map)"""
+    rows, cols = grid.shape
+    neighbors = [[] for _ in range(province_count)]
+    for row in range(rows):
+        # Odd rows are shifted right, so they touch columns (c, c + 1) above/below
+        offsets = (0, 1) if row % 2 else (-1, 0)
+        for col in range(cols):
+            index = grid[row, col]
+            if index < 0:
+                continue
+            candidates = [(row, col - 1), (row, col + 1)]
+            for d_row in (-1, 1):
+                candidates.extend((row + d_row, col + d_col) for d_col in offsets)
+            for r, c in candidates:
+                if 0 <= r < rows and 0 <= c < cols and grid[r, c] >= 0:
+                    neighbors[index].append(int(grid[r, c]))
+    return neighbors
+
+
+def _grow_countries(neighbors, province_count: int, country_count: int, rng: random.Random) -> dict:
+    """Assign provinces to countries by growing regions from random capitals"""
+    country_count = max(1, min(country_count, province_count))
+    capitals = rng.sample(range(province_count), country_count)
+    owner = [-1] * province_count
+    queue = deque()
+    for country, capital in enumerate(capitals):
+        owner[capital] = country
+        queue.append(capital)
+
+    # Multi-source BFS gives every country a contiguous region
+    while queue:
+        index = queue.popleft()
+        for neighbor in neighbors[index]:
+            if owner[neighbor] < 0:
+                owner[neighbor] = owner[index]
+                queue.append(neighbor)
+
+    provinces = [[] for _ in range(country_count)]
+    for index, country in enumerate(owner):
+        if country >= 0:
+            provinces[country].append(index)
+
+    return {"capitals": capitals, "provinces": provinces}
@@ -0,0 +1,96 @@
+"""
+Headless simulation runner
+
+Runs the game loop without any rendering (and without importing arcade):
+
+    python -m src.sim --days 365 --speed max
+"""
+import time
+
+_START_TIME = time.perf_counter()  # Startup is timed from here, so it includes the imports below
+
+import argparse  # noqa: E402
+import sys  # noqa: E402
+
+from src.game import GameState  # noqa: E402
+from src.data_loader import load_game_data, create_starting_units  # noqa: E402
+from src.constants import PROVINCE_ID_MAP_PATH  # noqa: E402
+
+HOURS_PER_DAY = 24.0
+
+
+def build_game_state(seed=None) -> GameState:
+    """Load game data and initialize all systems, with every country AI-controlled"""
+    game_state = GameState(seed)
+    load_game_data(game_state, id_map_path=PROVINCE_ID_MAP_PATH)
+    game_state.initialize_systems()
+    create_starting_units(game_state)
+    return game_state
+
+
+def run_simulation(game_state: GameState, days: float, speed=None, step_hours: float = 1.0) -> float:
+    """Advance the simulation by a number of game days, returns wall-clock seconds taken
+
+    speed is game hours per real second; None runs as fast as possible.
+    """
+    start_time = game_state.game_time
+    target_time = start_time + days * HOURS_PER_DAY
+    start = time.perf_counter()
+
+    while game_state.game_time < target_time:
+        step = min(step_hours, target_time - game_state.game_time)
+        game_state.update(step)
+
+        if speed is not None:
+            # Sleep until wall-clock time catches up with the simulated time
+            delay = (game_state.game_time - start_time) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+    return time.perf_counter() - start
+
+
+def parse_speed(value: str):
+    """Parse --speed: 'max' or game hours per real second"""
+    if value == "max":
+        return None
+    return float(value)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Run the game simulation without rendering")
+    parser.add_argument("--days", type=float, default=30.0, help="game days to simulate")
+    parser.add_argument("--speed", type=parse_speed, default=None,
+                        help="'max' (default) or game hours per real second")
+    parser.add_argument("--step", type=float, default=1.0, help="game hours per update")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (default: random)")
+    args = parser.parse_args(argv)
+
+    load_start = time.perf_counter()
+    game_state = build_game_state(args.seed)
+    loaded = time.perf_counter()
+
+    elapsed = run_simulation(game_state, args.days, args.speed, args.step)
+    days_per_second = args.days / elapsed if elapsed > 0 else float("inf")
+
+    print(f"Seed: {game_state.seed}")
+    print(f"Startup: {(loaded - _START_TIME) * 1000:.1f} ms "
+          f"(imports {(load_start - _START_TIME) * 1000:.1f} ms, "
+          f"world {(loaded - load_start) * 1000:.1f} ms)")
+    print(f"Simulated {args.days:g} days ({game_state.get_current_date()}) in {elapsed:.3f} s")
+    print(f"Speed: {days_per_second:.1f} simulated days/second")
+    print(f"Units: {len(game_state.military_system.units)}, "
+          f"active battles: {len(game_state.combat_system.active_battles)}")
+    print(f"arcade imported: {'arcade' in sys.modules}")
+
+    print()
+    print(f"{'system':<26}{'mean ms':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'calls':>9}")
+    for name, stats in sorted(game_state.get_system_timings().items()):
+        print(f"{name:<26}{stats['mean_ms']:>9.3f}{stats['p50_ms']:>9.3f}"
+              f"{stats['p99_ms']:>9.3f}{stats['max_ms']:>9.3f}{stats['count']:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,222 +1,286 @@
 """
 AI controller for computer-controlled countries
 """
-import random
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from src.constants import AI_TIME_SLICES, AI_WORKER_START_METHOD
+from src.systems.ai_planner import AICommand, AIPlanner, capture_world, init_worker, plan_in_worker
 
 
 class AIController:
-    """AI decision-making for computer-controlled countries"""
+    """AI decision-making for computer-controlled countries
+
+    Every country still thinks once per week, but countries are spread over
+    AI_TIME_SLICES slices of the week. When a slice comes due its countries
+    join a work queue and are planned against a snapshot of the world (see
+    src/systems/ai_planner.py), in worker processes when workers > 0. Each
+    update then applies queued plans until the per-frame budget runs out,
+    continuing on the next update. Plans are applied one command at a time in
+    queue order, so the outcome doesn't depend on which process planned what.
+    """
 
     def __init__(self, game_state):
         self.game_state = game_state
         self.update_interval = 168.0  # AI thinks once per week (168 hours)
-        self.time_accumulator = 0.0
+        self.time_slices = AI_TIME_SLICES
+        self.time_accumulator = 0.0  # Game hours into the current week
+        self.next_slice = 0  # Next slice of the week to queue
+        self.week = 0  # Number of weekly AI passes started so far
+
+        # Countries waiting to think, as (country code, week)
+        self.queue: Deque[Tuple[str, int]] = deque()
+        self.queued_countries = set()  # Codes in the queue (a country is queued at most once)
+        self.plans: Dict[str, tuple] = {}  # Queued country code -> plan handle, see _plan
+        self.current_steps: Optional[Iterator] = None  # Country paused mid-turn
+
+        # Wall-clock milliseconds of AI work per update; None works through the
+        # whole queue at once, which keeps headless runs deterministic
+        self.frame_budget_ms: Optional[float] = None
+
+        # Planner processes; 0 plans on the main thread
+        self.workers = 0
+        self.start_method = AI_WORKER_START_METHOD  # multiprocessing start method for the pool
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pool_graph = None  # ProvinceGraph the pool's workers were started with
+        self.local_planner: Optional[AIPlanner] = None  # Planner for main-thread planning
 
     def update(self, delta_time):
-        """Update AI for all countries"""
+        """Queue the slices that came due and work on the queue"""
         self.time_accumulator += delta_time
 
-        if self.time_accumulator >= self.update_interval:
-            self.time_accumulator -= self.update_interval
-            self.make_all_decisions()
+        slice_length = self.update_interval / self.time_slices
+        while self.time_accumulator >= (self.next_slice + 1) * slice_length:
+            self._queue_slice(self.next_slice)
+            self.next_slice += 1
+            if self.next_slice == self.time_slices:
+                self.next_slice = 0
+                self.time_accumulator -= self.update_interval
+
+        if self.queue or self.current_steps is not None:
+            self.game_state.profiler.time_call("ai.process_queue", self.process_queue)
+
+    def _queue_slice(self, time_slice: int):
+        """Add the countries of one slice of the week to the work queue and start planning them"""
+        if time_slice == 0:
+            self.week += 1
+        countries = self.game_state.country_manager.get_all_countries()
+        queued = []
+        for country in countries[time_slice::self.time_slices]:
+            # If the AI has fallen a whole week behind, the pending turn is enough
+            if country.code not in self.queued_countries:
+                self.queued_countries.add(country.code)
+                self.queue.append((country.code, self.week))
+                queued.append(country.code)
+        if queued:
+            self.plans.update(self._plan(queued, self.week))
+
+    def process_queue(self):
+        """Apply queued plans until the frame budget is used up
+
+        With a budget, a plan still being made by a worker is waited for on a
+        later update; without one, it is waited for here.
+        """
+        deadline = None
+        if self.frame_budget_ms is not None:
+            deadline = time.perf_counter() + self.frame_budget_ms / 1000.0
+
+        while self.queue or self.current_steps is not None:
+            if self.current_steps is None:
+                country_code, week = self.queue[0]
+                commands = self._collect_plan(self.plans.get(country_code), country_code, week,
+                                              wait=deadline is None)
+                if commands is None:
+                    break
+                self.queue.popleft()
+                self.queued_countries.discard(country_code)
+                self.plans.pop(country_code, None)
+                self.current_steps = self._turn_steps(country_code, commands)
+            try:
+                next(self.current_steps)
+            except StopIteration:
+                self.current_steps = None
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
 
     def make_all_decisions(self):
-        """Make decisions for all AI-controlled countries"""
-        for country in self.game_state.country_manager.get_all_countries():
-            # Skip player country
-            if country.code == self.game_state.player_country:
-                continue
-
-            self.make_country_decisions(country)
-
-    def make_country_decisions(self, country):
-        """Make decisions for one country"""
-        # Economic decisions
-        self.make_economic_decisions(country)
-
-        # Military decisions
-        self.make_military_decisions(country)
-
-        # Diplomatic decisions
-        self.make_diplomatic_decisions(country)
-
-    def make_economic_decisions(self, country):
-        """Make economic decisions (production, building)"""
-        # Recruit units if we have money and manpower
-        if country.money > 500 and country.manpower > 5000:
-            self.consider_recruiting_units(country)
-
-    def consider_recruiting_units(self, country):
-        """Consider recruiting new military units"""
-        # Count existing units
-        land_units = self.game_state.military_system.count_units_by_category(
-            country.code, "land"
-        )
-
-        # Recruit if we have few units
-        if land_units < 5:
-            # Recruit infantry in capital
-            capital = self.game_state.province_manager.get_province(
-                country.capital_province_id
-            )
+        """Make decisions for all AI-controlled countries at once (a full week)"""
+        self.week += 1
+        codes = [country.code for country in self.game_state.country_manager.get_all_countries()]
+        plans = self._plan(codes, self.week)
+        for code in codes:
+            commands = self._collect_plan(plans[code], code, self.week, wait=True)
+            for _ in self._turn_steps(code, commands):
+                pass
+
+    def _plan(self, country_codes: List[str], week: int) -> Dict[str, tuple]:
+        """Start planning some countries' turns against a snapshot of the world now
+
+        Returns a handle per country for _collect_plan: (snapshot, future, index)
+        where future, when set, is a worker batch holding the plan at index.
+        """
+        snapshot = capture_world(self.game_state)
+        pool = self._get_pool()
+        if pool is None:
+            return {code: (snapshot, None, 0) for code in country_codes}
+
+        # One batch per worker, so each snapshot is pickled once per worker
+        batch_size = -(-len(country_codes) // self.workers)
+        handles = {}
+        try:
+            for start in range(0, len(country_codes), batch_size):
+                batch = country_codes[start:start + batch_size]
+                future = pool.submit(plan_in_worker, snapshot, batch, week)
+                for index, code in enumerate(batch):
+                    handles[code] = (snapshot, future, index)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            self._stop_workers(e)
+        # Countries without a worker batch are planned on the main thread
+        return {code: handles.get(code, (snapshot, None, 0)) for code in country_codes}
+
+    def _collect_plan(self, handle: Optional[tuple], country_code: str, week: int,
+                      wait: bool) -> Optional[List[AICommand]]:
+        """A country's planned commands, or None if a worker hasn't finished and wait is False"""
+        if handle is None:  # e.g. a queue restored from a save
+            handle = (capture_world(self.game_state), None, 0)
+        snapshot, future, index = handle
+
+        if future is not None:
+            if not wait and not future.done():
+                return None
+            try:
+                return future.result()[index]
+            except BrokenProcessPool as e:
+                self._stop_workers(e)
+
+        # Countries planned from the same snapshot share its planner (and its indexes)
+        if self.local_planner is None or self.local_planner.snapshot is not snapshot:
+            self.local_planner = AIPlanner(self.game_state.military_system.pathfinder.get_graph(),
+                                           snapshot)
+        return self.local_planner.plan_country(country_code, week)
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """The planner process pool, (re)started when the province graph changes"""
+        if self.workers <= 0:
+            return None
+        graph = self.game_state.military_system.pathfinder.get_graph()
+        if self.pool is not None and self.pool_graph is not graph:
+            self.close()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers,
+                                            mp_context=multiprocessing.get_context(self.start_method),
+                                            initializer=init_worker, initargs=(graph,))
+            self.pool_graph = graph
+        return self.pool
+
+    def _stop_workers(self, error: Exception):
+        """Fall back to planning on the main thread if the worker processes fail"""
+        print(f"AI worker processes unavailable ({error}), planning on the main thread")
+        self.close()
+        self.workers = 0
+
+    def close(self):
+        """Shut down the planner processes"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            self.pool_graph = None
+
+    def _turn_steps(self, country_code: str, commands: List[AICommand]) -> Iterator:
+        """Carry out one country's planned turn"""
+        country = self.game_state.country_manager.get_country(country_code)
+        # Skip player country
+        if country is None or country_code == self.game_state.player_country:
+            return
+        yield from self.country_decision_steps(country, commands)
+
+    def country_decision_steps(self, country, commands: List[AICommand]) -> Iterator:
+        """Apply a country's commands, yielding after each one"""
+        for command in commands:
+            self.apply_command(country, command)
+            yield
+
+        # Answer peace offers made to us
+        self.answer_peace_treaties(country)
+
+    def apply_command(self, country, command: AICommand):
+        """Carry out one planned command if it still makes sense in the live game
+
+        The world may have changed since the snapshot the plan was made from
+        (earlier countries' commands, or updates while a worker was planning).
+        """
+        if command.action == "recruit":
+            capital = self.game_state.province_manager.get_province(command.origin)
             if capital and capital.owner == country.code:
-                # Try to recruit infantry
                 self.game_state.military_system.recruit_unit(
-                    country.code, "infantry", capital.province_id
+                    country.code, command.target, capital.province_id
                 )
 
-    def make_military_decisions(self, country):
-        """Make military decisions (movement, attacks)"""
-        # Check if at war
-        if country.at_war_with:
-            self.conduct_war(country)
-        else:
-            # Consider expansion
-            self.consider_expansion(country)
-
-    def conduct_war(self, country):
-        """Conduct ongoing wars"""
-        for enemy_code in country.at_war_with:
-            # Get our units
-            our_units = self.game_state.military_system.get_units_by_owner(country.code)
-
-            # Find enemy provinces
-            enemy_provinces = self.game_state.province_manager.get_provinces_by_owner(enemy_code)
-
-            if our_units and enemy_provinces:
-                # Move units to attack
-                for unit in our_units:
-                    if not unit.is_moving:
-                        # Find nearest enemy province
-                        target = random.choice(enemy_provinces)
-                        self.game_state.military_system.order_move(
-                            unit, target.province_id
-                        )
-
-    def consider_expansion(self, country):
-        """Consider declaring war for expansion"""
-        # Don't be too aggressive - only expand sometimes
-        if random.random() > 0.1:  # 10% chance per AI update
-            return
-
-        # Find neighbors
-        our_provinces = self.game_state.province_manager.get_provinces_by_owner(country.code)
-        if not our_provinces:
-            return
+        elif command.action == "move":
+            self._apply_move(country, command)
 
-        # Find potential targets
-        for other_country in self.game_state.country_manager.get_all_countries():
-            if other_country.code == country.code:
-                continue
-
-            if other_country.code == self.game_state.player_country:
-                # Less likely to attack player
-                if random.random() > 0.05:
-                    continue
-
-            # Check relative strength
-            our_strength = self._calculate_military_strength(country.code)
-            their_strength = self._calculate_military_strength(other_country.code)
-
-            # Only attack if stronger
-            if our_strength > their_strength * 1.5:
-                # Declare war
-                self.game_state.diplomacy_system.declare_war(
-                    country.code, other_country.code
-                )
-                break  # One war at a time
+        elif command.action == "declare_war":
+            # One war at a time
+            if not country.at_war_with and self.game_state.country_manager.get_country(command.target):
+                self.game_state.diplomacy_system.declare_war(country.code, command.target)
 
-    def make_diplomatic_decisions(self, country):
-        """Make diplomatic decisions (peace, alliances)"""
-        # Check if should make peace
-        for enemy_code in list(country.at_war_with):
-            self.consider_peace(country, enemy_code)
+        elif command.action == "propose_peace":
+            self._apply_peace_proposal(country, command)
 
-        # Check pending peace treaties
-        for treaty in list(self.game_state.diplomacy_system.pending_peace_treaties):
-            if treaty.to_country == country.code:
-                # AI decides whether to accept
-                if self.game_state.diplomacy_system.ai_should_accept_peace(
-                    country.code, treaty
-                ):
-                    self.game_state.diplomacy_system.accept_peace_treaty(treaty)
-
-    def consider_peace(self, country, enemy_code):
-        """Consider making peace with an enemy"""
-        enemy = self.game_state.country_manager.get_country(enemy_code)
-        if not enemy:
+    def _apply_move(self, country, command: AICommand):
+        """Send a unit towards an enemy province along its planned path"""
+        military_system = self.game_state.military_system
+        unit = military_system.get_unit_by_id(command.unit_id)
+        if unit is None or unit.owner != country.code or unit.is_moving:
             return
 
-        # Check war score
-        if enemy_code not in country.war_scores:
+        target = self.game_state.province_manager.get_province(command.target)
+        if target is None or target.owner not in country.at_war_with:
             return
 
-        war_score = country.war_scores[enemy_code]
+        if unit.location == command.origin:
+            military_system.set_path(unit, command.target, command.path)
+        else:
+            military_system.order_move(unit, command.target)
 
-        # If winning big, demand peace
-        if war_score >= 50:
-            # Create peace demands
-            demands = []
+    def _apply_peace_proposal(self, country, command: AICommand):
+        """Propose annexing provinces from an enemy we are beating"""
+        enemy_code = command.target
+        if enemy_code not in country.at_war_with:
+            return
 
-            # Take some provinces
-            enemy_provinces = self.game_state.province_manager.get_provinces_by_owner(enemy_code)
-            provinces_to_take = min(3, len(enemy_provinces), int(war_score / 20))
+        diplomacy = self.game_state.diplomacy_system
+        province_manager = self.game_state.province_manager
+        demands = []
+        for province_id in command.provinces:
+            province = province_manager.get_province(province_id)
+            if province and province.owner == enemy_code:
+                demands.append(diplomacy.create_peace_demand("annex_province", province_id))
+        if not demands:
+            return
 
-            for province in enemy_provinces[:provinces_to_take]:
-                demand = self.game_state.diplomacy_system.create_peace_demand(
-                    "annex_province", province.province_id
-                )
-                demands.append(demand)
+        treaty = diplomacy.propose_peace_treaty(country.code, enemy_code, demands)
 
-            # Propose peace
-            if demands:
-                treaty = self.game_state.diplomacy_system.propose_peace_treaty(
-                    country.code, enemy_code, demands
-                )
+        # AI might auto-accept if war score high enough
+        if treaty and country.war_scores.get(enemy_code, 0) >= 75:
+            if diplomacy.ai_should_accept_peace(enemy_code, treaty):
+                diplomacy.accept_peace_treaty(treaty)
 
-                # AI might auto-accept if war score high enough
-                if treaty and war_score >= 75:
-                    if self.game_state.diplomacy_system.ai_should_accept_peace(
-                        enemy_code, treaty
-                    ):
-                        self.game_state.diplomacy_system.accept_peace_treaty(treaty)
-
-        # If losing badly, try to make peace
-        elif war_score <= -50:
-            # Willing to give up provinces
-            our_provinces = self.game_state.province_manager.get_provinces_by_owner(country.code)
-
-            # Offer some provinces
-            if len(our_provinces) > 1:  # Keep at least capital
-                demands = []
-                provinces_to_give = min(2, len(our_provinces) - 1)
-
-                for province in our_provinces[:provinces_to_give]:
-                    if not province.is_capital:
-                        demand = self.game_state.diplomacy_system.create_peace_demand(
-                            "annex_province", province.province_id
-                        )
-                        demands.append(demand)
-
-                # This would need to be from enemy's perspective
-                # For now, just sue for peace
-                # TODO: Implement peace offers from losing side
-
-    def _calculate_military_strength(self, country_code: str) -> float:
-        """Calculate approximate military strength of a country"""
-        units = self.game_state.military_system.get_units_by_owner(country_code)
-        strength = 0.0
-
-        for unit in units:
-            template = self.game_state.unit_template_manager.get_template(unit.template_id)
-            if template:
-                strength += (template.attack + template.defense) * unit.strength
-
-        return strength
+    def answer_peace_treaties(self, country):
+        """Accept pending peace treaties offered to a country when it should"""
+        diplomacy = self.game_state.diplomacy_system
+        for treaty in list(diplomacy.pending_peace_treaties):
+            if treaty.to_country == country.code:
+                # AI decides whether to accept
+                if diplomacy.ai_should_accept_peace(country.code, treaty):
+                    diplomacy.accept_peace_treaty(treaty)
 
     def _get_ai_personality(self, country_code: str) -> str:
         """Get AI personality for a country (for future expansion)"""
         # Could be loaded from country definitions
-        # For now, random
+        # For now, random (but fixed per country for a given seed)
         personalities = ["aggressive", "defensive", "balanced", "economic"]
-        return random.choice(personalities)
+        return self.game_state.rng.derive("ai.personality", country_code).choice(personalities)
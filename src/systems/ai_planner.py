@@ -0,0 +1,270 @@
+"""
+AI planning against world snapshots
+
+An AI turn has two phases. Planning reads only a WorldSnapshot (a read-only
+copy of the parts of the game the AI looks at) and the ProvinceGraph, and
+turns each country's turn into a list of AICommands. The AIController then
+applies the commands on the main thread, one country at a time.
+
+Planning touches no live game objects, so it can run in worker processes:
+each worker receives the graph once when it starts and a snapshot with every
+batch of countries. Each country draws from its own random stream keyed by
+(country, week), so a plan doesn't depend on which process made it.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.province import ProvinceColumns
+from src.rng import RandomStreams
+from src.systems.pathfinding import DistanceField, ProvinceGraph
+
+NO_ID = -1
+
+# Unit columns copied into a snapshot
+SNAPSHOT_UNIT_FIELDS = ("unit_id", "template_index", "owner_index", "location", "is_moving")
+
+
+@dataclass
+class AICommand:
+    """One order from a country's plan
+
+    Actions:
+        "recruit"       target = template ID, origin = province to recruit in
+        "move"          unit_id walks from origin along path to target province
+        "declare_war"   target = country code
+        "propose_peace" target = enemy code, provinces = provinces to annex
+    """
+    action: str
+    country: str
+    target: object = None
+    unit_id: int = NO_ID
+    origin: int = NO_ID
+    path: Tuple[int, ...] = ()
+    provinces: Tuple[int, ...] = ()
+
+
+@dataclass
+class CountrySnapshot:
+    """The parts of a Country the AI reads"""
+    code: str
+    money: float
+    manpower: int
+    capital_province_id: int
+    at_war_with: Tuple[str, ...]
+    war_scores: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class WorldSnapshot:
+    """Read-only copy of the game state AI planning works from"""
+    seed: int
+    player_country: Optional[str]
+    countries: Dict[str, CountrySnapshot]  # In country manager order
+    province_owner: np.ndarray  # Owner index per province row (rows as in ProvinceGraph)
+    owner_codes: List[str]  # Province owner index -> country code
+    units: Dict[str, np.ndarray]  # SNAPSHOT_UNIT_FIELDS, one entry per unit
+    unit_owner_codes: List[str]  # Unit owner index -> country code
+    template_categories: List[str]  # Unit template index -> category
+    strengths: Dict[str, float]  # Country code -> MilitarySystem.get_military_strength
+    land_unit_counts: Dict[str, int]  # Country code -> number of land units
+    frontlines: Dict[Tuple[str, str], List[int]]  # (enemy, country) at war -> enemy border provinces
+
+
+def capture_world(game_state) -> WorldSnapshot:
+    """Copy what the AI needs out of the live game"""
+    province_columns = game_state.province_manager.columns
+    military_system = game_state.military_system
+    unit_columns = military_system.columns
+    template_manager = game_state.unit_template_manager
+
+    frontline_service = game_state.frontline_service
+    countries = {}
+    frontlines = {}
+    for country in game_state.country_manager.get_all_countries():
+        for enemy_code in country.at_war_with:
+            frontlines[enemy_code, country.code] = frontline_service.get_frontline(enemy_code, country.code)
+        countries[country.code] = CountrySnapshot(
+            code=country.code,
+            money=country.money,
+            manpower=country.manpower,
+            capital_province_id=country.capital_province_id,
+            at_war_with=tuple(country.at_war_with),
+            war_scores=dict(country.war_scores)
+        )
+
+    templates = [template_manager.get_template(template_id)
+                 for template_id in unit_columns.template_ids]
+    return WorldSnapshot(
+        seed=game_state.rng.seed,
+        player_country=game_state.player_country,
+        countries=countries,
+        province_owner=np.array(province_columns.owner_index),
+        owner_codes=list(province_columns.owner_codes),
+        units={name: np.array(unit_columns.column(name)) for name in SNAPSHOT_UNIT_FIELDS},
+        unit_owner_codes=list(unit_columns.owner_codes),
+        template_categories=[template.category if template else "land" for template in templates],
+        strengths={code: military_system.get_military_strength(code) for code in countries},
+        land_unit_counts={code: military_system.count_units_by_category(code, "land")
+                          for code in countries},
+        frontlines=frontlines
+    )
+
+
+class AIPlanner:
+    """Plans AI turns from one WorldSnapshot"""
+
+    def __init__(self, graph: ProvinceGraph, snapshot: WorldSnapshot):
+        self.graph = graph
+        self.snapshot = snapshot
+        self.rng_streams = RandomStreams(snapshot.seed)
+
+        # Province IDs per owner, sorted by ID like ProvinceManager.get_provinces_by_owner
+        owner_index = snapshot.province_owner
+        order = np.lexsort((graph.province_ids, owner_index))
+        owned_ids = graph.province_ids[order].tolist()
+        bounds = np.searchsorted(owner_index[order], np.arange(len(snapshot.owner_codes) + 1)).tolist()
+        self.provinces_by_owner = {code: owned_ids[bounds[i]:bounds[i + 1]]
+                                   for i, code in enumerate(snapshot.owner_codes)}
+
+        # Unit rows per owner in creation order
+        unit_owner = snapshot.units["owner_index"]
+        order = np.argsort(unit_owner, kind="stable")
+        bounds = np.searchsorted(unit_owner[order],
+                                 np.arange(len(snapshot.unit_owner_codes) + 1)).tolist()
+        rows = order.tolist()
+        self.unit_rows_by_owner = {code: rows[bounds[i]:bounds[i + 1]]
+                                   for i, code in enumerate(snapshot.unit_owner_codes)}
+
+    def plan_country(self, country_code: str, week: int) -> List[AICommand]:
+        """Plan one country's turn for a week"""
+        snapshot = self.snapshot
+        country = snapshot.countries.get(country_code)
+        # Skip player country
+        if country is None or country_code == snapshot.player_country:
+            return []
+
+        rng = self.rng_streams.derive("ai", country_code, week)
+        commands: List[AICommand] = []
+
+        # Economic decisions
+        if country.money > 500 and country.manpower > 5000:
+            self.consider_recruiting_units(country, commands)
+
+        # Military decisions
+        if country.at_war_with:
+            self.conduct_war(country, commands)
+        else:
+            self.consider_expansion(country, rng, commands)
+
+        # Diplomatic decisions
+        for enemy_code in country.at_war_with:
+            self.consider_peace(country, enemy_code, commands)
+
+        return commands
+
+    def consider_recruiting_units(self, country: CountrySnapshot, commands: List[AICommand]):
+        """Recruit infantry in the capital while we have few land units"""
+        if self.snapshot.land_unit_counts.get(country.code, 0) >= 5:
+            return
+        row = self.graph.row_of.get(country.capital_province_id)
+        if row is not None and self._owner_of_row(row) == country.code:
+            commands.append(AICommand("recruit", country.code, "infantry",
+                                      origin=country.capital_province_id))
+
+    def conduct_war(self, country: CountrySnapshot, commands: List[AICommand]):
+        """Send every idle unit to its nearest enemy province on our frontlines
+
+        Targets are the enemy provinces bordering us (or all provinces of an
+        enemy we share no border with). One DistanceField from all targets
+        routes every unit, so a country needs one graph search per turn
+        (two if it has air units) however large its army.
+        """
+        units = self.snapshot.units
+        idle_rows = [row for row in self.unit_rows_by_owner.get(country.code, [])
+                     if not units["is_moving"][row]]
+        targets = set()
+        for enemy_code in country.at_war_with:
+            targets.update(self.snapshot.frontlines.get((enemy_code, country.code))
+                           or self.provinces_by_owner.get(enemy_code, ()))
+        if not idle_rows or not targets:
+            return
+
+        # Air units ignore terrain, so they get their own field
+        categories = self.snapshot.template_categories
+        rows_by_cost = {}
+        for row in idle_rows:
+            cost_type = "air" if categories[units["template_index"][row]] == "air" else "land"
+            rows_by_cost.setdefault(cost_type, []).append(row)
+
+        row_of = self.graph.row_of
+        for cost_type, rows in rows_by_cost.items():
+            locations = [int(units["location"][row]) for row in rows]
+            field = DistanceField(self.graph, targets, cost_type,
+                                  stop_at=[row_of[location] for location in locations
+                                           if location in row_of])
+            for row, location in zip(rows, locations):
+                path = field.path_from(location)
+                if path:
+                    commands.append(AICommand("move", country.code, path[-1],
+                                              unit_id=int(units["unit_id"][row]),
+                                              origin=location, path=path))
+
+    def consider_expansion(self, country: CountrySnapshot, rng, commands: List[AICommand]):
+        """Consider declaring war for expansion"""
+        # Don't be too aggressive - only expand sometimes
+        if rng.random() > 0.1:  # 10% chance per AI update
+            return
+
+        if not self.provinces_by_owner.get(country.code):
+            return
+
+        strengths = self.snapshot.strengths
+        our_strength = strengths.get(country.code, 0.0)
+        for other_code in self.snapshot.countries:
+            if other_code == country.code:
+                continue
+
+            if other_code == self.snapshot.player_country:
+                # Less likely to attack player
+                if rng.random() > 0.05:
+                    continue
+
+            # Only attack if stronger
+            if our_strength > strengths.get(other_code, 0.0) * 1.5:
+                commands.append(AICommand("declare_war", country.code, other_code))
+                break  # One war at a time
+
+    def consider_peace(self, country: CountrySnapshot, enemy_code: str, commands: List[AICommand]):
+        """Demand provinces from an enemy we are beating"""
+        if enemy_code not in self.snapshot.countries or enemy_code not in country.war_scores:
+            return
+
+        war_score = country.war_scores[enemy_code]
+        if war_score >= 50:
+            enemy_provinces = self.provinces_by_owner.get(enemy_code, [])
+            provinces_to_take = min(3, len(enemy_provinces), int(war_score / 20))
+            if provinces_to_take:
+                commands.append(AICommand("propose_peace", country.code, enemy_code,
+                                          provinces=tuple(enemy_provinces[:provinces_to_take])))
+
+        # TODO: Implement peace offers from losing side (war score <= -50)
+
+    def _owner_of_row(self, row: int) -> Optional[str]:
+        index = int(self.snapshot.province_owner[row])
+        return None if index == ProvinceColumns.NO_OWNER else self.snapshot.owner_codes[index]
+
+
+# Worker process state, set up once per process by init_worker
+_worker_graph: Optional[ProvinceGraph] = None
+
+
+def init_worker(graph: ProvinceGraph):
+    """Process pool initializer: keep the static graph for every batch"""
+    global _worker_graph
+    _worker_graph = graph
+
+
+def plan_in_worker(snapshot: WorldSnapshot, country_codes: List[str], week: int) -> List[List[AICommand]]:
+    """Plan a batch of countries in a worker process, one command list per country"""
+    planner = AIPlanner(_worker_graph, snapshot)
+    return [planner.plan_country(code, week) for code in country_codes]
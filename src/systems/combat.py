@@ -1,9 +1,9 @@
 """
 Combat resolution system
 """
-import random
 from typing import List, Dict, Optional
 from dataclasses import dataclass
+import numpy as np
 
 
 @dataclass
@@ -18,11 +18,27 @@ class Battle:
 class CombatSystem:
     """Manages combat resolution"""
 
+    # Defence multiplier by terrain type
+    TERRAIN_MODIFIERS = {
+        "plains": 1.0,
+        "hills": 1.2,
+        "mountains": 1.5,
+        "forest": 1.3,
+        "urban": 1.4,
+        "marsh": 1.1
+    }
+
     def __init__(self, game_state):
         self.game_state = game_state
         self.active_battles = []  # List of Battle objects
+        self.battles_by_province = {}  # province_id -> Battle
+        self.dirty_provinces = set()  # Provinces to check for new battles next tick
         self.combat_update_interval = 1.0  # Update combat every game hour
         self.time_accumulator = 0.0
+        self.tick_count = 0  # Combat ticks run so far (used to key battle dice rolls)
+
+        # Defence multiplier per province row (terrain doesn't change during a game)
+        self.terrain_modifiers: Optional[np.ndarray] = None
 
     def update(self, delta_time):
         """Update all active battles"""
@@ -30,46 +46,63 @@ class CombatSystem:
 
         if self.time_accumulator >= self.combat_update_interval:
             self.time_accumulator -= self.combat_update_interval
+            self.tick_count += 1
+
+            profiler = self.game_state.profiler
 
             # Check for new battles
-            self.detect_battles()
+            profiler.time_call("combat.detect_battles", self.detect_battles)
 
             # Resolve active battles
-            for battle in self.active_battles[:]:
-                self.resolve_battle_tick(battle)
-                battle.duration += self.combat_update_interval
+            profiler.time_call("combat.resolve_battles", self.resolve_battles)
+
+    def resolve_battles(self):
+        """Resolve one tick of every active battle"""
+        battles = self.active_battles[:]
+        self._resolve_battle_batch(battles)
+        for battle in battles:
+            battle.duration += self.combat_update_interval
+
+    def mark_province_dirty(self, province_id: int):
+        """Flag a province to be checked for a new battle on the next combat tick"""
+        self.dirty_provinces.add(province_id)
+
+    def mark_all_occupied_dirty(self):
+        """Flag every province that contains units (e.g. after loading a game)"""
+        self.dirty_provinces.update(self.game_state.military_system.get_occupied_provinces())
+
+    def on_war_declared(self, country1: str, country2: str):
+        """Flag provinces where both sides of a new war already have units"""
+        columns = self.game_state.military_system.columns
+        locations = columns.column("location")
+        shared = np.intersect1d(locations[columns.owner_rows(country1)],
+                                locations[columns.owner_rows(country2)])
+        self.dirty_provinces.update(shared.tolist())
 
     def detect_battles(self):
         """Detect provinces with hostile units (battles)"""
-        # Check each province for units from different countries at war
-        for province in self.game_state.province_manager.provinces.values():
-            units = self.game_state.military_system.get_units_in_province(province.province_id)
+        if not self.dirty_provinces:
+            return
 
-            if len(units) < 2:
-                continue
+        # Only provinces flagged by unit arrivals or war declarations are checked
+        military_system = self.game_state.military_system
+        contested = military_system.get_contested_provinces(self.dirty_provinces)
+        self.dirty_provinces.clear()
 
-            # Group units by owner
-            by_owner = {}
-            for unit in units:
-                if unit.owner not in by_owner:
-                    by_owner[unit.owner] = []
-                by_owner[unit.owner].append(unit)
+        # Only provinces with units of two or more owners can hold a battle (in ID order)
+        provinces = self.game_state.province_manager.provinces
+        for province_id, owners in contested.items():
+            if province_id not in provinces or self._has_battle_in_province(province_id):
+                continue
 
             # Check if any are at war
-            owners = list(by_owner.keys())
-            for i, owner1 in enumerate(owners):
-                for owner2 in owners[i+1:]:
-                    country1 = self.game_state.country_manager.get_country(owner1)
-                    country2 = self.game_state.country_manager.get_country(owner2)
-
-                    if country1 and country2 and country1.is_at_war_with(owner2):
-                        # Battle exists!
-                        if not self._has_battle_in_province(province.province_id):
-                            self.start_battle(province.province_id, owner1, owner2)
+            hostile = self.game_state.country_manager.find_hostile_pair(owners)
+            if hostile:
+                self.start_battle(province_id, *hostile)
 
     def _has_battle_in_province(self, province_id: int) -> bool:
         """Check if battle already exists in province"""
-        return any(b.province_id == province_id for b in self.active_battles)
+        return province_id in self.battles_by_province
 
     def start_battle(self, province_id: int, attacker: str, defender: str):
         """Start a new battle"""
@@ -79,117 +112,154 @@ class CombatSystem:
             defenders=[defender]
         )
         self.active_battles.append(battle)
+        self.battles_by_province[province_id] = battle
+
+    def reset_battles(self, battles: List[Battle]):
+        """Replace every active battle (e.g. when loading a save)"""
+        self.active_battles = list(battles)
+        self.battles_by_province = {battle.province_id: battle for battle in battles}
+
+    def _remove_battle(self, battle: Battle):
+        """Remove a battle and re-check its province for other hostile parties"""
+        if battle in self.active_battles:
+            self.active_battles.remove(battle)
+        if self.battles_by_province.get(battle.province_id) is battle:
+            del self.battles_by_province[battle.province_id]
+        self.mark_province_dirty(battle.province_id)
 
     def resolve_battle_tick(self, battle: Battle):
         """Resolve one tick of combat"""
-        province = self.game_state.province_manager.get_province(battle.province_id)
-        if not province:
-            self.active_battles.remove(battle)
+        self._resolve_battle_batch([battle])
+
+    def _resolve_battle_batch(self, battles: List[Battle]):
+        """Resolve one tick of many battles in a single vectorised pass
+
+        Every unit standing in a battle province is assigned to its battle and
+        side, powers are summed per battle and side, the dice are rolled for
+        all battles at once and damage is scattered back to the unit columns.
+        Battles are independent (one per province), so this gives the same
+        result as resolving them one by one.
+        """
+        province_manager = self.game_state.province_manager
+        valid_battles = []
+        for battle in battles:
+            if battle.province_id in province_manager.provinces:
+                valid_battles.append(battle)
+            else:
+                self._remove_battle(battle)
+        battles = valid_battles
+        if not battles:
             return
 
-        # Get all units in battle
+        columns = self.game_state.military_system.columns
+        templates = self.game_state.unit_template_manager
+        battle_count = len(battles)
+
+        # Side of each owner in each battle: 1 attacker, 2 defender
+        battle_provinces = np.array([battle.province_id for battle in battles], dtype=np.int64)
+        sides = [(index, columns.get_owner_index(code), side)
+                 for index, battle in enumerate(battles)
+                 for side, codes in ((1, battle.attackers), (2, battle.defenders))
+                 for code in codes]
+        side_of_owner = np.zeros((battle_count, len(columns.owner_codes)), dtype=np.int8)
+        for index, owner_index, side in sides:
+            side_of_owner[index, owner_index] = side
+
+        # Find each unit's battle (if any) through a province ID -> battle lookup
+        battle_of_province = np.full(int(province_manager.columns.province_ids.max()) + 1, -1,
+                                     dtype=np.int32)
+        battle_of_province[battle_provinces] = np.arange(battle_count)
+        unit_battle = battle_of_province[columns.column("location")]
+        rows = np.flatnonzero((unit_battle >= 0) & (columns.column("owner_index") >= 0))
+        unit_battle = unit_battle[rows]
+        unit_side = side_of_owner[unit_battle, columns.column("owner_index")[rows]]
+
+        attacking = unit_side == 1
+        defending = unit_side == 2
+        attacker_rows, attacker_battle = rows[attacking], unit_battle[attacking]
+        defender_rows, defender_battle = rows[defending], unit_battle[defending]
+        attacker_count = np.bincount(attacker_battle, minlength=battle_count)
+        defender_count = np.bincount(defender_battle, minlength=battle_count)
+
+        # Battles where one side has no units left are over
+        over = (attacker_count == 0) | (defender_count == 0)
+        for index in np.flatnonzero(over).tolist():
+            battle = battles[index]
+            attacker_units, defender_units = self._get_battle_units(battle)
+            self.end_battle(battle, attacker_units, defender_units)
+        fighting = ~over
+        attacker_rows, attacker_battle = (attacker_rows[fighting[attacker_battle]],
+                                          attacker_battle[fighting[attacker_battle]])
+        defender_rows, defender_battle = (defender_rows[fighting[defender_battle]],
+                                          defender_battle[fighting[defender_battle]])
+
+        # Calculate combat values
+        attack = columns.effective_values(attacker_rows, columns.template_values(templates, "attack"))
+        defense = columns.effective_values(defender_rows, columns.template_values(templates, "defense"))
+        attack_power = np.bincount(attacker_battle, weights=attack, minlength=battle_count)
+        defense_power = np.bincount(defender_battle, weights=defense, minlength=battle_count)
+
+        # Apply terrain modifier
+        province_rows = np.array([province_manager.columns.row_of[province_id]
+                                  for province_id in battle_provinces.tolist()], dtype=np.int64)
+        defense_power = defense_power * self._get_terrain_modifiers()[province_rows]
+
+        # Dice rolls for randomness (one stream per battle province and tick)
+        rng = self.game_state.rng
+        attack_dice = rng.uniform_array(battle_provinces, "battle.attack", self.tick_count)
+        defense_dice = rng.uniform_array(battle_provinces, "battle.defense", self.tick_count)
+        attack_roll = attack_power * (0.7 + 0.6 * attack_dice)
+        defense_roll = defense_power * (0.7 + 0.6 * defense_dice)
+
+        # Apply damage: the winner deals half the margin, the loser a fifth of its roll
+        attackers_winning = attack_roll > defense_roll
+        damage_to_defender = np.where(attackers_winning,
+                                      (attack_roll - defense_roll) * 0.5, attack_roll * 0.2)
+        damage_to_attacker = np.where(attackers_winning,
+                                      defense_roll * 0.2, (defense_roll - attack_roll) * 0.5)
+
+        # Damage is shared equally by a side's units
+        max_hp = columns.template_values(templates, "max_hp")
+        with np.errstate(divide="ignore", invalid="ignore"):  # Battles that ended have no units
+            defender_damage = (damage_to_defender / defender_count)[defender_battle]
+            attacker_damage = (damage_to_attacker / attacker_count)[attacker_battle]
+        columns.apply_damage(defender_rows, defender_damage, max_hp)
+        columns.apply_damage(attacker_rows, attacker_damage, max_hp)
+
+    def _get_battle_units(self, battle: Battle):
+        """Get (attacker units, defender units) standing in a battle's province"""
+        military_system = self.game_state.military_system
         attacker_units = []
         defender_units = []
-
         for attacker in battle.attackers:
             attacker_units.extend(
-                self.game_state.military_system.get_units_in_province_by_owner(
-                    battle.province_id, attacker
-                )
+                military_system.get_units_in_province_by_owner(battle.province_id, attacker)
             )
-
         for defender in battle.defenders:
             defender_units.extend(
-                self.game_state.military_system.get_units_in_province_by_owner(
-                    battle.province_id, defender
-                )
+                military_system.get_units_in_province_by_owner(battle.province_id, defender)
             )
-
-        # Check if battle is over
-        if not attacker_units or not defender_units:
-            self.end_battle(battle, attacker_units, defender_units)
-            return
-
-        # Calculate combat values
-        attack_power = self._calculate_combat_power(attacker_units, is_attacking=True)
-        defense_power = self._calculate_combat_power(defender_units, is_attacking=False)
-
-        # Apply terrain modifier
-        terrain_modifier = self._get_terrain_modifier(province.terrain_type)
-        defense_power *= terrain_modifier
-
-        # Dice rolls for randomness
-        attack_roll = attack_power * random.uniform(0.7, 1.3)
-        defense_roll = defense_power * random.uniform(0.7, 1.3)
-
-        # Apply damage
-        if attack_roll > defense_roll:
-            # Attackers winning
-            damage_to_defender = (attack_roll - defense_roll) * 0.5
-            self._apply_damage_to_units(defender_units, damage_to_defender)
-
-            # Light damage to attacker
-            damage_to_attacker = defense_roll * 0.2
-            self._apply_damage_to_units(attacker_units, damage_to_attacker)
-        else:
-            # Defenders winning
-            damage_to_attacker = (defense_roll - attack_roll) * 0.5
-            self._apply_damage_to_units(attacker_units, damage_to_attacker)
-
-            # Light damage to defender
-            damage_to_defender = attack_roll * 0.2
-            self._apply_damage_to_units(defender_units, damage_to_defender)
-
-        # Check for retreats
-        self._check_retreats(attacker_units, defender_units)
-
-    def _calculate_combat_power(self, units: List, is_attacking: bool) -> float:
-        """Calculate total combat power of units"""
-        total = 0.0
-        for unit in units:
-            template = self.game_state.unit_template_manager.get_template(unit.template_id)
-            if template:
-                if is_attacking:
-                    total += unit.get_effective_attack(template)
-                else:
-                    total += unit.get_effective_defense(template)
-        return total
+        return attacker_units, defender_units
+
+    def _get_terrain_modifiers(self) -> np.ndarray:
+        """Defence multiplier per province row, built on first use"""
+        province_manager = self.game_state.province_manager
+        province_count = len(province_manager.province_rows)
+        if self.terrain_modifiers is None or len(self.terrain_modifiers) != province_count:
+            self.terrain_modifiers = np.array(
+                [self._get_terrain_modifier(province.terrain_type)
+                 for province in province_manager.province_rows], dtype=np.float64)
+        return self.terrain_modifiers
 
     def _get_terrain_modifier(self, terrain_type: str) -> float:
         """Get terrain combat modifier"""
-        modifiers = {
-            "plains": 1.0,
-            "hills": 1.2,
-            "mountains": 1.5,
-            "forest": 1.3,
-            "urban": 1.4,
-            "marsh": 1.1
-        }
-        return modifiers.get(terrain_type, 1.0)
-
-    def _apply_damage_to_units(self, units: List, total_damage: float):
-        """Distribute damage among units"""
-        if not units:
-            return
-
-        damage_per_unit = total_damage / len(units)
-
-        for unit in units:
-            template = self.game_state.unit_template_manager.get_template(unit.template_id)
-            if template:
-                unit.take_damage(damage_per_unit, template)
-
-    def _check_retreats(self, attacker_units: List, defender_units: List):
-        """Check if any units should retreat"""
-        # Simple retreat: if organization too low, move to adjacent province
-        # For now, just mark them for removal
-        pass
+        return self.TERRAIN_MODIFIERS.get(terrain_type, 1.0)
 
     def end_battle(self, battle: Battle, remaining_attackers: List, remaining_defenders: List):
         """End a battle and determine winner"""
         province = self.game_state.province_manager.get_province(battle.province_id)
         if not province:
-            self.active_battles.remove(battle)
+            self._remove_battle(battle)
             return
 
         # Determine winner
@@ -208,12 +278,12 @@ class CombatSystem:
         elif remaining_defenders and not remaining_attackers:
             # Defenders won
             winner = battle.defenders[0] if battle.defenders else None
-            if winner and old_owner := battle.attackers[0]:
-                self._award_war_score(winner, old_owner, 2)  # 2 points for defense
+            loser = battle.attackers[0] if battle.attackers else None
+            if winner and loser:
+                self._award_war_score(winner, loser, 2)  # 2 points for defense
 
         # Remove battle
-        if battle in self.active_battles:
-            self.active_battles.remove(battle)
+        self._remove_battle(battle)
 
     def _award_war_score(self, winner: str, loser: str, points: int):
         """Award war score to winner"""
@@ -226,7 +296,4 @@ class CombatSystem:
 
     def get_battle_in_province(self, province_id: int) -> Optional[Battle]:
         """Get battle happening in a province"""
-        for battle in self.active_battles:
-            if battle.province_id == province_id:
-                return battle
-        return None
+        return self.battles_by_province.get(province_id)
@@ -41,6 +41,12 @@ class DiplomacySystem:
         attacker_country.declare_war(defender)
         defender_country.declare_war(attacker)
 
+        # Units already sharing a province with the new enemy start fighting
+        if self.game_state.combat_system:
+            self.game_state.combat_system.on_war_declared(attacker, defender)
+
+        self._invalidate_paths()
+
         return True
 
     def make_peace(self, country1: str, country2: str):
@@ -51,6 +57,12 @@ class DiplomacySystem:
         if country1_obj and country2_obj:
             country1_obj.make_peace(country2)
             country2_obj.make_peace(country1)
+            self._invalidate_paths()
+
+    def _invalidate_paths(self):
+        """Cached unit paths were planned for the old war state"""
+        if self.game_state.military_system:
+            self.game_state.military_system.pathfinder.invalidate()
 
     def create_peace_demand(self, demand_type: str, target_data: any) -> PeaceDemand:
         """Create a peace demand with appropriate war score cost"""
@@ -154,7 +166,7 @@ class DiplomacySystem:
 
         # Check demands severity
         provinces_lost = sum(1 for d in treaty.demands if d.demand_type == "annex_province")
-        total_provinces = len(self.game_state.province_manager.get_provinces_by_owner(country_code))
+        total_provinces = self.game_state.province_manager.count_provinces_by_owner(country_code)
 
         # Don't accept if losing more than 50% of provinces
         if total_provinces > 0 and provinces_lost / total_provinces > 0.5:
@@ -1,6 +1,7 @@
 """
 Economy system for automatic resource generation and management
 """
+import numpy as np
 
 
 class EconomySystem:
@@ -17,22 +18,42 @@ class EconomySystem:
 
         if self.time_accumulator >= self.update_interval:
             self.time_accumulator -= self.update_interval
-            self.collect_daily_income()
-            self.collect_manpower()
+            self.game_state.profiler.time_call("economy.daily_tick", self.collect_daily_resources)
+
+    def collect_daily_resources(self):
+        """Collect daily income and manpower for every country in one pass"""
+        income, manpower = self._daily_totals_by_owner()
+        for country, index in self._countries_with_owner_index():
+            country.add_money(float(income[index]))
+            country.add_manpower(int(manpower[index]))
 
     def collect_daily_income(self):
         """Collect daily income from all provinces"""
-        for country in self.game_state.country_manager.get_all_countries():
-            provinces = self.game_state.province_manager.get_provinces_by_owner(country.code)
-            daily_income = sum(p.get_income() for p in provinces)
-            country.add_money(daily_income)
+        income, _ = self._daily_totals_by_owner()
+        for country, index in self._countries_with_owner_index():
+            country.add_money(float(income[index]))
 
     def collect_manpower(self):
         """Collect manpower from provinces"""
+        _, manpower = self._daily_totals_by_owner()
+        for country, index in self._countries_with_owner_index():
+            country.add_manpower(int(manpower[index]))
+
+    def _daily_totals_by_owner(self):
+        """Compute per-owner-index daily income and manpower from the province columns"""
+        columns = self.game_state.province_manager.columns
+        income = columns.column("base_income") * columns.column("development")
+        manpower = columns.column("population") // 100  # 1% of population per day
+        return (columns.sum_by_owner(income),
+                np.rint(columns.sum_by_owner(manpower)).astype(np.int64))
+
+    def _countries_with_owner_index(self):
+        """Yield (country, owner index) for every country that owns provinces"""
+        columns = self.game_state.province_manager.columns
         for country in self.game_state.country_manager.get_all_countries():
-            provinces = self.game_state.province_manager.get_provinces_by_owner(country.code)
-            manpower_gain = sum(p.population // 100 for p in provinces)  # 1% of population per day
-            country.add_manpower(manpower_gain)
+            index = columns.owner_to_index.get(country.code)
+            if index is not None:
+                yield country, index
 
     def can_afford_unit(self, country_code, unit_cost, manpower_cost):
         """Check if country can afford to build a unit"""
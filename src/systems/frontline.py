@@ -0,0 +1,135 @@
+"""
+Frontlines between neighbouring countries
+"""
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class FrontlineService:
+    """Border provinces between every pair of neighbouring owners
+
+    For each province row the service counts adjacent provinces per owner.
+    A province of A is on the (A, B) frontline while at least one of its
+    neighbours belongs to B. An ownership change only touches the changed
+    province and its neighbours, and sorted frontlines are cached per pair
+    until one of their provinces changes, so AI targeting and map overlays
+    can query them as often as they like.
+
+    Built from the adjacency graph on first use, and rebuilt if the
+    provinces or their adjacency are replaced.
+    """
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.neighbor_owners: Optional[List[Dict[str, int]]] = None  # row -> {owner: adjacent provinces}
+        self.frontlines: Dict[Tuple[str, str], Set[int]] = {}  # (owner, neighbour owner) -> province IDs
+        self.sorted_frontlines: Dict[Tuple[str, str], List[int]] = {}  # Cached get_frontline results
+        self.built_for = None  # Province manager state the counts were built from
+
+        game_state.province_manager.add_owner_listener(self._on_owner_changed)
+
+    def get_frontline(self, country_code: str, other_code: str) -> List[int]:
+        """IDs of a country's provinces adjacent to another country's, sorted (don't modify)"""
+        self._ensure_built()
+        key = (country_code, other_code)
+        frontline = self.sorted_frontlines.get(key)
+        if frontline is None:
+            frontline = self.sorted_frontlines[key] = sorted(self.frontlines.get(key, ()))
+        return frontline
+
+    def get_war_frontline(self, country_code: str) -> List[int]:
+        """IDs of a country's provinces bordering any country it is at war with, sorted"""
+        province_ids = set()
+        for enemy_code in self.game_state.country_manager.get_enemies(country_code):
+            province_ids.update(self.get_frontline(country_code, enemy_code))
+        return sorted(province_ids)
+
+    def get_neighbors(self, country_code: str) -> List[str]:
+        """Codes of the countries sharing a border with a country"""
+        self._ensure_built()
+        return sorted(other for owner, other in self.frontlines if owner == country_code)
+
+    def invalidate(self):
+        """Drop everything; rebuilt on the next query"""
+        self.neighbor_owners = None
+        self.frontlines = {}
+        self.sorted_frontlines = {}
+        self.built_for = None
+
+    def _state_key(self):
+        province_manager = self.game_state.province_manager
+        return province_manager.columns.size, id(province_manager.adjacency_offsets)
+
+    def _ensure_built(self):
+        """Count every province's neighbouring owners if not done for the current graph"""
+        if self.neighbor_owners is not None and self.built_for == self._state_key():
+            return
+
+        self.invalidate()
+        province_manager = self.game_state.province_manager
+        rows = province_manager.province_rows
+        self.neighbor_owners = [{} for _ in rows]
+        self.built_for = self._state_key()
+        if not province_manager.has_adjacency():
+            return
+
+        owners = [province.owner for province in rows]
+        bounds = province_manager.adjacency_offsets.tolist()
+        neighbors = province_manager.adjacency_neighbors.tolist()
+        for row, province in enumerate(rows):
+            counts = self.neighbor_owners[row]
+            for neighbor in neighbors[bounds[row]:bounds[row + 1]]:
+                other = owners[neighbor]
+                if other is not None:
+                    counts[other] = counts.get(other, 0) + 1
+
+            owner = owners[row]
+            if owner is not None:
+                for other in counts:
+                    if other != owner:
+                        self.frontlines.setdefault((owner, other), set()).add(province.province_id)
+
+    def _on_owner_changed(self, province, old_owner, new_owner):
+        """Move the province between frontlines and update its neighbours' counts"""
+        if self.neighbor_owners is None or self.built_for != self._state_key():
+            return  # Rebuilt from scratch on the next query
+
+        province_manager = self.game_state.province_manager
+        if not province_manager.has_adjacency():
+            return
+        row = province_manager.columns.row_of[province.province_id]
+
+        # The province leaves its old owner's frontlines and joins the new owner's
+        for other in self.neighbor_owners[row]:
+            if old_owner is not None and other != old_owner:
+                self._remove(old_owner, other, province.province_id)
+            if new_owner is not None and other != new_owner:
+                self._add(new_owner, other, province.province_id)
+
+        # Its neighbours now border the new owner instead of the old one
+        rows = province_manager.province_rows
+        for neighbor_row in province_manager.get_neighbor_rows(row).tolist():
+            neighbor = rows[neighbor_row]
+            counts = self.neighbor_owners[neighbor_row]
+            if old_owner is not None:
+                counts[old_owner] -= 1
+                if not counts[old_owner]:
+                    del counts[old_owner]
+                    if neighbor.owner is not None and neighbor.owner != old_owner:
+                        self._remove(neighbor.owner, old_owner, neighbor.province_id)
+            if new_owner is not None:
+                counts[new_owner] = counts.get(new_owner, 0) + 1
+                if counts[new_owner] == 1 and neighbor.owner is not None and neighbor.owner != new_owner:
+                    self._add(neighbor.owner, new_owner, neighbor.province_id)
+
+    def _add(self, owner: str, other: str, province_id: int):
+        self.frontlines.setdefault((owner, other), set()).add(province_id)
+        self.sorted_frontlines.pop((owner, other), None)
+
+    def _remove(self, owner: str, other: str, province_id: int):
+        key = (owner, other)
+        frontline = self.frontlines.get(key)
+        if frontline is not None:
+            frontline.discard(province_id)
+            if not frontline:
+                del self.frontlines[key]
+        self.sorted_frontlines.pop(key, None)
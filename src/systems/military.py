@@ -1,8 +1,11 @@
 """
 Military system for unit management, movement, and recruitment
 """
-from typing import List, Optional
-from src.unit import Unit, UnitTemplate
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from src.unit import Unit, UnitColumns, UnitSequence, UnitTemplate
+from src.systems.pathfinding import Pathfinder
+from src.constants import PROVINCE_MOVE_DISTANCE, PATH_CACHE_SIZE
 
 
 class MilitarySystem:
@@ -10,19 +13,46 @@ class MilitarySystem:
 
     def __init__(self, game_state):
         self.game_state = game_state
-        self.units = []  # List of all units
+        self.columns = UnitColumns()  # Columnar storage for every unit's fields
         self.next_unit_id = 1
+        self.pathfinder = Pathfinder(game_state, PATH_CACHE_SIZE)
+
+        # Callbacks run as (province_id) whenever a unit enters or leaves a province
+        self.stack_listeners: List[Callable] = []
+
+    @property
+    def units(self) -> UnitSequence:
+        """All units, in creation order (a live view)"""
+        return UnitSequence(self.columns)
 
     def update(self, delta_time):
         """Update military units"""
-        # Move units
-        for unit in self.units[:]:  # Copy list to allow removal
-            if unit.is_moving and unit.move_target:
-                self._move_unit(unit)
+        columns = self.columns
 
-            # Remove destroyed units
-            if unit.is_destroyed():
-                self.units.remove(unit)
+        # Move units
+        moving = columns.column("is_moving") & (columns.column("move_target") != UnitColumns.NO_TARGET)
+        for row in np.flatnonzero(moving).tolist():
+            self._move_unit(columns.unit(row), delta_time)
+
+        # Remove destroyed units
+        if np.any(columns.column("current_hp") <= 0):
+            self.remove_destroyed_units()
+
+    def remove_destroyed_units(self):
+        """Drop destroyed units from the unit store and all indexes"""
+        destroyed = self.columns.column("current_hp") <= 0
+        locations = np.unique(self.columns.column("location")[destroyed])
+        self.columns.remove_rows(destroyed)
+        for province_id in locations.tolist():
+            self._notify_stack_changed(province_id)
+
+    def reset_units(self, columns: UnitColumns, next_unit_id: int):
+        """Replace every unit (e.g. when loading a save)"""
+        changed = np.union1d(self.columns.occupied_locations(), columns.occupied_locations())
+        self.columns = columns
+        self.next_unit_id = next_unit_id
+        for province_id in changed.tolist():
+            self._notify_stack_changed(province_id)
 
     def create_unit(self, template_id: str, owner: str, location: int) -> Optional[Unit]:
         """Create a new unit"""
@@ -30,7 +60,7 @@ class MilitarySystem:
         if not template:
             return None
 
-        unit = Unit(
+        unit = self.columns.add_unit(
             unit_id=self.next_unit_id,
             template_id=template_id,
             owner=owner,
@@ -39,10 +69,33 @@ class MilitarySystem:
             organization=template.max_organization
         )
 
-        self.units.append(unit)
         self.next_unit_id += 1
+        self._notify_stack_changed(location)
+        self._notify_arrival(location)
         return unit
 
+    def _relocate_unit(self, unit: Unit, province_id: int):
+        """Move a unit to another province and tell the listeners"""
+        self._notify_stack_changed(unit.location)
+        unit.location = province_id
+        self._notify_stack_changed(province_id)
+        self._notify_arrival(province_id)
+
+    def add_stack_listener(self, callback: Callable):
+        """Register a callback run as (province_id) when the units in a province change"""
+        self.stack_listeners.append(callback)
+
+    def _notify_stack_changed(self, province_id: int):
+        """Tell listeners (e.g. the unit renderer) a province's unit stacks changed"""
+        for callback in self.stack_listeners:
+            callback(province_id)
+
+    def _notify_arrival(self, province_id: int):
+        """Tell the combat system a unit entered a province so it is checked for battles"""
+        combat_system = self.game_state.combat_system
+        if combat_system:
+            combat_system.mark_province_dirty(province_id)
+
     def recruit_unit(self, country_code: str, template_id: str, province_id: int) -> bool:
         """Recruit a new unit (costs money and manpower)"""
         template = self.game_state.unit_template_manager.get_template(template_id)
@@ -67,43 +120,134 @@ class MilitarySystem:
 
     def get_units_in_province(self, province_id: int) -> List[Unit]:
         """Get all units in a province"""
-        return [u for u in self.units if u.location == province_id]
+        return self.columns.units_at(self.columns.location_rows(province_id))
 
     def get_units_by_owner(self, country_code: str) -> List[Unit]:
         """Get all units owned by a country"""
-        return [u for u in self.units if u.owner == country_code]
+        return self.columns.units_at(self.columns.owner_rows(country_code))
 
     def get_units_in_province_by_owner(self, province_id: int, country_code: str) -> List[Unit]:
         """Get units in province owned by specific country"""
-        return [u for u in self.units if u.location == province_id and u.owner == country_code]
-
-    def order_move(self, unit: Unit, destination_province_id: int):
-        """Order unit to move to destination"""
-        # Simple movement - just set destination
-        unit.is_moving = True
-        unit.move_target = destination_province_id
-
-    def _move_unit(self, unit: Unit):
-        """Execute unit movement (simplified - instant for now)"""
-        if unit.move_target:
-            # TODO: Implement pathfinding and gradual movement
-            # For now, instant movement
-            unit.location = unit.move_target
-            unit.is_moving = False
-            unit.move_target = None
+        return self.columns.units_at(self.get_unit_rows_in_province(province_id, country_code))
+
+    def get_unit_rows_in_province(self, province_id: int, country_code: str) -> np.ndarray:
+        """Rows (in self.columns) of a country's units in a province"""
+        columns = self.columns
+        index = columns.owner_to_index.get(country_code)
+        rows = columns.location_rows(province_id)
+        if index is None:
+            return rows[:0]
+        return rows[columns.column("owner_index")[rows] == index]
+
+    def get_owners_in_province(self, province_id: int) -> List[str]:
+        """Get the codes of all countries with units in a province"""
+        columns = self.columns
+        owner_indexes = columns.column("owner_index")[columns.location_rows(province_id)]
+        return [None if index == UnitColumns.NO_OWNER else columns.owner_codes[index]
+                for index in dict.fromkeys(owner_indexes.tolist())]
+
+    def get_contested_provinces(self, province_ids) -> Dict[int, List[str]]:
+        """Those of some provinces holding units of two or more owners
+
+        Maps each to its owners' codes in the order get_owners_in_province gives them.
+        """
+        columns = self.columns
+        order, keys = columns.location_index()
+        wanted = np.isin(keys, np.fromiter(province_ids, dtype=np.int64))
+        locations = keys[wanted]
+        owners = columns.column("owner_index")[order[wanted]].astype(np.int64)
+
+        # Keep each (location, owner)'s first unit; the survivors stay grouped by location
+        pairs = locations * (len(columns.owner_codes) + 1) + (owners + 1)
+        first = np.sort(np.unique(pairs, return_index=True)[1])
+        locations, owners = locations[first], owners[first]
+
+        starts = np.flatnonzero(np.concatenate(([True], locations[1:] != locations[:-1])))
+        ends = np.append(starts[1:], len(locations))
+        codes = columns.owner_codes + [None]  # NO_OWNER (-1) selects None
+        owner_list = owners.tolist()
+        return {province_id: [codes[index] for index in owner_list[start:end]]
+                for province_id, start, end in zip(locations[starts].tolist(), starts.tolist(),
+                                                   ends.tolist())
+                if end - start > 1}
+
+    def get_occupied_provinces(self) -> List[int]:
+        """Get IDs of all provinces that contain at least one unit"""
+        return self.columns.occupied_locations().tolist()
+
+    def order_move(self, unit: Unit, destination_province_id: int) -> bool:
+        """Order unit to move to destination along the shortest path
+
+        Returns False (and leaves the unit where it is) if no path exists.
+        """
+        template = self.game_state.unit_template_manager.get_template(unit.template_id)
+        category = template.category if template else "land"
+        path = self.pathfinder.find_path(unit.location, destination_province_id, category)
+        if path is None:
+            return False
+
+        self.set_path(unit, destination_province_id, path)
+        return True
+
+    def set_path(self, unit: Unit, destination_province_id: int, path):
+        """Send a unit along an already planned path (provinces to enter, ending at destination)"""
+        unit.path = list(path)
+        unit.move_progress = 0.0
+        unit.is_moving = bool(unit.path)
+        unit.move_target = destination_province_id if unit.path else None
+
+    def _move_unit(self, unit: Unit, delta_time: float):
+        """Advance unit along its path based on its speed and the terrain it enters"""
+        if not unit.path:
+            self._stop_unit(unit)
+            return
+
+        # Units fighting in their current province hold position
+        combat_system = self.game_state.combat_system
+        if combat_system and combat_system.get_battle_in_province(unit.location):
+            return
+
+        template = self.game_state.unit_template_manager.get_template(unit.template_id)
+        if not template:
+            return
+
+        unit.move_progress += template.speed * delta_time
+        while unit.path:
+            next_province = unit.path[0]
+            cost = PROVINCE_MOVE_DISTANCE * self.pathfinder.get_move_cost(
+                next_province, template.category
+            )
+            if unit.move_progress < cost:
+                break
+
+            unit.move_progress -= cost
+            unit.path.pop(0)
+            self._relocate_unit(unit, next_province)
+
+        if not unit.path:
+            self._stop_unit(unit)
+
+    def _stop_unit(self, unit: Unit):
+        """Clear a unit's movement orders"""
+        unit.is_moving = False
+        unit.move_target = None
+        unit.path = []
+        unit.move_progress = 0.0
 
     def get_unit_by_id(self, unit_id: int) -> Optional[Unit]:
         """Get unit by ID"""
-        for unit in self.units:
-            if unit.unit_id == unit_id:
-                return unit
-        return None
+        row = self.columns.find_row(unit_id)
+        return None if row is None else self.columns.unit(row)
 
     def count_units_by_category(self, country_code: str, category: str) -> int:
         """Count units of a specific category for a country"""
-        count = 0
-        for unit in self.get_units_by_owner(country_code):
-            template = self.game_state.unit_template_manager.get_template(unit.template_id)
-            if template and template.category == category:
-                count += 1
-        return count
+        template_manager = self.game_state.unit_template_manager
+        mask = self.columns.template_mask(template_manager, "category", category)
+        return self.columns.owner_unit_count(country_code, mask)
+
+    def get_military_strength(self, country_code: str) -> float:
+        """Approximate military strength: summed (attack + defense) * strength of a country's units"""
+        template_manager = self.game_state.unit_template_manager
+        power = (self.columns.template_values(template_manager, "attack")
+                 + self.columns.template_values(template_manager, "defense"))
+        return self.columns.owner_strength(country_code, power)
@@ -0,0 +1,296 @@
+"""
+Pathfinding over the province adjacency graph
+"""
+import heapq
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Movement cost multiplier for entering a province of each terrain type
+TERRAIN_MOVE_COST = {
+    "plains": 1.0,
+    "hills": 1.5,
+    "mountains": 2.5,
+    "forest": 1.5,
+    "urban": 1.2,
+    "marsh": 2.0
+}
+
+
+@dataclass
+class ProvinceGraph:
+    """Everything a path search reads, copied out of the ProvinceManager
+
+    Plain arrays and lists that pickle cheaply, so searches can also run
+    away from the live game (see src/systems/ai_planner.py).
+    """
+    province_ids: np.ndarray
+    row_of: Dict[int, int]  # province_id -> row
+    offsets: Optional[np.ndarray]  # CSR adjacency over rows (None if not calculated)
+    neighbors: Optional[np.ndarray]
+    move_costs: List[float]  # Terrain cost of entering each row
+    centroids: Optional[np.ndarray]  # Only set when the A* heuristic is usable
+    step: float  # Longest distance between adjacent centroids
+
+    @classmethod
+    def from_province_manager(cls, province_manager) -> "ProvinceGraph":
+        """Build the graph of the provinces currently loaded"""
+        columns = province_manager.columns
+        move_costs = [TERRAIN_MOVE_COST.get(province.terrain_type, 1.0)
+                      for province in province_manager.province_rows]
+        step = province_manager.get_max_neighbor_distance()
+        return cls(
+            province_ids=np.array(columns.province_ids),
+            row_of=dict(columns.row_of),
+            offsets=province_manager.adjacency_offsets,
+            neighbors=province_manager.adjacency_neighbors,
+            move_costs=move_costs,
+            centroids=province_manager.centroids if step > 0.0 else None,
+            step=step
+        )
+
+
+class Pathfinder:
+    """A* pathfinding with a shared LRU cache of recent paths
+
+    Paths are cached per (origin, destination, category). The cache is
+    cleared whenever province ownership or war status changes, since a
+    cached route was planned for the world as it was at that time.
+
+    Searches run over a ProvinceGraph, rebuilt from the game's provinces when
+    they change shape. A pathfinder built from a graph alone (game_state None)
+    works without a game, e.g. in an AI worker process.
+    """
+
+    def __init__(self, game_state, cache_size: int = 4096, graph: Optional[ProvinceGraph] = None):
+        self.game_state = game_state
+        self.cache_size = cache_size
+        self.graph = graph
+        self.graph_key = None  # Province manager state self.graph was built from
+        self.path_cache = OrderedDict()  # (origin, destination, category) -> tuple of province IDs
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # State for the current search's heuristic, see _prepare_heuristic
+        self.heuristic_centroids = None
+        self.heuristic_goal = (0.0, 0.0)
+        self.heuristic_scale = 0.0
+
+        if game_state is not None:
+            game_state.province_manager.add_owner_listener(self._on_owner_changed)
+
+    def find_path(self, origin: int, destination: int, category: str) -> Optional[Tuple[int, ...]]:
+        """Find a path from origin to destination
+
+        Returns the provinces to enter in order (excluding the origin and
+        ending at the destination), or None if the destination is unreachable.
+        """
+        key = (origin, destination, category)
+        if key in self.path_cache:
+            self.path_cache.move_to_end(key)
+            self.cache_hits += 1
+            return self.path_cache[key]
+
+        self.cache_misses += 1
+        path = self._search(origin, destination, category)
+
+        self.path_cache[key] = path
+        if len(self.path_cache) > self.cache_size:
+            self.path_cache.popitem(last=False)
+        return path
+
+    def invalidate(self):
+        """Drop all cached paths"""
+        self.path_cache.clear()
+
+    def get_graph(self) -> ProvinceGraph:
+        """The graph to search, rebuilt if provinces, adjacency or geometry changed"""
+        if self.game_state is None:
+            return self.graph
+
+        province_manager = self.game_state.province_manager
+        key = (province_manager.columns.size, id(province_manager.adjacency_offsets),
+               id(province_manager.centroids), province_manager.max_neighbor_distance)
+        if self.graph is None or key != self.graph_key:
+            self.graph = ProvinceGraph.from_province_manager(province_manager)
+            # Reading the graph fills in max_neighbor_distance, so key on its new value
+            self.graph_key = key[:3] + (province_manager.max_neighbor_distance,)
+        return self.graph
+
+    def get_move_cost(self, province_id: int, category: str) -> float:
+        """Cost multiplier for a unit of a category entering a province"""
+        if category == "air":
+            return 1.0
+        graph = self.get_graph()
+        row = graph.row_of.get(province_id)
+        if row is None:
+            return 1.0
+        return graph.move_costs[row]
+
+    def _on_owner_changed(self, province, old_owner, new_owner):
+        self.invalidate()
+
+    def _search(self, origin: int, destination: int, category: str) -> Optional[Tuple[int, ...]]:
+        """Run A* between two provinces"""
+        graph = self.get_graph()
+        if origin == destination:
+            return ()
+
+        row_of = graph.row_of
+        if origin not in row_of or destination not in row_of:
+            return None
+
+        # Without an adjacency graph every province is treated as one step away
+        if graph.offsets is None:
+            return (destination,)
+
+        offsets = graph.offsets
+        neighbors = graph.neighbors
+        move_costs = None if category == "air" else graph.move_costs
+        start = row_of[origin]
+        goal = row_of[destination]
+        self._prepare_heuristic(graph, goal)
+
+        best_cost = {start: 0.0}
+        came_from = {}
+        open_heap = [(self._heuristic(start, goal), 0.0, start)]
+
+        while open_heap:
+            _, cost, row = heapq.heappop(open_heap)
+            if row == goal:
+                return self._reconstruct(came_from, goal, graph.province_ids)
+            if cost > best_cost[row]:
+                continue
+
+            for next_row in neighbors[offsets[row]:offsets[row + 1]].tolist():
+                next_cost = cost + (move_costs[next_row] if move_costs is not None else 1.0)
+                if next_cost < best_cost.get(next_row, float("inf")):
+                    best_cost[next_row] = next_cost
+                    came_from[next_row] = row
+                    heapq.heappush(open_heap, (next_cost + self._heuristic(next_row, goal),
+                                               next_cost, next_row))
+
+        return None
+
+    def _prepare_heuristic(self, graph: ProvinceGraph, goal: int):
+        """Set up the A* heuristic for a search towards a goal row
+
+        Every step costs at least 1.0 and moves the unit at most the longest
+        distance between adjacent centroids, so straight-line distance divided
+        by that step length never overestimates the remaining cost.
+        """
+        self.heuristic_centroids = None
+        if graph.centroids is not None:
+            goal_x, goal_y = graph.centroids[goal].tolist()
+            if goal_x == goal_x:  # Skip provinces without pixels (NaN centroid)
+                self.heuristic_centroids = graph.centroids
+                self.heuristic_goal = (goal_x, goal_y)
+                self.heuristic_scale = 1.0 / graph.step
+
+    def _heuristic(self, row: int, goal: int) -> float:
+        """Lower bound on the remaining cost (zero when province positions are unknown)"""
+        if self.heuristic_centroids is None:
+            return 0.0
+        x, y = self.heuristic_centroids[row].tolist()
+        distance = math.hypot(x - self.heuristic_goal[0], y - self.heuristic_goal[1])
+        return distance * self.heuristic_scale if distance == distance else 0.0
+
+    @staticmethod
+    def _reconstruct(came_from: dict, goal: int, province_ids) -> Tuple[int, ...]:
+        """Walk back from the goal to build the list of provinces to enter"""
+        rows: List[int] = []
+        row = goal
+        while row in came_from:
+            rows.append(row)
+            row = came_from[row]
+        rows.reverse()
+        return tuple(int(province_ids[r]) for r in rows)
+
+
+class DistanceField:
+    """Cheapest cost from provinces to the nearest of a set of source provinces
+
+    One multi-source Dijkstra runs outwards from all sources at once, with
+    the Pathfinder's costs (entering a province costs its terrain move cost,
+    or 1.0 for air units), recording each province's next step towards its
+    nearest source. Any number of units can then read their route from the
+    field without a search of their own.
+
+    With stop_at, the search ends once those rows are settled. Their routes
+    are still optimal; other provinces may get a longer route or none.
+    """
+
+    def __init__(self, graph: ProvinceGraph, source_ids, category: str = "land",
+                 stop_at: Optional[List[int]] = None):
+        self.graph = graph
+        row_of = graph.row_of
+        sources = sorted({row_of[province_id] for province_id in source_ids if province_id in row_of})
+        self.sources = sources
+
+        count = len(graph.province_ids)
+        self.distance = [math.inf] * count  # row -> cost to the nearest source
+        self.next_row = [-1] * count  # row -> next row on the way (-1 at sources / unreached)
+        if graph.offsets is not None:
+            self._search(category, stop_at)
+
+    def _search(self, category: str, stop_at: Optional[List[int]]):
+        """Multi-source Dijkstra; costs are paid entering a province, so edges are walked backwards"""
+        distance = self.distance
+        next_row = self.next_row
+        offsets = self.graph.offsets
+        neighbors = self.graph.neighbors
+        move_costs = None if category == "air" else self.graph.move_costs
+
+        remaining = set(stop_at) if stop_at is not None else None
+        heap = []
+        for row in self.sources:
+            distance[row] = 0.0
+            heap.append((0.0, row))
+
+        while heap:
+            cost, row = heapq.heappop(heap)
+            if cost > distance[row]:
+                continue
+            if remaining is not None:
+                remaining.discard(row)
+                if not remaining:
+                    break
+
+            # Stepping from a neighbour into this row costs this row's move cost
+            step = move_costs[row] if move_costs is not None else 1.0
+            next_cost = cost + step
+            for previous in neighbors[offsets[row]:offsets[row + 1]].tolist():
+                if next_cost < distance[previous]:
+                    distance[previous] = next_cost
+                    next_row[previous] = row
+                    heapq.heappush(heap, (next_cost, previous))
+
+    def distance_to_source(self, province_id: int) -> float:
+        """Cost from a province to its nearest source (inf if unreachable or not searched)"""
+        row = self.graph.row_of.get(province_id)
+        return math.inf if row is None else self.distance[row]
+
+    def path_from(self, province_id: int) -> Optional[Tuple[int, ...]]:
+        """Provinces to enter from a province to its nearest source, like Pathfinder.find_path
+
+        Empty when the province is a source itself, None when no source is reachable.
+        """
+        row = self.graph.row_of.get(province_id)
+        if row is None or not self.sources:
+            return None
+        # Without an adjacency graph every province is treated as one step away
+        if self.graph.offsets is None:
+            return () if row in self.sources else (int(self.graph.province_ids[self.sources[0]]),)
+        if self.distance[row] == math.inf:
+            return None
+
+        province_ids = self.graph.province_ids
+        path = []
+        row = self.next_row[row]
+        while row != -1:
+            path.append(int(province_ids[row]))
+            row = self.next_row[row]
+        return tuple(path)
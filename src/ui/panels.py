@@ -267,6 +267,43 @@ def draw_unit_recruitment_ui(game_state, screen_width, screen_height):
         y -= 25
 
 
+def draw_profiler_overlay(game_state, screen_width, screen_height):
+    """Draw per-system tick timings (toggled with F3)"""
+    timings = game_state.get_system_timings()
+
+    panel_width = 470
+    line_height = 16
+    panel_height = 40 + line_height * (len(timings) + 1)
+    panel_x = screen_width // 2 - panel_width // 2
+    panel_y = screen_height - 50
+
+    # Background
+    arcade.draw_rectangle_filled(
+        panel_x + panel_width // 2, panel_y - panel_height // 2,
+        panel_width, panel_height, COLOR_UI_BACKGROUND
+    )
+
+    # Border
+    arcade.draw_rectangle_outline(
+        panel_x + panel_width // 2, panel_y - panel_height // 2,
+        panel_width, panel_height, COLOR_UI_BORDER, 2
+    )
+
+    # Title
+    arcade.draw_text("TICK TIMINGS (ms)", panel_x + 10, panel_y - 20,
+                    COLOR_UI_TEXT, 12, bold=True, font_name="Arial")
+
+    y = panel_y - 40
+    header = f"{'system':<26}{'mean':>7}{'p50':>7}{'p99':>7}{'max':>8}{'calls':>8}"
+    arcade.draw_text(header, panel_x + 10, y, COLOR_UI_TEXT, 10, font_name="Courier New")
+
+    for name, stats in sorted(timings.items()):
+        y -= line_height
+        text = (f"{name:<26}{stats['mean_ms']:>7.2f}{stats['p50_ms']:>7.2f}"
+                f"{stats['p99_ms']:>7.2f}{stats['max_ms']:>8.2f}{stats['count']:>8}")
+        arcade.draw_text(text, panel_x + 10, y, COLOR_UI_TEXT, 10, font_name="Courier New")
+
+
 def draw_notification(message, screen_width, screen_height):
     """Draw a notification message"""
     arcade.draw_text(message, screen_width // 2, 100,
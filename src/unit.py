@@ -1,8 +1,10 @@
 """
 Military unit data structures and templates
 """
-from dataclasses import dataclass, field
+from collections.abc import Sequence
+from dataclasses import dataclass
 from typing import Optional, List
+import numpy as np
 
 
 @dataclass
@@ -24,19 +26,122 @@ class UnitTemplate:
         return hash(self.template_id)
 
 
-@dataclass
 class Unit:
-    """Instance of a military unit"""
-    unit_id: int
-    template_id: str
-    owner: str  # Country code
-    location: int  # Province ID
-    current_hp: int
-    organization: int
-    experience: int = 0
-    strength: float = 1.0  # 0.0 to 1.0
-    is_moving: bool = False
-    move_target: Optional[int] = None
+    """Instance of a military unit
+
+    A unit is a lightweight handle to one row of a UnitColumns store; its
+    fields live in the store's NumPy arrays. Handles are created on demand
+    and compare equal when they refer to the same unit of the same store. A
+    handle finds its row again by unit ID after the store is compacted;
+    once its unit has been removed, reading its fields raises LookupError.
+    A unit created directly gets a private one-row store and is moved into
+    the military system's store when it is added there.
+    """
+
+    __slots__ = ("columns", "unit_id", "_row", "_generation")
+
+    def __init__(self, unit_id: int, template_id: str, owner: str, location: int,
+                 current_hp: int, organization: int, experience: int = 0,
+                 strength: float = 1.0, is_moving: bool = False,
+                 move_target: Optional[int] = None, path: Optional[List[int]] = None,
+                 move_progress: float = 0.0):
+        UnitColumns(capacity=1).add_unit(
+            unit_id, template_id, owner, location, current_hp, organization,
+            experience, strength, is_moving, move_target, path, move_progress, handle=self,
+        )
+
+    def _attach(self, columns: "UnitColumns", row: int, unit_id: int):
+        """Point the handle at a row"""
+        self.columns = columns
+        self.unit_id = unit_id
+        self._row = row
+        self._generation = columns.generation
+
+    @property
+    def row(self) -> int:
+        """The unit's current row in its store"""
+        columns = self.columns
+        if self._generation != columns.generation:
+            row = columns.find_row(self.unit_id)
+            if row is None:
+                raise LookupError(f"Unit {self.unit_id} has been removed")
+            self._row = row
+            self._generation = columns.generation
+        return self._row
+
+    def _column(name: str):
+        """Property reading/writing one numeric column at this unit's row"""
+        def get(self):
+            return self.columns.buffers[name].item(self.row)
+
+        def set(self, value):
+            self.columns.buffers[name][self.row] = value
+
+        return property(get, set)
+
+    current_hp = _column("current_hp")
+    organization = _column("organization")
+    experience = _column("experience")
+    is_moving = _column("is_moving")
+    move_progress = _column("move_progress")  # Distance covered towards the next province
+    del _column
+
+    @property
+    def location(self) -> int:  # Province ID
+        return self.columns.buffers["location"].item(self.row)
+
+    @location.setter
+    def location(self, province_id: int):
+        self.columns.set_location(self.row, province_id)
+
+    @property
+    def strength(self) -> float:  # 0.0 to 1.0
+        return self.columns.buffers["strength"].item(self.row)
+
+    @strength.setter
+    def strength(self, value: float):
+        self.columns.set_strength(self.row, value)
+
+    @property
+    def template_id(self) -> str:
+        return self.columns.template_ids[self.columns.buffers["template_index"].item(self.row)]
+
+    @template_id.setter
+    def template_id(self, template_id: str):
+        self.columns.set_template(self.row, template_id)
+
+    @property
+    def owner(self) -> Optional[str]:  # Country code
+        index = self.columns.buffers["owner_index"].item(self.row)
+        return None if index == UnitColumns.NO_OWNER else self.columns.owner_codes[index]
+
+    @owner.setter
+    def owner(self, country_code: Optional[str]):
+        self.columns.set_owner(self.row, country_code)
+
+    @property
+    def move_target(self) -> Optional[int]:
+        target = self.columns.buffers["move_target"].item(self.row)
+        return None if target == UnitColumns.NO_TARGET else target
+
+    @move_target.setter
+    def move_target(self, province_id: Optional[int]):
+        self.columns.buffers["move_target"][self.row] = (
+            UnitColumns.NO_TARGET if province_id is None else province_id
+        )
+
+    @property
+    def path(self) -> List[int]:
+        """Provinces still to enter, in order"""
+        row = self.row
+        path = self.columns.paths[row]
+        if path is None:
+            path = self.columns.paths[row] = []
+        return path
+
+    @path.setter
+    def path(self, path: List[int]):
+        self.columns.paths[self.row] = path or None
 
     def get_effective_attack(self, template: UnitTemplate) -> float:
         """Get effective attack value based on HP and org"""
@@ -69,6 +174,437 @@ class Unit:
         """Check if unit should retreat"""
         return self.organization <= 20  # Retreat at 20% org
 
+    def __eq__(self, other):
+        if isinstance(other, Unit):
+            return self.columns is other.columns and self.unit_id == other.unit_id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.unit_id)
+
+    def __repr__(self):
+        return (f"Unit(unit_id={self.unit_id}, template_id={self.template_id!r}, "
+                f"owner={self.owner!r}, location={self.location}, "
+                f"current_hp={self.current_hp}, organization={self.organization})")
+
+
+class UnitSequence(Sequence):
+    """Read-only list-like view of every unit in a store, in row (creation) order
+
+    Handles are created as they are read. Take a list() copy to iterate
+    while units are created or removed.
+    """
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: "UnitColumns"):
+        self.columns = columns
+
+    def __len__(self):
+        return self.columns.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.columns.unit(row) for row in range(self.columns.size)[index]]
+        if index < 0:
+            index += self.columns.size
+        if not 0 <= index < self.columns.size:
+            raise IndexError("unit index out of range")
+        return self.columns.unit(index)
+
+    def __iter__(self):
+        columns = self.columns
+        return (columns.unit(row) for row in range(columns.size))
+
+    def __contains__(self, unit):
+        return (isinstance(unit, Unit) and unit.columns is self.columns
+                and self.columns.find_row(unit.unit_id) is not None)
+
+
+class UnitColumns:
+    """Structure-of-arrays storage for units
+
+    Every numeric unit field is one NumPy array indexed by row, so combat can
+    work on many units at once. Templates and owners are stored as integer
+    indexes into template_ids / owner_codes. Rows stay in insertion order;
+    removing units compacts the arrays and bumps generation, which tells
+    outstanding handles to look their row up again. No per-unit Python
+    objects are kept: Unit handles are made on demand by unit().
+
+    Units by location and by owner are found through row orders sorted by
+    those columns (stable, so each bucket is in creation order). They are
+    rebuilt on the first query after a change, so location and owner must
+    be changed through the handle properties or set_* as well.
+
+    Unit counts and summed strength per (owner, template) are kept up to date
+    as rows are added, damaged, changed and removed, so per-country military
+    strength and unit counts by category are read without visiting units.
+    Strength, owner and template must therefore be changed through the
+    handle properties, set_* or apply_damage rather than the raw buffers.
+    """
+
+    NO_OWNER = -1
+    NO_TARGET = -1
+    FIELDS = {
+        "unit_id": np.int64,
+        "template_index": np.int16,
+        "owner_index": np.int32,
+        "location": np.int32,
+        "current_hp": np.int32,
+        "organization": np.int32,
+        "experience": np.int32,
+        "strength": np.float64,
+        "is_moving": np.bool_,
+        "move_target": np.int32,
+        "move_progress": np.float64,
+    }
+
+    def __init__(self, capacity: int = 64):
+        self.size = 0
+        self.buffers = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+        self.paths: List[Optional[List[int]]] = []  # row -> path (None when empty)
+        self.generation = 0  # Bumped whenever rows are renumbered
+        self.ids_sorted = True  # Unit IDs ascend with rows (IDs are handed out in order)
+
+        # Rows sorted by location / owner index with the sorted keys, None when stale
+        self.location_order: Optional[tuple] = None
+        self.owner_order: Optional[tuple] = None
+
+        self.template_ids: List[str] = []  # template index -> template ID
+        self.template_to_index = {}  # template ID -> template index
+        self.owner_codes: List[str] = []  # owner index -> country code
+        self.owner_to_index = {}  # country code -> owner index
+        self.template_value_cache = {}  # (manager id, attribute) -> (template count, values)
+
+        # [owner index, template index] -> number of units / summed strength
+        self.owner_template_counts = np.zeros((0, 0), dtype=np.int64)
+        self.owner_template_strength = np.zeros((0, 0), dtype=np.float64)
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, paths: List[Optional[List[int]]],
+                    template_ids: List[str], owner_codes: List[str]) -> "UnitColumns":
+        """Build a store from whole columns (one array per FIELDS entry)"""
+        columns = cls(capacity=max(1, len(paths)))
+        for name, buffer in columns.buffers.items():
+            buffer[:len(paths)] = arrays[name]
+        columns.size = len(paths)
+        columns.paths = list(paths)
+        for template_id in template_ids:
+            columns.get_template_index(template_id)
+        for country_code in owner_codes:
+            columns.get_owner_index(country_code)
+        rows = np.arange(columns.size)
+        columns._add_totals(rows, 1, columns.column("strength"))
+        columns.ids_sorted = bool(np.all(np.diff(columns.column("unit_id")) > 0))
+        return columns
+
+    def column(self, name: str) -> np.ndarray:
+        """Get the live array for a field (one entry per row)"""
+        return self.buffers[name][:self.size]
+
+    def get_template_index(self, template_id: str) -> int:
+        """Get (assigning if needed) the integer index for a template"""
+        index = self.template_to_index.get(template_id)
+        if index is None:
+            index = len(self.template_ids)
+            self.template_ids.append(template_id)
+            self.template_to_index[template_id] = index
+            self._resize_totals()
+        return index
+
+    def get_owner_index(self, country_code: Optional[str]) -> int:
+        """Get (assigning if needed) the integer index for an owner"""
+        if country_code is None:
+            return self.NO_OWNER
+        index = self.owner_to_index.get(country_code)
+        if index is None:
+            index = len(self.owner_codes)
+            self.owner_codes.append(country_code)
+            self.owner_to_index[country_code] = index
+            self._resize_totals()
+        return index
+
+    def add_unit(self, unit_id: int, template_id: str, owner: Optional[str], location: int,
+                 current_hp: int, organization: int, experience: int = 0,
+                 strength: float = 1.0, is_moving: bool = False,
+                 move_target: Optional[int] = None, path: Optional[List[int]] = None,
+                 move_progress: float = 0.0, handle: Optional[Unit] = None) -> Unit:
+        """Append a unit row and return its handle"""
+        if self.size == len(self.buffers["unit_id"]):
+            self._grow()
+        row = self.size
+        if row and unit_id <= self.buffers["unit_id"][row - 1]:
+            self.ids_sorted = False
+        self.size += 1
+
+        buffers = self.buffers
+        buffers["unit_id"][row] = unit_id
+        buffers["template_index"][row] = self.get_template_index(template_id)
+        buffers["owner_index"][row] = self.get_owner_index(owner)
+        buffers["location"][row] = location
+        buffers["current_hp"][row] = current_hp
+        buffers["organization"][row] = organization
+        buffers["experience"][row] = experience
+        buffers["strength"][row] = strength
+        buffers["is_moving"][row] = is_moving
+        buffers["move_target"][row] = self.NO_TARGET if move_target is None else move_target
+        buffers["move_progress"][row] = move_progress
+        self.paths.append(path or None)
+        self._add_row_totals(row, 1)
+        self.location_order = self.owner_order = None
+
+        if handle is None:
+            handle = Unit.__new__(Unit)
+        handle._attach(self, row, unit_id)
+        return handle
+
+    def unit(self, row: int) -> Unit:
+        """A handle for one row"""
+        handle = Unit.__new__(Unit)
+        handle._attach(self, row, self.buffers["unit_id"].item(row))
+        return handle
+
+    def units_at(self, rows) -> List[Unit]:
+        """Handles for some rows, in the given order"""
+        rows = np.asarray(rows)
+        handles = []
+        for row, unit_id in zip(rows.tolist(), self.buffers["unit_id"][rows].tolist()):
+            handle = Unit.__new__(Unit)
+            handle._attach(self, row, unit_id)
+            handles.append(handle)
+        return handles
+
+    def find_row(self, unit_id: int) -> Optional[int]:
+        """Row of a unit ID, or None if the unit isn't in this store"""
+        unit_ids = self.column("unit_id")
+        if self.ids_sorted:
+            row = int(unit_ids.searchsorted(unit_id))
+            return row if row < self.size and unit_ids[row] == unit_id else None
+        rows = np.flatnonzero(unit_ids == unit_id)
+        return int(rows[0]) if len(rows) else None
+
+    def location_index(self) -> tuple:
+        """(rows sorted by location, their locations); each location's rows in creation order"""
+        if self.location_order is None:
+            self.location_order = self._sorted_rows(self.column("location"))
+        return self.location_order
+
+    def location_rows(self, province_id: int) -> np.ndarray:
+        """Rows of the units in a province, in creation order"""
+        order, keys = self.location_index()
+        return order[keys.searchsorted(province_id):keys.searchsorted(province_id, "right")]
+
+    def owner_rows(self, country_code: str) -> np.ndarray:
+        """Rows of a country's units, in creation order"""
+        index = self.owner_to_index.get(country_code)
+        if index is None:
+            return np.zeros(0, dtype=np.int64)
+        if self.owner_order is None:
+            self.owner_order = self._sorted_rows(self.column("owner_index"))
+        order, keys = self.owner_order
+        return order[keys.searchsorted(index):keys.searchsorted(index, "right")]
+
+    def occupied_locations(self) -> np.ndarray:
+        """Sorted IDs of the provinces containing at least one unit"""
+        keys = self.location_index()[1]
+        if not len(keys):
+            return keys
+        return keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+
+    @staticmethod
+    def _sorted_rows(values: np.ndarray) -> tuple:
+        """(rows in stable order of value, sorted values)"""
+        # Small non-negative keys (province IDs, owner indexes) are sorted as uint16,
+        # which NumPy radix-sorts in linear time
+        if len(values) and values.min() >= 0 and values.max() <= np.iinfo(np.uint16).max:
+            order = np.argsort(values.astype(np.uint16), kind="stable")
+        else:
+            order = np.argsort(values, kind="stable")
+        # int64 keys: searchsorted would convert an int32 array for every Python int query
+        return order.astype(np.int32), values[order].astype(np.int64)
+
+    def adopt(self, unit: Unit) -> Unit:
+        """Move a unit from another store into this one (the handle stays valid)"""
+        source = unit.columns
+        if source is self:
+            return unit
+        return self.add_unit(
+            unit.unit_id, unit.template_id, unit.owner, unit.location, unit.current_hp,
+            unit.organization, unit.experience, unit.strength, unit.is_moving,
+            unit.move_target, source.paths[unit.row], unit.move_progress, handle=unit,
+        )
+
+    def remove_rows(self, remove: np.ndarray):
+        """Drop the rows where remove is True, keeping the others in order
+
+        Handles to removed units raise LookupError when read.
+        """
+        keep = ~remove
+        removed_rows = np.flatnonzero(remove)
+        self._add_totals(removed_rows, -1, -self.buffers["strength"][removed_rows])
+
+        kept_rows = np.flatnonzero(keep).tolist()
+        count = len(kept_rows)
+        for name, buffer in self.buffers.items():
+            buffer[:count] = buffer[:self.size][keep]
+        self.paths = [self.paths[row] for row in kept_rows]
+        self.size = count
+        self.generation += 1
+        self.location_order = self.owner_order = None
+
+    def template_values(self, template_manager, attribute: str) -> np.ndarray:
+        """Per-template-index array of a template attribute (0 for unknown templates)"""
+        key = (id(template_manager), attribute)
+        cached = self.template_value_cache.get(key)
+        if cached is not None and cached[0] == len(self.template_ids):
+            return cached[1]
+
+        values = np.zeros(len(self.template_ids), dtype=np.float64)
+        for index, template_id in enumerate(self.template_ids):
+            template = template_manager.get_template(template_id)
+            if template:
+                values[index] = getattr(template, attribute)
+        self.template_value_cache[key] = (len(self.template_ids), values)
+        return values
+
+    def template_mask(self, template_manager, attribute: str, value) -> np.ndarray:
+        """Per-template-index bool array: does the template's attribute equal value"""
+        key = (id(template_manager), attribute, value)
+        cached = self.template_value_cache.get(key)
+        if cached is not None and cached[0] == len(self.template_ids):
+            return cached[1]
+
+        mask = np.zeros(len(self.template_ids), dtype=bool)
+        for index, template_id in enumerate(self.template_ids):
+            template = template_manager.get_template(template_id)
+            mask[index] = template is not None and getattr(template, attribute) == value
+        self.template_value_cache[key] = (len(self.template_ids), mask)
+        return mask
+
+    def owner_strength(self, country_code: str, template_power: np.ndarray) -> float:
+        """Summed template_power * strength of an owner's units"""
+        index = self.owner_to_index.get(country_code)
+        if index is None:
+            return 0.0
+        return float(self.owner_template_strength[index] @ template_power)
+
+    def owner_unit_count(self, country_code: str, template_mask: np.ndarray) -> int:
+        """Number of an owner's units whose template is in template_mask"""
+        index = self.owner_to_index.get(country_code)
+        if index is None:
+            return 0
+        return int(self.owner_template_counts[index][template_mask].sum())
+
+    def set_strength(self, row: int, strength: float):
+        """Change one row's strength"""
+        self._add_row_totals(row, 0, strength - self.buffers["strength"][row])
+        self.buffers["strength"][row] = strength
+
+    def set_owner(self, row: int, country_code: Optional[str]):
+        """Change one row's owner"""
+        index = self.get_owner_index(country_code)
+        self._add_row_totals(row, -1)
+        self.buffers["owner_index"][row] = index
+        self._add_row_totals(row, 1)
+        self.owner_order = None
+
+    def set_location(self, row: int, province_id: int):
+        """Change one row's location"""
+        self.buffers["location"][row] = province_id
+        self.location_order = None
+
+    def set_template(self, row: int, template_id: str):
+        """Change one row's template"""
+        index = self.get_template_index(template_id)
+        self._add_row_totals(row, -1)
+        self.buffers["template_index"][row] = index
+        self._add_row_totals(row, 1)
+
+    def _add_row_totals(self, row: int, count: int, strength: Optional[float] = None):
+        """Add one row's unit count (and strength, by default its own times count) to the totals"""
+        owner_index = self.buffers["owner_index"][row]
+        if owner_index == self.NO_OWNER:
+            return
+        if strength is None:
+            strength = self.buffers["strength"][row] * count
+        template_index = self.buffers["template_index"][row]
+        self.owner_template_counts[owner_index, template_index] += count
+        self.owner_template_strength[owner_index, template_index] += strength
+        if count < 0:
+            self._clear_empty_totals()
+
+    def _add_totals(self, rows: np.ndarray, count, strength):
+        """Vectorised _add_row_totals: count and strength are scalars or one value per row"""
+        owner_index = self.buffers["owner_index"][rows]
+        owned = owner_index != self.NO_OWNER
+        if not owned.all():
+            rows, owner_index = rows[owned], owner_index[owned]
+            count = count[owned] if np.ndim(count) else count
+            strength = strength[owned] if np.ndim(strength) else strength
+        cells = (owner_index, self.buffers["template_index"][rows])
+        np.add.at(self.owner_template_counts, cells, count)
+        np.add.at(self.owner_template_strength, cells, strength)
+        if np.any(np.asarray(count) < 0):
+            self._clear_empty_totals()
+
+    def _clear_empty_totals(self):
+        """Zero the strength of emptied cells so rounding errors don't build up"""
+        self.owner_template_strength[self.owner_template_counts == 0] = 0.0
+
+    def _resize_totals(self):
+        """Make room in the totals for every owner and template index"""
+        shape = (len(self.owner_codes), len(self.template_ids))
+        for name in ("owner_template_counts", "owner_template_strength"):
+            old = getattr(self, name)
+            if old.shape != shape:
+                new = np.zeros(shape, dtype=old.dtype)
+                new[:old.shape[0], :old.shape[1]] = old
+                setattr(self, name, new)
+
+    def effective_values(self, rows: np.ndarray, template_power: np.ndarray) -> np.ndarray:
+        """Attack or defence of each row (vectorised get_effective_attack/defense)"""
+        template_index = self.buffers["template_index"][rows]
+        strength = self.buffers["strength"][rows]
+        organization = self.buffers["organization"][rows]
+        return template_power[template_index] * strength * (organization / 100.0)
+
+    def effective_power(self, rows: np.ndarray, template_power: np.ndarray) -> float:
+        """Summed attack or defence of some rows"""
+        return float(self.effective_values(rows, template_power).sum())
+
+    def apply_damage(self, rows: np.ndarray, damage, template_max_hp: np.ndarray):
+        """Apply damage (one value for all rows, or one per row) (vectorised take_damage)
+
+        Rows whose template is unknown (max HP 0) are left untouched.
+        """
+        # HP and organisation each lose half the damage, rounded towards zero
+        loss = np.trunc(np.asarray(damage, dtype=np.float64) * 0.5).astype(np.int64)
+        max_hp = template_max_hp[self.buffers["template_index"][rows]]
+        known = max_hp > 0
+        if not known.all():
+            rows, max_hp = rows[known], max_hp[known]
+            if loss.ndim:
+                loss = loss[known]
+
+        current_hp = np.maximum(self.buffers["current_hp"][rows] - loss, 0)
+        self.buffers["current_hp"][rows] = current_hp
+        self.buffers["organization"][rows] = np.maximum(self.buffers["organization"][rows] - loss, 0)
+        strength = current_hp / max_hp
+        self._add_totals(rows, 0, strength - self.buffers["strength"][rows])
+        self.buffers["strength"][rows] = strength
+
+    def _grow(self):
+        """Double the capacity of every buffer"""
+        capacity = max(1, len(self.buffers["unit_id"])) * 2
+        resized = {}
+        for name, buffer in self.buffers.items():
+            resized[name] = np.zeros(capacity, dtype=buffer.dtype)
+            resized[name][:self.size] = buffer[:self.size]
+        self.buffers = resized
+
 
 class UnitTemplateManager:
     """Manages unit templates"""
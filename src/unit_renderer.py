@@ -0,0 +1,158 @@
+"""
+Batched unit rendering
+
+Units are drawn as one counter icon per (province, owner) stack. Icons live
+in persistent SpriteLists bucketed into coarse world-space cells, so a frame
+only draws the cells inside the viewport and sprites are only touched when a
+stack changes.
+"""
+import arcade
+import pyglet
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from pyglet.math import Mat4, Vec3
+from src.constants import COLOR_UI_TEXT
+
+UNIT_ICON_SIZE = 10  # World units at zoom 1.0
+UNIT_STACK_SPACING = 12  # Horizontal offset between owners sharing a province
+UNIT_CELL_SIZE = 256.0  # World units per culling cell
+UNIT_LABEL_MIN_ZOOM = 0.8  # Stack counts are hidden when zoomed out further
+
+
+@dataclass
+class UnitStack:
+    """The icon and count label for one owner's units in one province"""
+
+    sprite: arcade.Sprite
+    label: arcade.Text
+    cell: Tuple[int, int]
+    count: int = 0
+
+
+class UnitCell:
+    """Icons and labels for the stacks inside one culling cell"""
+
+    def __init__(self):
+        self.sprites = arcade.SpriteList()
+        self.labels = pyglet.graphics.Batch()
+
+
+class UnitRenderer:
+    """Draws unit stacks from the military system's indexes
+
+    The renderer listens for stack changes and only rebuilds the provinces
+    that changed since the last frame.
+    """
+
+    def __init__(self, game_state,
+                 province_position: Callable[[int], Optional[Tuple[float, float]]]):
+        self.game_state = game_state
+        self.province_position = province_position  # province_id -> world (x, y) or None
+
+        self.cells: Dict[Tuple[int, int], UnitCell] = {}
+        self.stacks: Dict[Tuple[int, str], UnitStack] = {}  # (province_id, owner) -> stack
+        self.province_owners: Dict[int, List[str]] = {}  # province_id -> owners drawn there
+
+        military_system = game_state.military_system
+        self.dirty_provinces: Set[int] = set(military_system.get_occupied_provinces())
+        military_system.add_stack_listener(self.on_stack_changed)
+
+    def on_stack_changed(self, province_id: int):
+        """Stack listener: redraw this province's stacks on the next frame"""
+        self.dirty_provinces.add(province_id)
+
+    def draw(self, camera_x: float, camera_y: float, zoom: float,
+             screen_width: int, screen_height: int):
+        """Draw the stacks inside the viewport"""
+        self._refresh_dirty_provinces()
+
+        # Same screen -> world mapping as map clicks
+        left = camera_x / zoom
+        bottom = camera_y / zoom
+        right = (camera_x + screen_width) / zoom
+        top = (camera_y + screen_height) / zoom
+        margin = UNIT_STACK_SPACING * 4  # Icons can overhang their province centre
+
+        first_col, last_col = self._cell_index(left - margin), self._cell_index(right + margin)
+        first_row, last_row = self._cell_index(bottom - margin), self._cell_index(top + margin)
+        show_labels = zoom >= UNIT_LABEL_MIN_ZOOM
+
+        # Positions are stored in world units; zoom is applied through the view matrix
+        ctx = arcade.get_window().ctx
+        view = ctx.view_matrix
+        ctx.view_matrix = view @ Mat4.from_scale(Vec3(zoom, zoom, 1.0))
+        try:
+            for (col, row), cell in self.cells.items():
+                if first_col <= col <= last_col and first_row <= row <= last_row:
+                    cell.sprites.draw()
+                    if show_labels:
+                        cell.labels.draw()
+        finally:
+            ctx.view_matrix = view
+
+    def _refresh_dirty_provinces(self):
+        """Create, update or remove the stacks of provinces whose units changed"""
+        if not self.dirty_provinces:
+            return
+        military_system = self.game_state.military_system
+        for province_id in self.dirty_provinces:
+            position = self.province_position(province_id)
+            owners = sorted(military_system.get_owners_in_province(province_id)) if position else []
+            for owner in self.province_owners.get(province_id, ()):
+                if owner not in owners:
+                    self._remove_stack((province_id, owner))
+
+            if owners:
+                self.province_owners[province_id] = owners
+            else:
+                self.province_owners.pop(province_id, None)
+                continue
+
+            x, y = position
+            x -= (len(owners) - 1) * UNIT_STACK_SPACING / 2
+            for index, owner in enumerate(owners):
+                count = len(military_system.get_unit_rows_in_province(province_id, owner))
+                self._place_stack((province_id, owner), x + index * UNIT_STACK_SPACING, y, count)
+        self.dirty_provinces.clear()
+
+    def _place_stack(self, key: Tuple[int, str], x: float, y: float, count: int):
+        """Create a stack icon or move/update an existing one"""
+        stack = self.stacks.get(key)
+        cell_key = (self._cell_index(x), self._cell_index(y))
+
+        if stack is None:
+            country = self.game_state.country_manager.get_country(key[1])
+            color = tuple(country.color) if country else (255, 255, 255)
+            sprite = arcade.SpriteSolidColor(UNIT_ICON_SIZE, UNIT_ICON_SIZE, color=color)
+            label = arcade.Text("", 0, 0, COLOR_UI_TEXT, 7, anchor_x="center", anchor_y="center")
+            stack = self.stacks[key] = UnitStack(sprite, label, cell_key)
+            self._cell(cell_key).sprites.append(sprite)
+            label.batch = self._cell(cell_key).labels
+        elif stack.cell != cell_key:
+            stack.sprite.remove_from_sprite_lists()
+            self._cell(cell_key).sprites.append(stack.sprite)
+            stack.label.batch = self._cell(cell_key).labels
+            stack.cell = cell_key
+
+        stack.sprite.position = (x, y)
+        stack.label.position = (x, y)
+        if stack.count != count:
+            stack.label.text = str(count)
+            stack.count = count
+
+    def _remove_stack(self, key: Tuple[int, str]):
+        """Drop a stack's icon and label"""
+        stack = self.stacks.pop(key)
+        stack.sprite.remove_from_sprite_lists()
+        stack.label.batch = None
+
+    def _cell(self, cell_key: Tuple[int, int]) -> UnitCell:
+        """Get (creating if needed) a culling cell"""
+        cell = self.cells.get(cell_key)
+        if cell is None:
+            cell = self.cells[cell_key] = UnitCell()
+        return cell
+
+    @staticmethod
+    def _cell_index(coordinate: float) -> int:
+        return int(coordinate // UNIT_CELL_SIZE)
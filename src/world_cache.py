@@ -0,0 +1,45 @@
+"""
+Compiled world cache
+
+Packs everything load_game_data derives from provinces.csv, countries.json
+and the province ID map into one binary file (see src/array_file.py). The
+header holds the source file hashes and small tables (terrain names,
+country definitions); the arrays are memory-mapped on load. A cache whose
+source hashes don't match is ignored and rewritten.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.array_file import write_array_file, read_array_header, map_arrays
+from src.map_data import file_hash
+
+WORLD_CACHE_MAGIC = b"WGWORLD\x00"
+WORLD_CACHE_VERSION = 1
+WORLD_CACHE_NAME = "world.bin"
+
+
+def source_hashes(sources: Dict[str, Path]) -> Dict[str, str]:
+    """SHA-1 of each source file, keyed like sources"""
+    return {name: file_hash(path) for name, path in sources.items()}
+
+
+def write_world_cache(path, hashes: Dict[str, str], arrays: Dict[str, np.ndarray], tables: dict):
+    """Write arrays and JSON-serialisable tables to a cache file"""
+    header = {"version": WORLD_CACHE_VERSION, "sources": hashes, "tables": tables}
+    write_array_file(path, WORLD_CACHE_MAGIC, header, arrays)
+
+
+def read_world_cache(path, hashes: Dict[str, str]) -> Optional[dict]:
+    """Open a cache file, or None if it is missing, stale or unreadable
+
+    Returns {"arrays": {name: read-only memmap}, "tables": {...}}.
+    """
+    result = read_array_header(path, WORLD_CACHE_MAGIC)
+    if result is None:
+        return None
+    header, data_start = result
+    if header.get("version") != WORLD_CACHE_VERSION or header.get("sources") != hashes:
+        return None
+    return {"arrays": map_arrays(path, header, data_start), "tables": header["tables"]}
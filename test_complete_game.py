@@ -169,7 +169,7 @@ try:
     ger_units = game_state.military_system.get_units_by_owner("GER")
     if ger_units:
         game_state.military_system.order_move(ger_units[0], 4)  # Move to Paris
-        game_state.military_system.update(1.0)  # Execute movement
+        game_state.military_system.update(24.0)  # Execute movement
 
     # Update combat system to detect battles
     game_state.combat_system.update(1.0)
@@ -272,6 +272,1106 @@ except Exception as e:
     print(f"✗ Statistics error: {e}")
     sys.exit(1)
 
+# Test province owner index
+try:
+    print("\n" + "="*60)
+    print("10. PROVINCE OWNER INDEX")
+    print("="*60)
+
+    pm = game_state.province_manager
+    for country in game_state.country_manager.get_all_countries():
+        scanned = [p for p in pm.provinces.values() if p.owner == country.code]
+        assert pm.get_provinces_by_owner(country.code) == scanned
+
+    province = pm.get_province(9)
+    old_owner = province.owner
+    province.owner = "GER"
+    assert province in pm.get_provinces_by_owner("GER")
+    assert province not in pm.get_provinces_by_owner(old_owner)
+    province.owner = old_owner
+    assert province in pm.get_provinces_by_owner(old_owner)
+
+    print(f"✓ Owner index matches full scan and follows ownership changes")
+
+except Exception as e:
+    print(f"✗ Owner index error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test unit indexes
+try:
+    print("\n" + "="*60)
+    print("11. UNIT INDEXES")
+    print("="*60)
+
+    ms = game_state.military_system
+    unit = ms.create_unit("infantry", "GBR", 7)
+    ms.order_move(unit, 8)
+    ms.update(24.0)
+    older = ms.get_units_in_province(7)[0]  # Joins the newer unit in 8, buckets stay in creation order
+    ms.order_move(older, 8)
+    ms.update(24.0)
+
+    for u in ms.units:
+        assert ms.get_unit_by_id(u.unit_id) == u
+    for province_id in game_state.province_manager.provinces:
+        assert ms.get_units_in_province(province_id) == [
+            u for u in ms.units if u.location == province_id
+        ]
+    for country in game_state.country_manager.get_all_countries():
+        assert ms.get_units_by_owner(country.code) == [
+            u for u in ms.units if u.owner == country.code
+        ]
+    assert unit in ms.get_units_in_province_by_owner(8, "GBR")
+    assert unit not in ms.get_units_in_province_by_owner(7, "GBR")
+    province_ids = list(game_state.province_manager.provinces)
+    assert ms.get_contested_provinces(province_ids) == {
+        province_id: ms.get_owners_in_province(province_id) for province_id in province_ids
+        if len(ms.get_owners_in_province(province_id)) > 1}
+
+    unit.current_hp = 0
+    ms.update(1.0)
+    assert ms.get_unit_by_id(unit.unit_id) is None
+    assert unit not in ms.get_units_in_province(8)
+
+    print(f"✓ Unit indexes match full scans through moves and destruction")
+
+except Exception as e:
+    print(f"✗ Unit index error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test columnar province store
+try:
+    print("\n" + "="*60)
+    print("12. PROVINCE COLUMNS")
+    print("="*60)
+
+    pm = game_state.province_manager
+    columns = pm.columns
+    province = pm.get_province(2)
+    province.development += 1
+    row = columns.row_of[province.province_id]
+    assert columns.column("development")[row] == province.development
+
+    income, manpower = game_state.economy_system._daily_totals_by_owner()
+    for country in game_state.country_manager.get_all_countries():
+        index = columns.owner_to_index[country.code]
+        provinces = pm.get_provinces_by_owner(country.code)
+        assert abs(income[index] - sum(p.get_income() for p in provinces)) < 1e-6
+        assert manpower[index] == sum(p.population // 100 for p in provinces)
+    province.development -= 1
+
+    print(f"✓ Columns track province edits and vectorized totals match per-province sums")
+
+except Exception as e:
+    print(f"✗ Province columns error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test event-driven battle detection
+try:
+    print("\n" + "="*60)
+    print("13. EVENT-DRIVEN BATTLE DETECTION")
+    print("="*60)
+
+    cs = game_state.combat_system
+    ms = game_state.military_system
+    game_state.diplomacy_system.make_peace("GBR", "FRA")
+    ms.create_unit("infantry", "GBR", 6)
+    ms.create_unit("infantry", "FRA", 6)
+    cs.update(1.0)
+    assert cs.get_battle_in_province(6) is None
+    assert 6 not in cs.dirty_provinces
+
+    game_state.diplomacy_system.declare_war("GBR", "FRA")
+    assert 6 in cs.dirty_provinces
+    cs.update(1.0)
+    assert cs.get_battle_in_province(6) is not None
+
+    print(f"✓ Battles start only from unit arrivals and war declarations")
+
+except Exception as e:
+    print(f"✗ Battle detection error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test province adjacency from an ID map
+try:
+    print("\n" + "="*60)
+    print("14. PROVINCE ADJACENCY")
+    print("="*60)
+
+    import tempfile
+    from PIL import Image
+    from src.map_data import load_adjacency
+
+    pm = game_state.province_manager
+    image = Image.new("RGB", (90, 90), COLOR_OCEAN)
+    for i, province in enumerate(pm.get_provinces_by_owner("GER") +
+                                 pm.get_provinces_by_owner("FRA") +
+                                 pm.get_provinces_by_owner("GBR")):
+        col, row = i % 3, i // 3
+        image.paste(province.color_rgb, (col * 30, row * 30, col * 30 + 30, row * 30 + 30))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        map_path = Path(tmp) / "provinces_id.png"
+        image.save(map_path)
+        offsets, neighbors = load_adjacency(map_path, pm, cache_dir=tmp)
+        cached_offsets, cached_neighbors = load_adjacency(map_path, pm, cache_dir=tmp)
+        assert (offsets == cached_offsets).all() and (neighbors == cached_neighbors).all()
+
+    pm.set_adjacency(offsets, neighbors)
+    assert pm.get_province(5).adjacent_provinces == [2, 4, 6, 8]
+    assert pm.get_province(1).adjacent_provinces == [2, 4]
+    print(f"✓ Adjacency built from ID map and reloaded from cache")
+
+except Exception as e:
+    print(f"✗ Adjacency error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test pathfinding and gradual movement
+try:
+    print("\n" + "="*60)
+    print("15. PATHFINDING AND MOVEMENT")
+    print("="*60)
+
+    ms = game_state.military_system
+    pathfinder = ms.pathfinder
+    pathfinder.invalidate()
+    path = pathfinder.find_path(1, 9, "land")
+    assert path is not None and len(path) == 4 and path[-1] == 9
+    assert all(b in game_state.province_manager.get_province(a).adjacent_provinces
+               for a, b in zip((1,) + path, path))
+    hits = pathfinder.cache_hits
+    assert pathfinder.find_path(1, 9, "land") == path
+    assert pathfinder.cache_hits == hits + 1
+
+    province = game_state.province_manager.get_province(9)
+    old_owner = province.owner
+    province.owner = "FRA"
+    assert not pathfinder.path_cache
+    province.owner = old_owner
+
+    # Fresh world so no ongoing battle holds the unit in place
+    fresh_state = GameState()
+    load_game_data(fresh_state)
+    fresh_state.initialize_systems()
+    fresh_state.province_manager.set_adjacency(offsets, neighbors)
+    ms = fresh_state.military_system
+
+    unit = ms.create_unit("infantry", "GER", 1)
+    assert ms.order_move(unit, 3)
+    ms.update(5.0)
+    assert unit.location == 1 and unit.is_moving
+    ms.update(10.0)  # Munich is hills: 1.5x cost
+    assert unit.location == 2
+    ms.update(10.0)
+    assert unit.location == 3 and not unit.is_moving
+
+    print(f"✓ A* paths follow adjacency, are cached, and units advance by speed")
+
+except Exception as e:
+    print(f"✗ Pathfinding error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test headless simulation
+try:
+    print("\n" + "="*60)
+    print("16. HEADLESS SIMULATION")
+    print("="*60)
+
+    from src.sim import build_game_state, run_simulation
+
+    sim_state = build_game_state()
+    elapsed = run_simulation(sim_state, days=14)
+    assert sim_state.game_time >= 14 * 24
+    assert "arcade" not in sys.modules
+
+    print(f"✓ Simulated 14 days headless in {elapsed:.3f}s without importing arcade")
+
+except Exception as e:
+    print(f"✗ Headless simulation error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test tick timing instrumentation
+try:
+    print("\n" + "="*60)
+    print("17. TICK TIMINGS")
+    print("="*60)
+
+    timings = sim_state.get_system_timings()
+    for name in ("economy", "military", "combat", "ai", "diplomacy",
+                 "combat.detect_battles", "economy.daily_tick"):
+        assert name in timings, name
+    assert timings["combat"]["count"] == 14 * 24
+    assert timings["economy.daily_tick"]["count"] == 14
+    for stats in timings.values():
+        assert stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+    print(f"✓ Per-system timings collected for {len(timings)} systems")
+
+except Exception as e:
+    print(f"✗ Tick timing error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test synthetic scenario generation
+try:
+    print("\n" + "="*60)
+    print("18. SCENARIO GENERATOR")
+    print("="*60)
+
+    import tempfile
+    from src.data_loader import load_map_data
+    from src.scenario import generate_scenario, populate_units, start_border_wars
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 6, seed=3)
+        world = GameState()
+        load_game_data(world, scenario["data_dir"])
+        assert load_map_data(world.province_manager, scenario["id_map"], cache_dir=tmp)
+        world.initialize_systems()
+
+    pm = world.province_manager
+    assert len(pm.provinces) == 300
+    assert len(world.country_manager.countries) == 6
+    assert all(p.owner for p in pm.provinces.values())
+    assert all(0 < len(p.adjacent_provinces) <= 6 for p in pm.provinces.values())
+
+    populate_units(world, 500, seed=3)
+    wars = start_border_wars(world, seed=3)
+    world.combat_system.update(1.0)
+    assert len(world.military_system.units) >= 500
+    assert wars and world.combat_system.active_battles
+
+    print(f"✓ Generated 300-province world with {len(wars)} wars and "
+          f"{len(world.combat_system.active_battles)} battles")
+
+except Exception as e:
+    print(f"✗ Scenario generator error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test seeded reproducibility
+try:
+    print("\n" + "="*60)
+    print("19. SEEDED REPRODUCIBILITY")
+    print("="*60)
+
+    from src.sim import run_simulation
+
+    def run_seeded_world(seed, reverse_battles=False):
+        with tempfile.TemporaryDirectory() as tmp:
+            scenario = generate_scenario(tmp, 300, 6, seed=3)
+            world = GameState(seed)
+            load_game_data(world, scenario["data_dir"])
+            load_map_data(world.province_manager, scenario["id_map"], cache_dir=tmp)
+        world.initialize_systems()
+        populate_units(world, 500, seed=3)
+        start_border_wars(world, seed=3)
+        world.combat_system.update(1.0)
+        if reverse_battles:
+            world.combat_system.active_battles.reverse()
+        run_simulation(world, days=30)
+        return (
+            sorted((c.code, round(c.money, 6), c.manpower)
+                   for c in world.country_manager.get_all_countries()),
+            sorted((p.province_id, p.owner) for p in world.province_manager.provinces.values()),
+            sorted((u.unit_id, u.location, u.current_hp, u.organization)
+                   for u in world.military_system.units),
+        )
+
+    first = run_seeded_world(42)
+    assert run_seeded_world(42, reverse_battles=True) == first
+    assert run_seeded_world(43) != first
+
+    print(f"✓ Same seed reproduces the same 30-day game regardless of battle order")
+
+except Exception as e:
+    print(f"✗ Reproducibility error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test label-map province picking
+try:
+    print("\n" + "="*60)
+    print("20. LABEL-MAP PICKING")
+    print("="*60)
+
+    try:
+        from src.map_renderer import MapRenderer
+    except ImportError:
+        MapRenderer = None
+        print("- arcade not installed, skipping renderer picking test")
+
+    if MapRenderer:
+        with tempfile.TemporaryDirectory() as tmp:
+            scenario = generate_scenario(tmp, 120, 4, seed=5, cell_size=10)
+            world = GameState(1)
+            load_game_data(world, scenario["data_dir"])
+            renderer = MapRenderer(world.province_manager, scenario["id_map"])
+
+        height = renderer.id_map_height
+        # Top-left cell (image row 0) is province 1; world Y is flipped
+        assert renderer.get_province_at_point(2, height - 3).province_id == 1
+        assert renderer.get_province_at_point(-1, 5) is None
+        assert renderer.get_province_at_point(2, height + 1) is None
+
+        in_rect = renderer.get_provinces_in_rect(0, height - 1, 25, height - 8)
+        assert [p.province_id for p in in_rect] == [1, 2, 3]
+        in_lasso = renderer.get_provinces_in_polygon([(1, height - 2), (28, height - 2),
+                                                      (1, height - 9)])
+        assert {p.province_id for p in in_lasso} == {1, 2, 3}
+
+        print(f"✓ Point, rectangle and lasso picking read the decoded label map")
+
+except Exception as e:
+    print(f"✗ Picking error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test the political map palette
+try:
+    print("\n" + "="*60)
+    print("21. POLITICAL MAP PALETTE")
+    print("="*60)
+
+    from src.map_data import PALETTE_WIDTH, build_owner_palette, palette_texel
+
+    pm = game_state.province_manager
+    owner_colors = {"GER": (10, 20, 30, 180)}
+    palette = build_owner_palette(pm, owner_colors, (150, 150, 150, 180))
+    assert palette.shape == (1, PALETTE_WIDTH, 4)
+    for province in pm.provinces.values():
+        x, y = palette_texel(pm.columns.row_of[province.province_id])
+        expected = (10, 20, 30, 180) if province.owner == "GER" else (150, 150, 150, 180)
+        assert tuple(palette[y, x]) == expected
+    assert palette_texel(PALETTE_WIDTH + 3) == (3, 1)
+
+    if MapRenderer:
+        layer = renderer.political_layer
+        province = world.province_manager.get_province(7)
+        province.owner = None
+        assert layer.dirty_rows == {world.province_manager.columns.row_of[7]}
+
+    print(f"✓ Palette has one texel per province; ownership changes mark single texels")
+
+except Exception as e:
+    print(f"✗ Palette error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test vector border extraction
+try:
+    print("\n" + "="*60)
+    print("22. VECTOR BORDERS")
+    print("="*60)
+
+    import numpy as np
+    from src.map_data import extract_borders, load_borders, ProvinceBorders
+
+    # Rows 0 | 1 side by side over row 2, with ocean (sentinel) on the right
+    ocean = np.iinfo(np.uint16).max
+    labels = np.array([[0, 0, 1, 1, ocean],
+                       [0, 0, 1, 1, ocean],
+                       [2, 2, 2, 2, ocean]], dtype=np.uint16)
+    pairs, lines = extract_borders(labels)
+    segments = {(tuple(pair), tuple(line)) for pair, line in zip(pairs.tolist(), lines.tolist())}
+    assert ((0, 1), (2.0, 3.0, 2.0, 1.0)) in segments  # Two pixel edges merged
+    assert ((0, 2), (0.0, 1.0, 2.0, 1.0)) in segments
+    assert ((1, ocean), (4.0, 3.0, 4.0, 1.0)) in segments
+    assert len(pairs) == 5
+
+    owner_index = np.array([0, 0, 1])
+    borders = ProvinceBorders(pairs, lines, 3)
+    borders.classify_all(owner_index)
+    flags = {tuple(pair): flag for pair, flag in zip(pairs.tolist(), borders.is_country_border)}
+    assert not flags[(0, 1)] and flags[(0, 2)] and flags[(1, 2)] and flags[(1, ocean)]
+
+    # Province 1 changes hands: only its segments are reclassified
+    owner_index[1] = 1
+    changed = borders.update_rows([1], owner_index)
+    changed_pairs = {tuple(pairs[segment]) for segment in changed.tolist()}
+    assert changed_pairs == {(0, 1), (1, 2)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 60, 3, seed=2)
+        world = GameState(1)
+        load_game_data(world, scenario["data_dir"])
+        cache_dir = Path(tmp) / "cache"
+        first = load_borders(scenario["id_map"], world.province_manager, cache_dir=cache_dir)
+        assert list(cache_dir.glob("borders_*.npz"))
+        second = load_borders(scenario["id_map"], world.province_manager, cache_dir=cache_dir)
+        assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+    print(f"✓ Borders merged into segments; ownership changes reclassify only nearby segments")
+
+except Exception as e:
+    print(f"✗ Border error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test unit stack change notifications
+try:
+    print("\n" + "="*60)
+    print("23. UNIT STACK LISTENERS")
+    print("="*60)
+
+    world = GameState(3)
+    load_game_data(world)
+    world.initialize_systems()
+    military = world.military_system
+    changed = []
+    military.add_stack_listener(changed.append)
+
+    unit = military.create_unit("infantry", "GER", 1)
+    assert changed == [1]
+    military._relocate_unit(unit, 2)
+    assert changed == [1, 1, 2]
+    unit.current_hp = 0
+    military.remove_destroyed_units()
+    assert changed == [1, 1, 2, 2]
+
+    print(f"✓ Stack listeners fire on create, move and destroy")
+
+except Exception as e:
+    print(f"✗ Stack listener error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test province centroids and bounding boxes
+try:
+    print("\n" + "="*60)
+    print("24. PROVINCE GEOMETRY")
+    print("="*60)
+
+    from src.map_data import compute_province_geometry
+    from src.systems.pathfinding import Pathfinder
+
+    ocean = np.iinfo(np.uint16).max
+    labels = np.array([[0, 0, 1],
+                       [0, 0, 1],
+                       [ocean, ocean, 1]], dtype=np.uint16)
+    centroids, areas, boxes = compute_province_geometry(labels, 3)
+    assert areas.tolist() == [4, 3, 0]
+    assert centroids[0].tolist() == [1.0, 2.0] and centroids[1].tolist() == [2.5, 1.5]
+    assert boxes[0].tolist() == [0.0, 1.0, 2.0, 3.0] and boxes[1].tolist() == [2.0, 0.0, 3.0, 3.0]
+    assert np.isnan(centroids[2]).all()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 4, seed=4)
+        world = GameState(1)
+        load_game_data(world, scenario["data_dir"])
+        load_map_data(world.province_manager, scenario["id_map"], cache_dir=Path(tmp) / "cache")
+        assert list((Path(tmp) / "cache").glob("geometry_*.npz"))
+
+    pm = world.province_manager
+    assert pm.get_area(1) == 64 and pm.get_centroid(1) == (4.0, scenario["height"] - 4.0)
+    assert pm.get_bounding_box(1) == (0.0, scenario["height"] - 8.0, 8.0, scenario["height"])
+
+    # The centroid heuristic must not change the cost of the path found
+    def path_cost(pathfinder, path):
+        return sum(pathfinder.get_move_cost(p, "land") for p in path)
+
+    with_heuristic = Pathfinder(world)
+    path = with_heuristic.find_path(1, 300, "land")
+    pm.max_neighbor_distance = 0.0  # Disables the heuristic (plain Dijkstra)
+    dijkstra = Pathfinder(world)
+    reference = dijkstra.find_path(1, 300, "land")
+    assert path[-1] == 300 and path_cost(with_heuristic, path) == path_cost(dijkstra, reference)
+
+    print(f"✓ Centroids, areas and boxes match the ID map; A* heuristic keeps optimal paths")
+
+except Exception as e:
+    print(f"✗ Geometry error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test the compiled world cache
+try:
+    print("\n" + "="*60)
+    print("25. WORLD CACHE")
+    print("="*60)
+
+    import json
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 200, 4, seed=6)
+        cache_dir = Path(tmp) / "cache"
+
+        compiled = GameState(1)
+        load_game_data(compiled, scenario["data_dir"], scenario["id_map"], cache_dir=cache_dir)
+        assert (cache_dir / "world.bin").exists()
+
+        cached = GameState(1)
+        load_game_data(cached, scenario["data_dir"], scenario["id_map"], cache_dir=cache_dir)
+        pm = cached.province_manager
+        assert isinstance(pm.label_map, np.memmap)
+        assert np.array_equal(pm.label_map, compiled.province_manager.label_map)
+        for province_id in (1, 57, 200):
+            a = compiled.province_manager.get_province(province_id)
+            b = pm.get_province(province_id)
+            assert a.__dict__.keys() == b.__dict__.keys()
+            assert all(getattr(a, name) == getattr(b, name) for name in
+                       ("name", "color_rgb", "terrain_type", "development", "population",
+                        "owner", "is_capital", "is_coastal", "adjacent_provinces"))
+            assert pm.get_centroid(province_id) == compiled.province_manager.get_centroid(province_id)
+        assert pm.count_provinces_by_owner("AAA") == \
+            compiled.province_manager.count_provinces_by_owner("AAA")
+
+        # Editing a source file invalidates the cache
+        countries_path = Path(scenario["data_dir"]) / "countries.json"
+        countries = json.loads(countries_path.read_text())
+        countries["AAA"]["name"] = "Renamed"
+        countries_path.write_text(json.dumps(countries))
+        reloaded = GameState(1)
+        load_game_data(reloaded, scenario["data_dir"], scenario["id_map"], cache_dir=cache_dir)
+        assert reloaded.country_manager.get_country("AAA").name == "Renamed"
+
+    print(f"✓ World cache restores provinces, countries and map data; stale caches rebuild")
+
+except Exception as e:
+    print(f"✗ World cache error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test save games and incremental autosaves
+try:
+    print("\n" + "="*60)
+    print("26. SAVE GAMES")
+    print("="*60)
+
+    from src.savegame import save_game, load_game, capture_snapshot, AutosaveWriter
+
+    def snapshots_equal(a, b):
+        tables_a, arrays_a = capture_snapshot(a)
+        tables_b, arrays_b = capture_snapshot(b)
+        return tables_a == tables_b and arrays_a.keys() == arrays_b.keys() and \
+            all(np.array_equal(arrays_a[name], arrays_b[name]) for name in arrays_a)
+
+    def new_world(scenario, seed):
+        world = GameState(seed)
+        load_game_data(world, scenario["data_dir"], scenario["id_map"],
+                       cache_dir=Path(scenario["data_dir"]) / "cache")
+        world.initialize_systems()
+        return world
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 6, seed=3)
+        original = new_world(scenario, 11)
+        populate_units(original, 500, seed=3)
+        start_border_wars(original, seed=3)
+        for _ in range(5):
+            original.update(1.0)
+        assert original.combat_system.active_battles
+
+        # Snapshots copy the province columns, which follow every saved field
+        pm = original.province_manager
+        pm.get_province(2).fortification_level = 4
+        pm.get_province(2).is_capital = True
+        pm.get_province(2).manpower_pool = 77
+        pm.get_province(3).owner = None
+        tables, arrays = capture_snapshot(original)
+        owners = tables["owners"] + [None]
+        assert [owners[i] for i in arrays["province_owner"].tolist()] == [
+            p.owner for p in pm.province_rows]
+        for name in ("development", "population", "base_income", "manpower_pool",
+                     "fortification_level", "is_capital"):
+            assert arrays[f"province_{name}"].tolist() == [getattr(p, name) for p in pm.province_rows]
+
+        # A full save restores the same state, and both games then play on identically
+        save_game(original, Path(tmp) / "game.sav")
+        restored = new_world(scenario, 99)
+        load_game(restored, Path(tmp) / "game.sav")
+        assert snapshots_equal(original, restored)
+        for _ in range(24):
+            original.update(1.0)
+            restored.update(1.0)
+        assert snapshots_equal(original, restored)
+
+        # The second autosave only writes the chunks that changed
+        writer = AutosaveWriter(Path(tmp) / "autosave")
+        writer.autosave(original)
+        writer.flush()
+        full_bytes = writer.bytes_written
+        original.province_manager.get_province(1).development += 1
+        writer.autosave(original)
+        writer.close()
+        assert 0 < writer.bytes_written < full_bytes
+
+        from_autosave = new_world(scenario, 5)
+        load_game(from_autosave, Path(tmp) / "autosave")
+        assert snapshots_equal(original, from_autosave)
+
+        # Autosaves queued while the writer is busy replace each other, and flush still returns
+        import threading
+        import time
+        slow_writer = AutosaveWriter(Path(tmp) / "slow_autosave")
+        write_snapshot = slow_writer.write_snapshot
+
+        def slow_write(*snapshot):
+            time.sleep(0.2)
+            write_snapshot(*snapshot)
+
+        slow_writer.write_snapshot = slow_write
+        for _ in range(3):
+            slow_writer.autosave(original)
+        flusher = threading.Thread(target=slow_writer.flush, daemon=True)
+        flusher.start()
+        flusher.join(timeout=10)
+        assert not flusher.is_alive(), "flush() hung after dropping a queued autosave"
+        slow_writer.close()
+
+    print(f"✓ Saves round-trip; incremental autosave wrote {writer.bytes_written} "
+          f"of {full_bytes} bytes")
+
+except Exception as e:
+    print(f"✗ Save game error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test the columnar unit store
+try:
+    print("\n" + "="*60)
+    print("27. UNIT STORE")
+    print("="*60)
+
+    from src.unit import Unit, UnitColumns
+
+    world = GameState(2)
+    load_game_data(world)
+    world.initialize_systems()
+    military = world.military_system
+    templates = world.unit_template_manager
+    units = [military.create_unit(template_id, "GER", 1)
+             for template_id in ("infantry", "armor", "artillery", "infantry")]
+    units[1].path = [2, 3]
+    assert isinstance(units[0].current_hp, int) and units[0].move_target is None
+
+    # Vectorised damage matches per-unit take_damage
+    standalone = [Unit(0, unit.template_id, unit.owner, unit.location,
+                       unit.current_hp, unit.organization) for unit in units]
+    for unit in standalone:
+        unit.take_damage(37.5, templates.get_template(unit.template_id))
+    rows = np.array([unit.row for unit in units])
+    military.columns.apply_damage(rows, 37.5, military.columns.template_values(templates, "max_hp"))
+    for unit, expected in zip(units, standalone):
+        assert (unit.current_hp, unit.organization, unit.strength) == \
+            (expected.current_hp, expected.organization, expected.strength)
+    attack = sum(unit.get_effective_attack(templates.get_template(unit.template_id))
+                 for unit in units)
+    power = military.columns.effective_power(rows, military.columns.template_values(templates, "attack"))
+    assert abs(power - attack) < 1e-9
+
+    # Removing units compacts the store; surviving handles find their new rows
+    unit_count = len(military.units)
+    units[0].current_hp = 0
+    military.update(1.0)
+    assert len(military.columns) == len(military.units) == unit_count - 1
+    assert units[0] not in military.units
+    try:
+        units[0].current_hp
+        assert False, "removed unit still readable"
+    except LookupError:
+        pass
+    assert units[1].path == [2, 3] and units[1].template_id == "armor"
+    assert all(military.units[row].row == row for row in range(len(military.units)))
+    assert military.get_unit_by_id(units[3].unit_id) == units[3]
+    assert military.get_unit_by_id(units[0].unit_id) is None
+
+    # Location and owner changes through handles keep the lookups current
+    units[3].location = 2
+    assert units[3] in military.get_units_in_province(2) and units[3] not in military.get_units_in_province(1)
+    units[3].owner = "FRA"
+    assert military.get_units_in_province_by_owner(2, "FRA") == [units[3]]
+    assert units[3] not in military.get_units_by_owner("GER")
+
+    print(f"✓ Unit store: vectorised combat maths matches per-unit code, handles survive compaction")
+
+except Exception as e:
+    print(f"✗ Unit store error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test the batched battle resolver
+try:
+    print("\n" + "="*60)
+    print("28. BATCHED COMBAT")
+    print("="*60)
+
+    def battle_world():
+        world = GameState(8)
+        load_game_data(world, scenario["data_dir"], scenario["id_map"], cache_dir=tmp)
+        world.initialize_systems()
+        populate_units(world, 600, seed=8)
+        start_border_wars(world, seed=8)
+        world.combat_system.update(1.0)
+        return world
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 6, seed=8)
+        batched = battle_world()
+        one_by_one = battle_world()
+        untouched = battle_world()
+
+    battle_count = len(batched.combat_system.active_battles)
+    assert battle_count > 1
+    # All battles in one pass vs. each battle on its own, in reverse order
+    batched.combat_system.resolve_battles()
+    for battle in reversed(one_by_one.combat_system.active_battles[:]):
+        one_by_one.combat_system.resolve_battle_tick(battle)
+    for name in ("current_hp", "organization", "strength"):
+        assert np.array_equal(batched.military_system.columns.column(name),
+                              one_by_one.military_system.columns.column(name))
+    assert not np.array_equal(batched.military_system.columns.column("current_hp"),
+                              untouched.military_system.columns.column("current_hp"))
+
+    print(f"✓ {battle_count} battles resolved in one pass match one-by-one resolution")
+
+except Exception as e:
+    print(f"✗ Batched combat error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test staggered AI scheduling
+try:
+    print("\n" + "="*60)
+    print("29. AI SCHEDULING")
+    print("="*60)
+
+    def thinking_world(frame_budget_ms):
+        world = GameState(4)
+        load_game_data(world)
+        world.initialize_systems()
+        world.player_country = None
+        ai = world.ai_controller
+        ai.frame_budget_ms = frame_budget_ms
+        turns = []
+        country_steps = ai.country_decision_steps
+
+        def counted_steps(country, commands):
+            turns.append(country.code)
+            yield from country_steps(country, commands)
+        ai.country_decision_steps = counted_steps
+        return world, turns
+
+    world, turns = thinking_world(None)
+    codes = sorted(world.country_manager.countries)
+    world.ai_controller.update(24.0)
+    assert 0 < len(turns) < len(codes)  # Only the first slice of the week
+    world.ai_controller.update(144.0)
+    assert sorted(turns) == codes  # Every country thought exactly once this week
+
+    # With no budget left each update runs a single step; the week still completes
+    world, turns = thinking_world(0.0)
+    updates = 0
+    world.ai_controller.update(168.0)
+    while world.ai_controller.queue or world.ai_controller.current_steps:
+        world.ai_controller.update(0.0)
+        updates += 1
+    assert sorted(turns) == codes and updates >= len(codes) - 1
+
+    print(f"✓ AI turns spread over {world.ai_controller.time_slices} slices per week; "
+          f"budgeted run finished over {updates + 1} updates")
+
+except Exception as e:
+    print(f"✗ AI scheduling error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test AI planning in worker processes
+try:
+    print("\n" + "="*60)
+    print("30. PARALLEL AI PLANNING")
+    print("="*60)
+
+    from src.systems.ai_planner import AIPlanner, capture_world
+
+    def war_world():
+        world = GameState(9)
+        load_game_data(world, scenario["data_dir"], scenario["id_map"], cache_dir=tmp)
+        world.initialize_systems()
+        world.player_country = None
+        populate_units(world, 400, seed=9)
+        start_border_wars(world, seed=9)
+        return world
+
+    def ai_outcome(world):
+        units = [(unit.unit_id, unit.location, unit.move_target, tuple(unit.path or ()))
+                 for unit in world.military_system.units]
+        wars = {country.code: sorted(country.at_war_with)
+                for country in world.country_manager.get_all_countries()}
+        return units, wars
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 6, seed=9)
+        serial = war_world()
+        parallel = war_world()
+
+    # Planning reads the snapshot only and leaves the game untouched
+    before = ai_outcome(serial)
+    pathfinder = serial.military_system.pathfinder
+    planner = AIPlanner(pathfinder.get_graph(), capture_world(serial))
+    planned = [planner.plan_country(code, 1) for code in serial.country_manager.countries]
+    assert any(command.action == "move" for commands in planned for command in commands)
+    assert ai_outcome(serial) == before
+
+    parallel.ai_controller.workers = 2
+    # Spawned workers would re-run this guard-less script; fork is safe here (no GL, no threads)
+    parallel.ai_controller.start_method = "fork"
+    for _ in range(3):
+        serial.ai_controller.make_all_decisions()
+        parallel.ai_controller.make_all_decisions()
+    assert parallel.ai_controller.pool is not None  # The workers really planned
+    parallel.ai_controller.close()
+    assert ai_outcome(serial) == ai_outcome(parallel) != before
+
+    print(f"✓ Plans from 2 worker processes match main-thread planning over 3 weeks")
+
+except Exception as e:
+    print(f"✗ Parallel AI planning error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test incrementally maintained military totals
+try:
+    print("\n" + "="*60)
+    print("31. MILITARY STRENGTH TOTALS")
+    print("="*60)
+
+    from src.savegame import capture_snapshot, restore_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 6, seed=10)
+        world = GameState(10)
+        load_game_data(world, scenario["data_dir"], scenario["id_map"], cache_dir=tmp)
+        world.initialize_systems()
+        populate_units(world, 500, seed=10)
+        start_border_wars(world, seed=10)
+
+    military = world.military_system
+    templates = world.unit_template_manager
+
+    def assert_totals_match():
+        for code in world.country_manager.countries:
+            units = military.get_units_by_owner(code)
+            expected = sum((templates.get_template(unit.template_id).attack
+                            + templates.get_template(unit.template_id).defense) * unit.strength
+                           for unit in units)
+            assert abs(military.get_military_strength(code) - expected) < 1e-6
+            for category in ("land", "sea", "air"):
+                assert military.count_units_by_category(code, category) == sum(
+                    1 for unit in units if templates.get_template(unit.template_id).category == category)
+
+    assert_totals_match()
+    for _ in range(48):  # Battles damage and destroy units
+        world.update(1.0)
+    assert_totals_match()
+
+    unit = military.units[0]
+    unit.take_damage(30.0, templates.get_template(unit.template_id))
+    military.create_unit("armor", world.country_manager.get_all_countries()[0].code,
+                         military.units[1].location)
+    assert_totals_match()
+
+    restore_snapshot(world, *capture_snapshot(world))
+    assert_totals_match()
+
+    print(f"✓ Strength and category counts stay exact through combat, damage, recruiting and reloads")
+
+except Exception as e:
+    print(f"✗ Military totals error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test the war and alliance matrices
+try:
+    print("\n" + "="*60)
+    print("32. COUNTRY RELATIONS")
+    print("="*60)
+
+    # Relations set before a country joins a manager move with it
+    early = Country("C00", "Country 0", (0, 0, 0), 1, at_war_with=["C07"])
+    early.declare_war("C05")
+    manager = CountryManager()
+    manager.add_country(early)
+    for i in range(1, 40):  # More than the initial matrix capacity
+        manager.add_country(Country(f"C{i:02d}", f"Country {i}", (i, i, i), i))
+    late = manager.get_country("C39")
+    late.declare_war("C00")
+    late.allied_with = ["C38"]
+
+    assert sorted(early.at_war_with) == ["C05", "C07"] and manager.is_at_war("C00", "C07")
+    assert "C00" in late.at_war_with and late.is_at_war_with("C00")
+    assert not manager.get_country("C07").is_at_war_with("C00")  # Relations are one-sided
+    assert manager.get_enemies("C39") == ["C00"] and manager.get_allies("C39") == ["C38"]
+    assert manager.is_allied("C39", "C38") and not manager.is_allied("C38", "C39")
+    assert manager.relations.related_mask("at_war_with", "C00").sum() == 2
+
+    # The first hostile pair in list order, as combat detection expects
+    assert manager.find_hostile_pair(["C01", "C05", "C00", "C39"]) == ("C05", "C00")
+    assert manager.find_hostile_pair(["C01", "C00", "C39"]) == ("C00", "C39")
+    assert manager.find_hostile_pair(["C01", "C02", "ZZZ"]) is None
+
+    for enemy in list(early.at_war_with):
+        early.make_peace(enemy)
+    assert len(early.at_war_with) == 0 and not early.at_war_with
+
+    # Save games store the relations as plain lists
+    saved_world = GameState(11)
+    load_game_data(saved_world)
+    saved_world.initialize_systems()
+    codes = list(saved_world.country_manager.countries)
+    saved_world.diplomacy_system.declare_war(codes[0], codes[1])
+    tables, arrays = capture_snapshot(saved_world)
+    assert tables["countries"][codes[0]]["at_war_with"] == [codes[1]]
+    saved_world.diplomacy_system.make_peace(codes[0], codes[1])
+    restore_snapshot(saved_world, tables, arrays)
+    assert saved_world.country_manager.is_at_war(codes[1], codes[0])
+
+    print(f"✓ {len(manager.relations.codes)} countries in the war/alliance matrices; "
+          f"views, hostile-pair search and saves work")
+
+except Exception as e:
+    print(f"✗ Country relations error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test incrementally maintained frontlines
+try:
+    print("\n" + "="*60)
+    print("33. FRONTLINES")
+    print("="*60)
+
+    import random
+    from src.systems.ai_planner import AIPlanner, capture_world
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scenario = generate_scenario(tmp, 300, 6, seed=12)
+        world = GameState(12)
+        load_game_data(world, scenario["data_dir"], scenario["id_map"], cache_dir=tmp)
+        world.initialize_systems()
+        world.player_country = None
+        populate_units(world, 200, seed=12)
+        start_border_wars(world, seed=12)
+
+    pm = world.province_manager
+    frontlines = world.frontline_service
+
+    def expected_frontline(code, other):
+        return sorted(p.province_id for p in pm.get_provinces_by_owner(code)
+                      if any(pm.get_province(n).owner == other for n in p.adjacent_provinces))
+
+    def assert_frontlines_match():
+        codes = list(world.country_manager.countries)
+        for code in codes:
+            for other in codes:
+                if other != code:
+                    assert frontlines.get_frontline(code, other) == expected_frontline(code, other)
+
+    assert_frontlines_match()
+    rng = random.Random(12)
+    codes = list(world.country_manager.countries)
+    for province in rng.sample(list(pm.provinces.values()), 60):  # Conquests, incl. unowned
+        province.owner = rng.choice(codes + [None])
+    assert_frontlines_match()
+
+    # The AI only targets enemy provinces on its own border
+    pathfinder = world.military_system.pathfinder
+    planner = AIPlanner(pathfinder.get_graph(), capture_world(world))
+    moves = 0
+    for code, country in world.country_manager.countries.items():
+        for command in planner.plan_country(code, 1):
+            if command.action == "move":
+                enemy = pm.get_province(command.target).owner
+                border = frontlines.get_frontline(enemy, code)
+                assert not border or command.target in border
+                moves += 1
+    assert moves > 0
+
+    print(f"✓ Frontlines stay exact through 60 ownership changes; {moves} AI moves target them")
+
+except Exception as e:
+    print(f"✗ Frontline error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
+# Test multi-source distance fields
+try:
+    print("\n" + "="*60)
+    print("34. DISTANCE FIELDS")
+    print("="*60)
+
+    from src.systems.pathfinding import DistanceField
+
+    graph = pathfinder.get_graph()
+    rng = random.Random(34)
+    all_ids = graph.province_ids.tolist()
+    sources = rng.sample(all_ids, 5)
+
+    def path_cost(path):
+        return sum(graph.move_costs[graph.row_of[pid]] for pid in path)
+
+    field = DistanceField(graph, sources, "land")
+    checked = 0
+    for origin in rng.sample(all_ids, 40):
+        path = field.path_from(origin)
+        if origin in sources:
+            assert path == ()
+            continue
+        best = min((path_cost(p) for p in (pathfinder.find_path(origin, s, "land") for s in sources)
+                    if p is not None), default=None)
+        if best is None:
+            assert path is None
+            continue
+        assert path[-1] in sources
+        assert abs(path_cost(path) - best) < 1e-9
+        assert abs(field.distance_to_source(origin) - best) < 1e-9
+        checked += 1
+    assert checked > 0
+
+    # Stopping early keeps the routes of the requested provinces optimal
+    wanted = rng.sample(all_ids, 3)
+    partial = DistanceField(graph, sources, "land", stop_at=[graph.row_of[pid] for pid in wanted])
+    for origin in wanted:
+        assert partial.distance_to_source(origin) == field.distance_to_source(origin)
+
+    print(f"✓ {checked} distance-field routes match the cheapest A* path to any source")
+
+except Exception as e:
+    print(f"✗ Distance field error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+
 print("\n" + "="*60)
 print("ALL TESTS PASSED!")
 print("="*60)
@@ -294,5 +1394,7 @@ print("  1/2/3: Game speed")
 print("  I/T/A: Recruit Infantry/Tank/Artillery")
 print("  W: Declare war on selected province owner")
 print("  P: Make peace")
+print("  F4: Show frontlines")
+print("  F5/F9: Quicksave/Quickload")
 print("  Arrow keys: Pan camera")
 print("  Mouse scroll: Zoom")